@@ -3,17 +3,28 @@ Main algorithm exploring a graph to find N//2 unique pairs of employees among N
 """
 
 __author__ = "Bertrand Blanc (Alan Turing)"
-__all__ = ["Meeting", "Coffee"]
+__all__ = ["Meeting", "Group", "Week", "Coffee"]
 
+from array import array
 from employee import Employee
-from graph import Vertex, Graph
-from linkedlist import LinkedList
+from graph import FrozenGraph, OverlayGraph
+from exclusion import ExclusionIndex
+from matching import max_weight_matching
+from dlx import DancingLinks
+from search import WeekSearch
+from rotation import RotationSolver
+from groups import GroupPlanner
+from sampling import GreedySampler
 import random
+import itertools
 from decorator_timer import Timer
+from tracing import tracer
 
 
 class Meeting():
     """A meeting for a pair of employees"""
+    __slots__ = ('employee1', 'employee2')
+
     def __init__(self, employee1, employee2):
         self.employee1 = employee1
         self.employee2 = employee2
@@ -22,16 +33,93 @@ class Meeting():
         return '(' + str(self.employee1.data.name) + ', ' + str(self.employee2.data.name) + ')'
 
 
+class Group():
+    """A meeting of several employees, see Coffee.groups"""
+    __slots__ = ('employees',)
+
+    def __init__(self, employees):
+        self.employees = tuple(employees)
+
+    def __len__(self):
+        return len(self.employees)
+
+    def __iter__(self):
+        return iter(self.employees)
+
+    def __str__(self):
+        return '(' + ', '.join(str(employee.data.name) for employee in self.employees) + ')'
+
+
+class Week():
+    """The N//2 meetings of a week, stored as packed pairs of vertex IDs.
+    The Meeting objects are only materialized while iterating.
+    """
+    __slots__ = ('vertices', 'ids')
+
+    def __init__(self, vertices, pairs=None):
+        """
+        :param vertices: lookup from a vertex ID to its vertex, typically the planning Graph
+        :param pairs: optional iterable of (id1, id2) pairs
+        """
+        self.vertices = vertices
+        self.ids = array('I')
+        if pairs:
+            for id1, id2 in pairs:
+                self.ids.append(id1)
+                self.ids.append(id2)
+
+    def add(self, employee1, employee2):
+        """books a meeting between two vertices"""
+        self.ids.append(employee1.id)
+        self.ids.append(employee2.id)
+
+    def pairs(self):
+        """iterates over the (id1, id2) pairs without creating any Meeting"""
+        ids = self.ids
+        return zip(ids[0::2], ids[1::2])
+
+    def __len__(self):
+        return len(self.ids) // 2
+
+    def __getitem__(self, i):
+        if not (0 <= i < len(self)):
+            raise IndexError(f'index {i} out of range [0,{len(self)}[')
+        return Meeting(self.vertices[self.ids[2*i]], self.vertices[self.ids[2*i+1]])
+
+    def __iter__(self):
+        vertices = self.vertices
+        for id1, id2 in self.pairs():
+            yield Meeting(vertices[id1], vertices[id2])
+
+    def __str__(self):
+        return "[" + ", ".join(map(str, self)) + "]"
+
+
 class Coffee():
     """Create the graph and explores it to find N//2 unique pairs of employees"""
 
+    # sorting_algo selecting the maximum-weight perfect matching instead of the exploration
+    WEIGHTED = 5
+    # sorting_algo selecting the exact-cover solver (Dancing Links), week by week
+    DLX = 6
+    # sorting_algo selecting the exact-cover solver over all the remaining weeks at once
+    DLX_ROTATION = 7
+    # sorting_algo selecting the search of all the remaining weeks at once, backtracking across weeks
+    BACKTRACK = 8
+    # sorting_algo breaking the symmetries: canonical first week, a single twin tried per employee
+    SYMMETRIC = (0, 1, 2, 3)
+    # sorting_algo sampling random orders, and number of orders it tries greedily before its search
+    RANDOM = 4
+    BATCH = 4096
+
     class _Week():
         """Iterator finding for each of the N//2 iterations a new set of unique set of N//2 pairs"""
-        def __init__(self, planning, *, endless=False, signal=None, algo=0):
+        def __init__(self, planning, *, endless=False, signal=None, algo=0, propagate=False):
             self.planning = planning
             self.endless = endless
             self.signal = signal
             self.algo=algo
+            self.propagate = propagate
 
         def check(self, pairing):
             """Check that a set of pairs of employees meet the expectations:
@@ -46,22 +134,26 @@ class Coffee():
 
             employees = dict()
             for employee in self.planning.planning:
-                employees[employee] = False
+                employees[employee.id] = False
 
-            for meeting in pairing:
-                employees[meeting.employee1] = True
-                employees[meeting.employee2] = True
+            for id1, id2 in pairing.pairs():
+                employees[id1] = True
+                employees[id2] = True
 
             for employee in employees:
-                assert employees[employee], f'{employee.id} has not been booked'
+                assert employees[employee], f'{employee} has not been booked'
                 pass 
 
         def __iter__(self):
             return self
 
         def __next__(self):
+            with tracer.span('week', cat='coffee', algo=self.algo, week=self.planning.week+1):
+                return self._next()
+
+        def _next(self):
             # running the pairing exploration for a given sorting algo
-            pairing = self.planning.schedule(termination=self.signal, sorting_algo=self.algo)
+            pairing = self.planning.schedule(termination=self.signal, sorting_algo=self.algo, propagate=self.propagate)
 
             if self.endless:
                 # section of the code dealing with a random number of N//2 pairs
@@ -74,7 +166,7 @@ class Coffee():
                 if len(pairing) == 0:
                     restart=True
                     self.planning.reset()
-                    pairing = self.planning.schedule(termination=self.signal, sorting_algo=self.algo)
+                    pairing = self.planning.schedule(termination=self.signal, sorting_algo=self.algo, propagate=self.propagate)
 
                 self.check(pairing)
                 return pairing, restart
@@ -87,20 +179,63 @@ class Coffee():
             return pairing
 
 
-    def __init__(self, employees):
+    def __init__(self, employees, *, exclusions=None, diversity=1, base=None, batch=BATCH):
+        """
+        :param employees: collection of employees to pair up
+        :param exclusions: optional Exclusions rules. They are compiled once, and the
+        forbidden pairs are never added to the graph, hence never explored.
+        :param diversity: bonus granted by the weighted mode to the pairs across departments
+        :param base: optional FrozenGraph of the employees from Coffee.base_graph, shared between planners
+        :param batch: random orders tried greedily by the random strategy before searching, 0 for none,
+        see sampling.GreedySampler
+        """
         self.employees = employees
         self.planning = None
+        self.exclusions = exclusions.compile(employees) if exclusions else None
+        self.diversity = diversity
+        self.batch = batch
+
+        if base is None:
+            base = Coffee.base_graph(employees, exclusions=self.exclusions)
+        assert len(base) == len(employees), f'the base graph has {len(base)} vertices for {len(employees)} employees'
+        # the graph of all the allowed pairs is built once, the resets only create an overlay over it
+        self.base = base
+
+        # last week each pair met, kept across the cycles for the weighted mode: packed by pair index,
+        # -1 if never, see _pair. Only recorded once the weighted mode is used, None until then.
+        self.history = None
+        self.week = 0
+        # weeks solved ahead of time by the whole-rotation strategies
+        self.plan = []
+        # sorting_algo -> plan of a whole cycle solved from the full graph, as pairs of IDs.
+        # Every cycle restarts from that same graph, hence the plan is replayed after each reset.
+        self.cycles = dict()
+        self.fresh = True
+        # counters of the iterative search
+        self.stats = dict()
+        # weeks of the current cycle as the packed IDs of their Week, and frontier of the week search aborted last, see checkpoint
+        self.committed = []
+        self.frontier = None
 
         self.reset()
 
-    def reset(self):
-        self.planning = Graph()
-        for idx,employee in enumerate(self.employees):
-            self.planning.add(Vertex(idx, employee))
+    @staticmethod
+    def base_graph(employees, *, exclusions=None):
+        """Immutable graph of all the pairs allowed, to share between the planners of the employees
+        :param exclusions: Exclusions rules, or the ExclusionIndex compiled for these employees
+        """
+        if exclusions is not None and not isinstance(exclusions, ExclusionIndex):
+            exclusions = exclusions.compile(employees)
+        # pruned edges: these employees shall never be paired up
+        return FrozenGraph(employees, exclusions.allows if exclusions else None)
 
-        for idx,v1 in enumerate(self.planning):
-            for idx2 in range(idx+1,len(self.planning)):
-                v1.add(self.planning[idx2])
+    def reset(self):
+        """Restarts from the base graph in O(1): the overlay only records the edges removed"""
+        self.plan = []
+        self.fresh = True
+        self.committed = []
+        self.frontier = None
+        self.planning = OverlayGraph(self.base)
 
     def __len__(self):
         return len(self.employees) // 2
@@ -109,12 +244,368 @@ class Coffee():
         """basic iterator"""
         return Coffee._Week(self)
     
-    def feed(self, *, endless=False, asynchronous_signal=None, sorting_algo=None):
+    def feed(self, *, endless=False, asynchronous_signal=None, sorting_algo=None, propagate=False):
         """iterator handling more advanced fine tuned features like multi-threading or sorting algorith selection"""
-        return Coffee._Week(self, endless=endless, signal=asynchronous_signal, algo=sorting_algo)
+        return Coffee._Week(self, endless=endless, signal=asynchronous_signal, algo=sorting_algo, propagate=propagate)
+
+    def schedule(self, *, termination=None, sorting_algo=0, propagate=False):
+        """Explore the graph of possibilities to find N//2 pairs is they exist
+        :param propagate: the sorting strategies use the iterative search with forward checking
+        instead of browse. The counters are accumulated in self.stats.
+        """
+
+        with tracer.span('schedule', cat='coffee', algo=sorting_algo, week=self.week+1):
+            if sorting_algo == Coffee.WEIGHTED:
+                # polynomial alternative to the exploration
+                edges = self._weighted()
+            elif sorting_algo == Coffee.DLX:
+                edges = self._exact_cover(termination)
+            elif sorting_algo == Coffee.DLX_ROTATION:
+                edges = self._planned(sorting_algo, self._exact_cover_rotation, termination)
+            elif sorting_algo == Coffee.BACKTRACK:
+                edges = self._planned(sorting_algo, self._backtrack_rotation, termination)
+            elif sorting_algo in Coffee.SYMMETRIC and self._complete():
+                edges = self._canonical()
+            else:
+                # the batches of random orders first, the search of a single one if none succeeded
+                edges = self._sample(termination) if sorting_algo == Coffee.RANDOM and self.batch else []
+                if not edges:
+                    edges = self._search(termination, sorting_algo) if propagate else self._explore(termination, sorting_algo)
+        if self.stats:
+            # the slope of the counters shows the backtracking storms
+            tracer.counter('search', **self.stats)
+
+        if termination and termination.is_set():
+            # in case the process was aborted, return nothing since the data are meaningless
+            return []
+            
+        # critical section to update the graph by removing the edges between the employees
+        # who've been paired up so that they're not picked during the next iterations
+        # that section can ONLY be exercised if no abort signal has been raised
+        return self._commit(edges)
+
+    def _commit(self, edges):
+        """removes the pairs of a week from the graph
+        :return: Week of these pairs"""
+
+        # QA assertion - can be disabled via the __debug__ option
+        assert len(edges) in [0,len(self)], f'bug: {len(edges)} != [0, {len(self)}]'
+
+        meetings = Week(self.planning)
+        for employee1, employee2 in edges:
+            if employee1 in employee2.neighbors:
+                employee2.remove(employee1)
+            if employee2 in employee1.neighbors:
+                employee1.remove(employee2)
+            meetings.add(employee1, employee2)
+            if self.history is not None:
+                # the pair history survives the reset of the graph
+                self.history[self._pair(employee1.id, employee2.id)] = self.week
+
+        if len(meetings):
+            self.week += 1
+            self.fresh = False
+            # the packed IDs are shared with the Week, the lists are only built by checkpoint
+            self.committed.append(meetings.ids)
+
+        return meetings
+
+    def cycle(self, *, sorting_algo=0, propagate=False, every=1000):
+        """Generator scheduling the weeks one after the other with the iterative search,
+        handing the control back every `every` tentative pairs, see scheduler.interleave.
+        :return: yields None at each pause. Returns the list of the weeks once no pair is left
+        to schedule, or None when a week cannot be found before (dead end of the strategy).
+        """
+        weeks = []
+        if sorting_algo in Coffee.SYMMETRIC and self._complete():
+            weeks.append(self._commit(self._canonical()))
+        while self.planning.len_edges():
+            search = WeekSearch([v.id for v in self._order(sorting_algo)], self._partners(), propagate=propagate,
+                                symmetry=sorting_algo in Coffee.SYMMETRIC)
+            pairs = None
+            for solution in search.solutions(every=every):
+                if solution is None:
+                    yield None
+                    continue
+                pairs = solution
+                break
+
+            for key, value in search.statistics.items():
+                self.stats[key] = self.stats.get(key, 0) + value
+            if pairs is None:
+                return None
+            weeks.append(self._commit([(self.planning[min(pair)], self.planning[max(pair)]) for pair in pairs]))
+        return weeks
+
+    def branch(self, subtree, *, sorting_algo=0, termination=None):
+        """Commits the subtree-th perfect matching of the remaining graph, in the exploring order
+        of a sorting strategy: the matchings of a week split its search space into disjoint
+        subtrees, explored independently by the workers of distributed.py.
+        :return: Week of these pairs, empty if the graph has no more than subtree matchings
+        """
+        search = WeekSearch([v.id for v in self._order(sorting_algo)], self._partners())
+        pairs = next(itertools.islice(search.solutions(termination), subtree, None), None)
+        if pairs is None or (termination and termination.is_set()):
+            return Week(self.planning)
+        return self._commit([(self.planning[min(pair)], self.planning[max(pair)]) for pair in pairs])
+
+    def checkpoint(self):
+        """State of the cycle to resume it later: the weeks committed so far, and the frontier
+        of the week search aborted last, see search.WeekSearch.solutions. JSON serializable."""
+        return dict(version=2, employees=len(self.employees), week=self.week, weeks=[ids.tolist() for ids in self.committed], frontier=self.frontier)
+
+    def resume(self, checkpoint):
+        """Restarts the cycle from a checkpoint of the same employees: the weeks are committed again,
+        and the next search of the same sorting strategy with propagate resumes the frontier
+        :return: list of the Weeks replayed
+        """
+        if checkpoint.get('version') != 2 or checkpoint.get('employees') != len(self.employees):
+            raise ValueError(f'checkpoint not matching {len(self.employees)} employees')
+        self.reset()
+        weeks = []
+        for flat in checkpoint['weeks']:
+            weeks.append(self._commit([(self.planning[id1], self.planning[id2]) for id1, id2 in zip(flat[0::2], flat[1::2])]))
+        self.week = checkpoint['week']
+        self.frontier = checkpoint['frontier']
+        return weeks
+
+    def restore(self, history, *, team=''):
+        """Rebuilds the state of the graph from a history.History in one indexed query.
+        The weeks are replayed in order: a week pairing employees who already met in the
+        current cycle means a new cycle started, hence the graph is reset.
+        Employees unknown to this roster are ignored.
+        :return: number of weeks replayed
+        """
+        ids = {str(employee): idx for idx, employee in enumerate(self.employees)}
+        allows = self.exclusions.allows if self.exclusions else None
+
+        self.reset()
+        self.history = self._history()
+        self.week = 0
+        for _, rows in itertools.groupby(history.meetings(team=team), key=lambda row: row[0]):
+            edges = []
+            for _, name1, name2 in rows:
+                if name1 not in ids or name2 not in ids:
+                    continue
+                id1, id2 = min(ids[name1], ids[name2]), max(ids[name1], ids[name2])
+                if allows and not allows(id1, id2):
+                    continue
+                edges.append((id1, id2))
+
+            if any(self.planning[id2] not in self.planning[id1].neighbors for id1, id2 in edges):
+                self.reset()
+            for id1, id2 in edges:
+                self.planning[id1].remove(self.planning[id2])
+                self.history[self._pair(id1, id2)] = self.week
+            self.committed.append(array('I', [v for edge in edges for v in edge]))
+            self.week += 1
+            self.fresh = False
+        return self.week
+
+    def groups(self, size, *, rounds=None, seed=0):
+        """Rounds of groups of employees instead of pairs, everyone being in one group per round
+        and the repeats kept to a minimum, see groups.GroupPlanner. The exclusions are honored
+        whenever possible. Polynomial time, the graph is not explored.
+        :param size: size of the groups, the remaining employees join some of them
+        :param rounds: number of rounds, by default enough for everyone to meet everyone
+        :return: list of rounds, each a list of Group
+        """
+        allows = self.exclusions.allows if self.exclusions else None
+        planner = GroupPlanner(len(self.employees), size, allows=allows, seed=seed)
+        return [[Group(self.planning[id] for id in group) for group in groups] for groups in planner.rounds(rounds)]
+
+    def _history(self):
+        """empty pair history: 4 bytes per pair instead of a dict entry keyed by a tuple"""
+        n = len(self.employees)
+        return array('i', [-1]) * (n * (n - 1) // 2)
+
+    def _pair(self, id1, id2):
+        """index of the pair in the history: the pairs are numbered (0,1), (0,2), ... (1,2), ..."""
+        if id1 > id2:
+            id1, id2 = id2, id1
+        return id1 * (2 * len(self.employees) - id1 - 1) // 2 + id2 - id1 - 1
+
+    def score(self, employee1, employee2):
+        """Weight of a candidate pair for the weighted mode:
+        the number of weeks since they last met, plus a bonus if they belong to different departments"""
+        last = self.history[self._pair(employee1.id, employee2.id)]
+        score = self.week - last
+
+        department1 = getattr(employee1.data, 'department', None)
+        department2 = getattr(employee2.data, 'department', None)
+        if department1 != department2:
+            score += self.diversity
+        return score
+
+    def _weighted(self):
+        """Picks the N//2 pairs among the remaining edges with a maximum-weight perfect matching
+        Polynomial time, O(N^3), no exploration involved."""
+        if self.history is None:
+            self.history = self._history()
+        edges = [(v.id, n.id, self.score(v, n)) for v in self.planning for n in v.neighbors]
+        mate = max_weight_matching(edges, maxcardinality=True)
+
+        pairs = [(self.planning[v], self.planning[m]) for v, m in enumerate(mate) if v < m]
+        if len(pairs) != len(self):
+            # no perfect matching left in the graph
+            return []
+        return pairs
+
+    def _exact_cover(self, termination):
+        """Models the week as an exact cover: every employee (column) is covered
+        exactly once by a remaining edge (row), solved with Dancing Links."""
+        links = DancingLinks(v.id for v in self.planning)
+        for v in self.planning:
+            for n in v.neighbors:
+                links.add_row((v, n), (v.id, n.id))
+
+        return links.solve(termination) or []
+
+    def _planned(self, sorting_algo, solver, termination):
+        """Serves week after week a plan solved at once for all the remaining weeks of the cycle
+        :param solver: function solving the plan, returning a list of weeks of pairs of vertices
+        """
+        if self.plan and self.plan[0] == sorting_algo and self.plan[1] and all(n in v.neighbors for v, n in self.plan[1][0]):
+            return self.plan[1].pop(0)
+        self.plan = []
+
+        if self.fresh and sorting_algo in self.cycles:
+            weeks = [[(self.planning[id1], self.planning[id2]) for id1, id2 in week] for week in self.cycles[sorting_algo]]
+        else:
+            weeks = solver(termination)
+            if not weeks:
+                return []
+            if self.fresh:
+                self.cycles[sorting_algo] = [[(v.id, n.id) for v, n in week] for week in weeks]
+        self.plan = (sorting_algo, weeks)
+        return weeks.pop(0)
+
+    def _partners(self):
+        """vertex ID -> IDs of the vertices it can still meet, in both directions, highest ID first"""
+        partners = dict()
+        for v in self.planning:
+            partners.setdefault(v.id, [])
+            for n in v.neighbors:
+                partners[v.id].append(n.id)
+                partners.setdefault(n.id, []).append(v.id)
+        for candidates in partners.values():
+            candidates.sort(reverse=True)
+        return partners
+
+    def rotation(self, *, termination=None, budget=None):
+        """Searches all the remaining weeks of the cycle as one problem, backtracking across weeks
+        :param budget: maximum number of tentative pairs, None for no limit
+        :return: rotation.Rotation telling whether the rotation is complete, infeasible or out of budget
+        """
+        return RotationSolver(self._partners(), budget=budget).solve(termination)
+
+    def _backtrack_rotation(self, termination):
+        rotation = self.rotation(termination=termination)
+        return [[(self.planning[min(pair)], self.planning[max(pair)]) for pair in week] for week in rotation.weeks]
+
+    def _exact_cover_rotation(self, termination):
+        """Models all the remaining weeks of the cycle as one exact cover:
+        every (employee, week) is covered exactly once, every pair at most once."""
+        # as many weeks as the least connected employee allows
+        degrees = dict.fromkeys((v.id for v in self.planning), 0)
+        for v in self.planning:
+            for n in v.neighbors:
+                degrees[v.id] += 1
+                degrees[n.id] += 1
+        weeks = min(degrees.values(), default=0)
+        if weeks == 0:
+            return []
+
+        links = DancingLinks((v.id, week) for v in self.planning for week in range(weeks))
+        for v in self.planning:
+            for n in v.neighbors:
+                links.add_column(('pair', v.id, n.id), primary=False)
+                for week in range(weeks):
+                    links.add_row((week, v, n), (('pair', v.id, n.id), (v.id, week), (n.id, week)))
+
+        solution = links.solve(termination)
+        if not solution:
+            return []
 
-    def schedule(self, *, termination=None, sorting_algo=0):
-        """Explore the graph of possibilities to find N//2 pairs is they exist"""
+        plan = [[] for _ in range(weeks)]
+        for week, v, n in solution:
+            plan[week].append((v, n))
+        return plan
+
+    def _sample(self, termination):
+        """Tries self.batch random orders greedily, see sampling.GreedySampler. The greedy matching of
+        an order is the first branch the search explores from it: it is committed without search.
+        :return: list of N//2 pairs of vertices, empty if no order pairs everybody up"""
+        sampler = GreedySampler(self._partners())
+        with tracer.span('sample', cat='coffee', batch=self.batch, vectorized=sampler.vectorized):
+            found = sampler.run(self.batch, termination)
+        for key, value in sampler.stats.items():
+            self.stats[key] = self.stats.get(key, 0) + value
+        if found is None:
+            return []
+        # the search of the week is not resumed anymore
+        self.frontier = None
+        _, pairs = found
+        return [(self.planning[min(pair)], self.planning[max(pair)]) for pair in pairs]
+
+    def _complete(self):
+        """True if nobody met yet and nobody is excluded: all the employees are interchangeable"""
+        n = len(self.employees)
+        return self.fresh and n % 2 == 0 and self.planning.len_edges() == n * (n - 1) // 2
+
+    def _canonical(self):
+        """First week of the complete graph without search: as any perfect matching is the image
+        of any other by a relabeling of the employees, i is paired with N-1-i.
+        :return: list of N//2 pairs of vertices"""
+        self.stats['canonical'] = self.stats.get('canonical', 0) + 1
+        n = len(self.employees)
+        return [(self.planning[i], self.planning[n - 1 - i]) for i in range(n // 2)]
+
+    def _order(self, sorting_algo):
+        """important heuristics to sort the vertices according to a sorting strategy"""
+        match sorting_algo:
+            case 0:
+                sorted_vertices=sorted(self.planning.vertices, key=lambda x:(len(x),x.id))
+            case 1:
+                sorted_vertices=sorted(self.planning.vertices, key=lambda x:(-len(x),x.id))
+            case 2:
+                sorted_vertices=sorted(self.planning.vertices, key=lambda x:(-len(x),-x.id))
+            case 3:
+                sorted_vertices=sorted(self.planning.vertices, key=lambda x:(len(x),-x.id))
+            case 4:
+                # this random shuffling strategy means that if we shuffle the vertices enough times
+                # a proper list will be found to find the N//2 pairs
+                sorted_vertices = list(self.planning.vertices)
+                random.shuffle(sorted_vertices)
+            case _:
+                sorted_vertices=sorted(self.planning.vertices, key=lambda x:(len(x),x.id))
+        return sorted_vertices
+
+    def _search(self, termination, sorting_algo):
+        """Explore the graph with the iterative search and its forward checking
+        :return: list of N//2 pairs of vertices, empty if there is none"""
+        # an aborted search of this week goes on where it stopped, in the order it was exploring:
+        # the random strategy draws another order on every run
+        frontier, self.frontier = self.frontier, None
+        resume = frontier['search'] if frontier and frontier['sorting_algo'] == sorting_algo else None
+        order = resume['order'] if resume is not None else [v.id for v in self._order(sorting_algo)]
+        # same preference as browse: highest ID first
+        search = WeekSearch(order, self._partners(), symmetry=sorting_algo in Coffee.SYMMETRIC)
+        pairs = search.run(termination, resume=resume)
+        if search.frontier is not None:
+            self.frontier = dict(sorting_algo=sorting_algo, search=search.frontier)
+
+        for key, value in search.statistics.items():
+            self.stats[key] = self.stats.get(key, 0) + value
+
+        if not pairs:
+            return []
+        # same convention as browse: lowest ID first
+        return [(self.planning[min(pair)], self.planning[max(pair)]) for pair in pairs]
+
+    def _explore(self, termination, sorting_algo):
+        """Explore the graph with the recursive browse helper
+        :return: list of N//2 pairs of vertices"""
 
         def browse(employees, available, meetings, length):
             """recusrive helper to find the next correct candidate pair"""
@@ -154,29 +645,10 @@ class Coffee():
         available   = dict()
         employees   = []
         edges       = list()
-        meetings    = LinkedList()
 
 
-        # important heuristics to sort the vertices according to a sorting strategy
-        match sorting_algo:
-            case 0:
-                sorted_vertices=sorted(self.planning.vertices, key=lambda x:(len(x),x.id))
-            case 1:
-                sorted_vertices=sorted(self.planning.vertices, key=lambda x:(-len(x),x.id))
-            case 2:
-                sorted_vertices=sorted(self.planning.vertices, key=lambda x:(-len(x),-x.id))
-            case 3:
-                sorted_vertices=sorted(self.planning.vertices, key=lambda x:(len(x),-x.id))
-            case 4:
-                # this random shuffling strategy means that if we shuffle the vertices enough times
-                # a proper list will be found to find the N//2 pairs
-                sorted_vertices = list(self.planning.vertices)
-                random.shuffle(sorted_vertices)
-            case _:
-                sorted_vertices=sorted(self.planning.vertices, key=lambda x:(len(x),x.id))
-
         #for node in an ordered set of vertices:
-        for node in sorted_vertices:
+        for node in self._order(sorting_algo):
             if len(node) != 0:
                 employees.append(node)
             available[node] = True
@@ -195,31 +667,8 @@ class Coffee():
                 # this test may be redundant with the previous one
                 break
             browse(employees, available, edges, len(self))
-            
-
 
-
-        if termination and termination.is_set():
-            # in case the process was aborted, return nothing since the data are meaningless
-            return []
-            
-        # critical section to update the graph by removing the edges between the employees
-        # who've been paired up so that they're not picked during the next iterations
-        # that section can ONLY be exercised if no abort signal has been raised
-
-        # QA assertion - can be disabled via the __debug__ option
-        assert len(edges) in [0,len(self)], f'bug: {len(edges)} != [0, {len(self)}]'
-
-
-        for employee1, employee2 in edges:
-            if employee1 in employee2.neighbors:
-                employee2.remove(employee1)
-            if employee2 in employee1.neighbors:
-                employee1.remove(employee2)
-            meetings.append(Meeting(employee1, employee2))
-
-        return meetings
-        
+        return edges
 
 
 @Timer(enable=True,timeout=None)
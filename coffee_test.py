@@ -1,9 +1,14 @@
-
 from coffee import *
 from employee import *
 import unittest
+import json
+import itertools
+import random
 from linkedlist import LinkedList
 from threading import Event
+from graph import Vertex
+from exclusion import Exclusions
+import sampling
 
 class TestMeeting(unittest.TestCase):
     def test_creation(self):
@@ -15,6 +20,40 @@ class TestMeeting(unittest.TestCase):
         self.assertIs(m.employee2,e2)
 
 
+    def test_slots(self):
+        m = Meeting(Employee(), Employee())
+        with self.assertRaises(AttributeError):
+            m.foo = 1
+
+
+class TestWeek(unittest.TestCase):
+    def test_creation(self):
+        vs = [Vertex(x, Employee()) for x in range(4)]
+        w = Week(vs)
+        self.assertEqual(len(w), 0)
+        self.assertEqual(str(w), '[]')
+
+        w.add(vs[0], vs[3])
+        w.add(vs[1], vs[2])
+        self.assertEqual(len(w), 2)
+        self.assertEqual(list(w.pairs()), [(0, 3), (1, 2)])
+        self.assertEqual(len(w.ids), 4)
+
+    def test_iter(self):
+        vs = [Vertex(x, Employee()) for x in range(4)]
+        w = Week(vs, [(0, 3), (1, 2)])
+
+        meetings = list(w)
+        self.assertEqual(len(meetings), 2)
+        self.assertIs(meetings[0].employee1, vs[0])
+        self.assertIs(meetings[0].employee2, vs[3])
+        self.assertIs(w[1].employee1, vs[1])
+        self.assertEqual(str(w), '[' + str(meetings[0]) + ', ' + str(meetings[1]) + ']')
+
+        with self.assertRaises(IndexError):
+            w[2]
+
+
 class TestCoffee(unittest.TestCase):
     def test_creation(self):
         es = Employees()
@@ -23,6 +62,22 @@ class TestCoffee(unittest.TestCase):
 
         self.assertEqual(len(coffee),len(es)//2)
 
+    def test_exclusions(self):
+        es = Employees()
+        es.fill(number=6)
+        for idx, e in enumerate(es):
+            e.manager = idx // 2
+        coffee = Coffee(es, exclusions=Exclusions(same=['manager'], pairs=[(es[0], es[5])]))
+
+        # the forbidden edges are pruned from the graph before any search
+        self.assertEqual(coffee.planning.len_edges(), 15 - 3 - 1)
+
+        meetings = next(iter(coffee))
+        self.assertEqual(len(meetings), 3)
+        for id1, id2 in meetings.pairs():
+            self.assertNotEqual(id1 // 2, id2 // 2)
+            self.assertNotEqual({id1, id2}, {0, 5})
+
     def test_iter(self):
         es = Employees()
         es.fill(number=4)
@@ -92,6 +147,337 @@ class TestCoffee(unittest.TestCase):
 
             self.assertEqual(cpt,len(es)-1)
 
+    def test_propagate(self):
+        es = Employees()
+        es.fill(number=16)
+
+        for algo in range(5):
+            # the search itself, not the batches of random orders
+            coffee = Coffee(es, batch=0)
+            cpt = 0
+            for w in coffee.feed(sorting_algo=algo, propagate=True):
+                cpt += 1
+                self.assertEqual(len(w),len(es)//2)
+                for id1, id2 in w.pairs():
+                    self.assertLess(id1, id2)
+            self.assertGreater(cpt,0)
+            self.assertGreater(coffee.stats['nodes'],0)
+            self.assertIn('pruned',coffee.stats)
+            self.assertIn('forced',coffee.stats)
+
+    def test_propagate_no_solution(self):
+        es = Employees()
+        es.fill(number=4)
+        # E1 can only meet E2, and so does E4: no week is possible
+        exclusions = Exclusions(pairs=[(es[0], es[2]), (es[0], es[3]), (es[3], es[2])])
+        coffee = Coffee(es, exclusions=exclusions)
+        self.assertEqual(len(coffee.schedule(propagate=True)),0)
+        self.assertGreater(coffee.stats['pruned'],0)
+
+    def test_weighted(self):
+        es = Employees()
+        es.fill(number=8)
+        coffee = Coffee(es)
+
+        cpt = 0
+        for w in coffee.feed(sorting_algo=Coffee.WEIGHTED):
+            cpt += 1
+            self.assertEqual(len(w),len(es)//2)
+        self.assertEqual(cpt,len(es)-1)
+        self.assertEqual(coffee.planning.len_edges(),0)
+
+    def test_weighted_history(self):
+        es = Employees()
+        es.fill(number=6)
+        coffee = Coffee(es)
+
+        it = coffee.feed(endless=True, sorting_algo=Coffee.WEIGHTED)
+        weeks = [next(it) for _ in range(len(es))]
+        self.assertTrue(weeks[-1][1])
+
+        # the first week of the new cycle does not repeat the last week of the previous cycle
+        last = set(weeks[-2][0].pairs())
+        self.assertFalse(last & set(weeks[-1][0].pairs()))
+
+    def test_weighted_diversity(self):
+        es = Employees()
+        for idx in range(6):
+            es.add(Employee(department=idx % 3))
+        coffee = Coffee(es, diversity=10)
+
+        w = coffee.schedule(sorting_algo=Coffee.WEIGHTED)
+        for m in w:
+            self.assertNotEqual(m.employee1.data.department, m.employee2.data.department)
+
+    def test_dlx(self):
+        es = Employees()
+        es.fill(number=8)
+        coffee = Coffee(es)
+
+        w = coffee.schedule(sorting_algo=Coffee.DLX)
+        self.assertEqual(len(w),len(es)//2)
+        self.assertEqual(coffee.planning.len_edges(),28-4)
+
+    def test_dlx_rotation(self):
+        for number in [2, 4, 10, 18, 26]:
+            es = Employees()
+            es.fill(number=number)
+            coffee = Coffee(es)
+
+            cpt = 0
+            for w in coffee.feed(sorting_algo=Coffee.DLX_ROTATION):
+                cpt += 1
+                self.assertEqual(len(w),len(es)//2)
+            self.assertEqual(cpt,len(es)-1)
+            self.assertEqual(coffee.planning.len_edges(),0)
+
+    def test_backtrack(self):
+        for number in [2, 4, 10, 16]:
+            es = Employees()
+            es.fill(number=number)
+            coffee = Coffee(es)
+
+            cpt = 0
+            for w in coffee.feed(sorting_algo=Coffee.BACKTRACK):
+                cpt += 1
+                self.assertEqual(len(w),len(es)//2)
+            self.assertEqual(cpt,len(es)-1)
+            self.assertEqual(coffee.planning.len_edges(),0)
+
+    def test_base(self):
+        es = Employees()
+        es.fill(number=10)
+        base = Coffee.base_graph(es)
+        coffee1 = Coffee(es, base=base)
+        coffee2 = Coffee(es, base=base)
+
+        self.assertEqual(len(list(coffee1.feed(sorting_algo=Coffee.DLX_ROTATION))),9)
+        self.assertEqual(coffee1.planning.len_edges(),0)
+        # the base graph is shared, not modified
+        self.assertEqual(base.edges,45)
+        self.assertEqual(coffee2.planning.len_edges(),45)
+        self.assertEqual(len(list(coffee2.feed(sorting_algo=Coffee.BACKTRACK))),9)
+
+        coffee1.reset()
+        self.assertEqual(coffee1.planning.len_edges(),45)
+
+        exclusions = Exclusions(pairs=[(es[0], es[1])])
+        self.assertEqual(Coffee.base_graph(es, exclusions=exclusions).edges,44)
+
+    def test_cycles(self):
+        es = Employees()
+        es.fill(number=10)
+        coffee = Coffee(es)
+
+        first = [str(w) for w, _ in itertools.islice(coffee.feed(endless=True, sorting_algo=Coffee.DLX_ROTATION), 9)]
+        self.assertEqual(list(coffee.cycles), [Coffee.DLX_ROTATION])
+        # the next cycle replays the plan solved from the full graph
+        second = [str(w) for w, _ in itertools.islice(coffee.feed(endless=True, sorting_algo=Coffee.DLX_ROTATION), 9)]
+        self.assertEqual(first, second)
+        self.assertEqual(coffee.planning.len_edges(),0)
+
+    def test_cycle(self):
+        es = Employees()
+        es.fill(number=16)
+        # strategy 2 completes 16 employees, 0 does not
+        coffee = Coffee(es)
+        cycle = coffee.cycle(sorting_algo=2, every=2)
+        pauses = 0
+        try:
+            while True:
+                self.assertIsNone(next(cycle))
+                pauses += 1
+        except StopIteration as stop:
+            weeks = stop.value
+        self.assertGreater(pauses, 0)
+        self.assertEqual(len(weeks),15)
+        self.assertEqual(coffee.planning.len_edges(),0)
+        for w in weeks:
+            self.assertEqual(len(w),8)
+
+        # the first employee can meet nobody: dead end
+        coffee = Coffee(es, exclusions=Exclusions(pairs=[(es[0], e) for e in es]))
+        cycle = coffee.cycle(sorting_algo=0)
+        with self.assertRaises(StopIteration) as stop:
+            while True:
+                next(cycle)
+        self.assertIsNone(stop.exception.value)
+
+    def test_rotation(self):
+        es = Employees()
+        es.fill(number=8)
+        coffee = Coffee(es)
+        coffee.schedule(sorting_algo=Coffee.WEIGHTED)
+
+        # the 6 remaining weeks are searched without touching the graph
+        rotation = coffee.rotation()
+        self.assertTrue(rotation)
+        self.assertEqual(len(rotation),6)
+        self.assertEqual(coffee.planning.len_edges(),28-4)
+
+        self.assertEqual(coffee.rotation(budget=0).status,'budget')
+
+    def test_groups(self):
+        es = Employees()
+        es.fill(number=9)
+        for idx, e in enumerate(es):
+            e.manager = idx % 3
+        rounds = Coffee(es).groups(3)
+        self.assertEqual(len(rounds), 4)
+        self.assertEqual(str(rounds[0][0]), '(' + ', '.join(str(es[i].name) for i in range(3)) + ')')
+        for groups in rounds:
+            self.assertEqual(sorted(e.id for group in groups for e in group), list(range(9)))
+
+        # the exclusions are honored: a group gathers employees with different managers
+        rounds = Coffee(es, exclusions=Exclusions(same=['manager'])).groups(3, rounds=2)
+        self.assertEqual(len(rounds), 2)
+        for groups in rounds:
+            for group in groups:
+                self.assertEqual(len(group), 3)
+                self.assertEqual(len({e.data.manager for e in group}), 3)
+
+    def test_branch(self):
+        es = Employees()
+        es.fill(number=6)
+        firsts = set()
+        for subtree in range(15):
+            coffee = Coffee(es)
+            week = coffee.branch(subtree, sorting_algo=1)
+            self.assertEqual(len(week), 3)
+            self.assertEqual(coffee.planning.len_edges(), 15 - 3)
+            firsts.add(tuple(sorted(tuple(sorted(pair)) for pair in week.pairs())))
+        # the 15 perfect matchings of 6 employees are distinct subtrees
+        self.assertEqual(len(firsts), 15)
+
+        coffee = Coffee(es)
+        self.assertEqual(len(coffee.branch(15)), 0)
+        self.assertEqual(coffee.planning.len_edges(), 15)
+
+    def test_checkpoint(self):
+        es = Employees()
+        es.fill(number=12)
+        expected = [list(week.pairs()) for week in Coffee(es).feed(sorting_algo=1, propagate=True)]
+
+        # a token aborting each week search after a few checks
+        class Budget():
+            def __init__(self, checks):
+                self.checks = checks
+            def is_set(self):
+                self.checks -= 1
+                return self.checks < 0
+
+        checkpoint = None
+        weeks = []
+        for runs in range(1000):
+            coffee = Coffee(es)
+            if checkpoint:
+                self.assertEqual(len(coffee.resume(checkpoint)), len(checkpoint['weeks']))
+            weeks = [list(zip(ids[0::2], ids[1::2])) for ids in coffee.committed]
+            for week in coffee.feed(asynchronous_signal=Budget(8), sorting_algo=1, propagate=True):
+                weeks.append(list(week.pairs()))
+            if coffee.frontier is None and len(weeks) == len(expected):
+                break
+            checkpoint = json.loads(json.dumps(coffee.checkpoint()))
+        self.assertEqual(weeks, expected)
+        self.assertGreater(runs, 2)
+
+        with self.assertRaises(ValueError):
+            Coffee(es).resume(dict(checkpoint, employees=10))
+
+    def test_checkpoint_random(self):
+        es = Employees()
+        es.fill(number=20)
+        random.seed(48)
+
+        class Budget():
+            def __init__(self, checks):
+                self.checks = checks
+            def is_set(self):
+                self.checks -= 1
+                return self.checks < 0
+
+        coffee = Coffee(es, batch=0)
+        week = coffee.schedule(termination=Budget(2), sorting_algo=Coffee.RANDOM, propagate=True)
+        self.assertEqual(len(week), 0)
+        checkpoint = json.loads(json.dumps(coffee.checkpoint()))
+
+        # the order drawn by the random strategy is not drawn again when the search resumes
+        weeks = []
+        for seed in range(2):
+            random.seed(seed)
+            coffee = Coffee(es, batch=0)
+            coffee.resume(checkpoint)
+            weeks.append(list(coffee.schedule(sorting_algo=Coffee.RANDOM, propagate=True).pairs()))
+        self.assertEqual(len(weeks[0]), 10)
+        self.assertEqual(weeks[0], weeks[1])
+
+    def test_symmetry(self):
+        es = Employees()
+        es.fill(number=10)
+        for algo in Coffee.SYMMETRIC:
+            coffee = Coffee(es)
+            # the first week of the complete graph is not searched
+            first = coffee.schedule(sorting_algo=algo, propagate=True)
+            self.assertEqual(list(first.pairs()), [(i, 9 - i) for i in range(5)])
+            self.assertEqual(coffee.stats, dict(canonical=1))
+            for week in coffee.feed(sorting_algo=algo, propagate=True):
+                self.assertEqual(len(week), 5)
+            self.assertIn('symmetric', coffee.stats)
+
+        # no canonical week once someone is excluded
+        coffee = Coffee(es, exclusions=Exclusions(pairs=[(es[0], es[9])]))
+        self.assertNotIn((0, 9), list(coffee.schedule(sorting_algo=1).pairs()))
+        self.assertNotIn('canonical', coffee.stats)
+
+        coffee = Coffee(es, batch=0)
+        coffee.schedule(sorting_algo=4, propagate=True)
+        self.assertEqual(coffee.stats['symmetric'], 0)
+
+    def test_sample(self):
+        es = Employees()
+        es.fill(number=12)
+        random.seed(0)
+        coffee = Coffee(es)
+        week = coffee.schedule(sorting_algo=Coffee.RANDOM)
+        self.assertEqual(len(week), 6)
+        # the week came from the batch of orders, not from the search
+        self.assertEqual(coffee.stats['hits'], 1)
+        self.assertGreater(coffee.stats['orders'], 0)
+        self.assertEqual(coffee.planning.len_edges(), 66 - 6)
+
+        coffee = Coffee(es, batch=0)
+        self.assertEqual(len(coffee.schedule(sorting_algo=Coffee.RANDOM, propagate=True)), 6)
+        self.assertNotIn('orders', coffee.stats)
+
+    @unittest.skipUnless(sampling.numpy, 'numpy is not installed')
+    def test_sample_vectorized(self):
+        es = Employees()
+        es.fill(number=30)
+        random.seed(0)
+        coffee = Coffee(es)
+        week = coffee.schedule(sorting_algo=Coffee.RANDOM)
+        self.assertEqual(len(week), 15)
+        # any order pairs everybody up in the complete graph: the first chunk of the batch is enough
+        self.assertEqual(coffee.stats['orders'], sampling.GreedySampler.CHUNK)
+        self.assertEqual(coffee.stats['hits'], 1)
+
+        pairs = list(week.pairs())
+        for week in coffee.feed(sorting_algo=Coffee.RANDOM):
+            self.assertEqual(len(week), 15)
+            pairs += week.pairs()
+        self.assertEqual(len(set(pairs)), len(pairs))
+
+    def test_dlx_termination(self):
+        es = Employees()
+        es.fill(number=8)
+        coffee = Coffee(es)
+        sig = Event()
+        sig.set()
+
+        for algo in [Coffee.DLX, Coffee.DLX_ROTATION, Coffee.BACKTRACK]:
+            self.assertEqual(len(coffee.schedule(termination=sig, sorting_algo=algo)),0)
+        self.assertEqual(coffee.planning.len_edges(),28)
+
     def test_feed_termination(self):
         es = Employees()
         es.fill(number=4)
@@ -0,0 +1,324 @@
+"""
+Search of a whole rotation distributed over worker processes.
+
+The coordinator listens on a multiprocessing.connection Listener, on this
+host or reachable from others. The workers, local processes or started on
+other hosts with `main.py --worker host:port`, connect and pull work units
+one at a time:
+
+    worker                         coordinator
+    ('ready',)              ->
+                            <-     ('work', Unit) or ('stop',)
+    ('heartbeat', id, s)    ->     every HEARTBEAT seconds while working
+                            <-     ('cancel',) once another unit succeeded
+    ('result', id, weeks)   ->     weeks as lists of (id1, id2), None on failure
+
+A unit is a (strategy, seed, subtree) triple: the sorting strategy, the seed
+of the random module for the randomized strategies, and the subtree-th
+perfect matching imposed as the first week (see Coffee.branch), so that the
+units explore disjoint parts of the search space. A unit has a budget in
+seconds, enforced by the watchdog of the worker.
+
+On the first complete rotation, the busy workers are cancelled and every
+worker is told to stop when it asks for more work. The units of a worker
+which disconnects, or stays silent for LOST seconds, are handed out again.
+The employees are identified by their position in the roster: both sides
+build the same roster from its size.
+
+The messages are pickled: whoever holds the key of the connections can run
+code on the other end. The local workers share a random key with their
+coordinator. Across hosts, the key is the secret $COFFEE_AUTHKEY, without
+which the coordinator does not listen beyond this host and no worker
+connects.
+"""
+
+__author__ = "Bertrand Blanc (Alan Turing)"
+__all__ = ["AUTHKEY", "shared_key", "Unit", "Coordinator", "work", "spawn"]
+
+from multiprocessing.connection import Listener, Client
+from threading import Condition, Event, Lock, Thread
+from coffee import Coffee
+from employee import Employees
+from watchdog import watchdog
+import multiprocessing
+import os
+import random
+import socket
+import time
+
+# environment variable of the secret shared with the workers of other hosts
+AUTHKEY = 'COFFEE_AUTHKEY'
+
+
+def shared_key():
+    """key of the connections across hosts, see multiprocessing.connection
+    :return: $COFFEE_AUTHKEY as bytes, None if it is not set
+    """
+    key = os.environ.get(AUTHKEY)
+    return key.encode() if key else None
+
+
+class Unit():
+    """Work unit: a strategy exploring one subtree of the first week"""
+    __slots__ = ('id', 'strategy', 'seed', 'subtree', 'budget')
+
+    def __init__(self, id, strategy, seed, subtree, budget):
+        """
+        :param strategy: sorting_algo of Coffee
+        :param seed: seed of the random module
+        :param subtree: index of the perfect matching imposed as the first week, None for none
+        :param budget: seconds granted to the unit
+        """
+        self.id = id
+        self.strategy = strategy
+        self.seed = seed
+        self.subtree = subtree
+        self.budget = budget
+
+    def __str__(self):
+        return f'unit {self.id}: strategy {self.strategy}, seed {self.seed}, subtree {self.subtree}'
+
+    @staticmethod
+    def plan(strategies, subtrees, budget):
+        """units of each strategy over the first subtrees, the subtrees interleaved"""
+        return [Unit(idx, strategy, subtree, subtree, budget)
+                for idx, (subtree, strategy) in enumerate((s, a) for s in range(subtrees) for a in strategies)]
+
+
+def solve(employees, unit, termination, *, propagate=False):
+    """Runs a unit
+    :param employees: number of employees
+    :param termination: token of the unit
+    :return: the weeks of the rotation as lists of (id1, id2), None if it is not complete
+    """
+    roster = Employees()
+    roster.fill(number=employees)
+    coffee = Coffee(roster)
+    random.seed(unit.seed)
+
+    weeks = []
+    if unit.subtree is not None:
+        first = coffee.branch(unit.subtree, sorting_algo=unit.strategy, termination=termination)
+        if not len(first):
+            return None
+        weeks.append(list(first.pairs()))
+    for week in coffee.feed(asynchronous_signal=termination, sorting_algo=unit.strategy, propagate=propagate):
+        weeks.append(list(week.pairs()))
+    if termination.is_set() or len(weeks) != employees - 1:
+        return None
+    return weeks
+
+
+def work(address, *, authkey, heartbeat=None):
+    """Worker loop: pulls units from the coordinator until told to stop
+    :param address: address of the coordinator, (host, port) or path
+    :param authkey: key of the coordinator, see Coordinator.authkey
+    :param heartbeat: seconds between two heartbeats, Coordinator.HEARTBEAT by default
+    :return: number of units run
+    """
+    heartbeat = heartbeat or Coordinator.HEARTBEAT
+    connection = Client(address, authkey=authkey)
+    sending = Lock()
+    runs = 0
+    try:
+        # the problem is sent first
+        employees, propagate = connection.recv()
+        while True:
+            with sending:
+                connection.send(('ready',))
+            message = connection.recv()
+            while message[0] == 'cancel':
+                # cancellation of a unit already over
+                message = connection.recv()
+            if message[0] == 'stop':
+                return runs
+            unit = message[1]
+
+            token = watchdog.watch(unit.budget, name=str(unit))
+            over = Event()
+
+            def beat():
+                start = time.monotonic()
+                while not over.wait(heartbeat):
+                    with sending:
+                        connection.send(('heartbeat', unit.id, time.monotonic() - start))
+                    while connection.poll():
+                        if connection.recv()[0] == 'cancel':
+                            token.cancel()
+
+            beating = Thread(target=beat, name='heartbeat', daemon=True)
+            beating.start()
+            try:
+                weeks = solve(employees, unit, token, propagate=propagate)
+            finally:
+                token.finish()
+                over.set()
+                beating.join()
+            runs += 1
+            with sending:
+                connection.send(('result', unit.id, weeks))
+    except (EOFError, OSError):
+        # the coordinator is gone
+        return runs
+    finally:
+        connection.close()
+
+
+def spawn(address, count, *, authkey):
+    """Starts local worker processes
+    :param authkey: key of the coordinator, see Coordinator.authkey
+    :return: list of the started multiprocessing.Process
+    """
+    workers = [multiprocessing.Process(target=work, args=(address,), kwargs=dict(authkey=authkey), daemon=True)
+               for _ in range(count)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+class Coordinator():
+    """Hands the units out to the workers until a rotation is found"""
+
+    # seconds between two heartbeats, and of silence before a worker is considered lost
+    HEARTBEAT = 0.5
+    LOST = 10
+
+    def __init__(self, employees, units, *, address=('127.0.0.1', 0), authkey=None, propagate=False):
+        """
+        :param employees: number of employees
+        :param units: list of Unit, handed out in this order
+        :param address: address to listen on, the port 0 picks a free one, see self.address
+        :param authkey: key of the connections, shared_key() for the workers of other hosts.
+        A random key by default, handed to the local workers by spawn.
+        :param propagate: forward checking in the search of the workers
+        """
+        self.employees = employees
+        self.pending = list(reversed(units))
+        self.propagate = propagate
+        self.authkey = authkey or os.urandom(32)
+        self.listener = Listener(address, authkey=self.authkey)
+        self.address = self.listener.address
+
+        self.condition = Condition()
+        # connection -> unit being run, None if idle
+        self.busy = dict()
+        self.done = False
+        self.result = None
+        self.stats = dict(units=0, heartbeats=0, lost=0, workers=0)
+        self.thread = Thread(target=self._accept, name='coordinator', daemon=True)
+        self.thread.start()
+
+    def _accept(self):
+        while True:
+            try:
+                connection = self.listener.accept()
+            except Exception:
+                if self.done:
+                    return
+                # failed handshake of a stranger
+                continue
+            if self.done:
+                connection.close()
+                return
+            with self.condition:
+                self.busy[connection] = None
+                self.stats['workers'] += 1
+            Thread(target=self._serve, args=(connection,), name='worker', daemon=True).start()
+
+    def _send(self, connection, message):
+        try:
+            connection.send(message)
+        except OSError:
+            pass
+
+    def _serve(self, connection):
+        """exchanges with a worker"""
+        self._send(connection, (self.employees, self.propagate))
+        try:
+            while True:
+                if not connection.poll(Coordinator.LOST):
+                    with self.condition:
+                        self.stats['lost'] += 1
+                    break
+                message = connection.recv()
+                with self.condition:
+                    match message[0]:
+                        case 'ready':
+                            if self.done or not self.pending:
+                                self._send(connection, ('stop',))
+                                break
+                            unit = self.pending.pop()
+                            self.busy[connection] = unit
+                            self._send(connection, ('work', unit))
+                        case 'heartbeat':
+                            self.stats['heartbeats'] += 1
+                        case 'result':
+                            _, _, weeks = message
+                            unit, self.busy[connection] = self.busy[connection], None
+                            self.stats['units'] += 1
+                            if weeks is not None and not self.done:
+                                self.result = (unit, weeks)
+                                self._finish()
+                    self.condition.notify_all()
+        except (EOFError, OSError):
+            pass
+        finally:
+            with self.condition:
+                unit = self.busy.pop(connection, None)
+                if unit is not None and not self.done:
+                    # the unit of a lost worker is handed out again
+                    self.pending.append(unit)
+                self.condition.notify_all()
+            connection.close()
+
+    def _finish(self):
+        """stops the search, the busy workers are cancelled. The condition is held."""
+        if self.done:
+            return
+        self.done = True
+        for connection, unit in self.busy.items():
+            if unit is not None:
+                self._send(connection, ('cancel',))
+        self.condition.notify_all()
+
+    def _exhausted(self):
+        return not self.pending and all(unit is None for unit in self.busy.values())
+
+    def run(self, timeout=None):
+        """Waits for the first rotation
+        :param timeout: seconds before giving up, None for no limit
+        :return: (Unit, weeks) of the first complete rotation, None if there is none
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            # the search is over once a unit succeeded, or all the units were run by the workers
+            while not self.done and not (self._exhausted() and self.stats['workers']):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+            self._finish()
+            return self.result
+
+    def close(self):
+        """stops listening"""
+        with self.condition:
+            self._finish()
+        address = self.listener.address
+        # wakes the accepting thread up with a connection failing the handshake
+        try:
+            if isinstance(address, tuple):
+                socket.create_connection(address, timeout=1).close()
+            else:
+                with socket.socket(socket.AF_UNIX) as probe:
+                    probe.connect(address)
+        except OSError:
+            pass
+        self.thread.join(1)
+        self.listener.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,98 @@
+from distributed import *
+from coffee import Coffee
+from multiprocessing.connection import AuthenticationError, Client
+import itertools
+import os
+import unittest
+import time
+
+
+class TestDistributed(unittest.TestCase):
+    def _check(self, employees, weeks):
+        self.assertEqual(len(weeks), employees - 1)
+        met = set()
+        for pairs in weeks:
+            self.assertEqual(sorted(itertools.chain(*pairs)), list(range(employees)))
+            met.update((min(pair), max(pair)) for pair in pairs)
+        self.assertEqual(len(met), employees * (employees - 1) // 2)
+
+    def test_plan(self):
+        units = Unit.plan((1, 7), 2, 3)
+        self.assertEqual([(unit.id, unit.strategy, unit.subtree) for unit in units], [(0, 1, 0), (1, 7, 0), (2, 1, 1), (3, 7, 1)])
+        self.assertTrue(all(unit.budget == 3 for unit in units))
+
+    def test_solve(self):
+        units = Unit.plan((Coffee.DLX_ROTATION,), 3, 5)
+        with Coordinator(12, units) as coordinator:
+            workers = spawn(coordinator.address, 2, authkey=coordinator.authkey)
+            unit, weeks = coordinator.run(timeout=30)
+        for worker in workers:
+            worker.join(5)
+            self.assertEqual(worker.exitcode, 0)
+        self._check(12, weeks)
+        self.assertEqual(unit.strategy, Coffee.DLX_ROTATION)
+        self.assertEqual(coordinator.stats['workers'], 2)
+
+    def test_cancel(self):
+        # strategy 0 spins until its budget runs out at 10 employees, the exact cover does not
+        units = [Unit(0, 0, 0, None, 30), Unit(1, Coffee.DLX_ROTATION, 0, None, 30)]
+        start = time.monotonic()
+        with Coordinator(10, units) as coordinator:
+            workers = spawn(coordinator.address, 2, authkey=coordinator.authkey)
+            unit, weeks = coordinator.run(timeout=30)
+            for worker in workers:
+                worker.join(10)
+        self.assertLess(time.monotonic() - start, 10)
+        self.assertEqual(unit.id, 1)
+        self._check(10, weeks)
+
+    def test_exhausted(self):
+        # none of these units schedules the whole cycle of 10 employees within its budget
+        units = [Unit(idx, 2, 0, subtree, 0.5) for idx, subtree in enumerate([None, 0])]
+        with Coordinator(10, units) as coordinator:
+            workers = spawn(coordinator.address, 1, authkey=coordinator.authkey)
+            self.assertIsNone(coordinator.run(timeout=30))
+        for worker in workers:
+            worker.join(5)
+        self.assertEqual(coordinator.stats['units'], 2)
+
+    def test_authkey(self):
+        units = [Unit(0, Coffee.DLX_ROTATION, 0, None, 5)]
+        with Coordinator(8, units) as coordinator:
+            # a random key by default: a stranger cannot connect
+            self.assertEqual(len(coordinator.authkey), 32)
+            with self.assertRaises(AuthenticationError):
+                Client(coordinator.address, authkey=b'coffee')
+        with Coordinator(8, []) as other:
+            self.assertNotEqual(other.authkey, coordinator.authkey)
+
+        environ = os.environ.pop(AUTHKEY, None)
+        try:
+            self.assertIsNone(shared_key())
+            os.environ[AUTHKEY] = 'secret'
+            self.assertEqual(shared_key(), b'secret')
+        finally:
+            os.environ.pop(AUTHKEY, None)
+            if environ is not None:
+                os.environ[AUTHKEY] = environ
+
+    def test_lost(self):
+        units = [Unit(0, Coffee.DLX_ROTATION, 0, 0, 5)]
+        with Coordinator(8, units) as coordinator:
+            # a worker vanishing with its unit
+            connection = Client(coordinator.address, authkey=coordinator.authkey)
+            self.assertEqual(connection.recv(), (8, False))
+            connection.send(('ready',))
+            self.assertEqual(connection.recv()[1].id, 0)
+            connection.close()
+
+            workers = spawn(coordinator.address, 1, authkey=coordinator.authkey)
+            unit, weeks = coordinator.run(timeout=30)
+        for worker in workers:
+            worker.join(5)
+        self.assertEqual(unit.id, 0)
+        self._check(8, weeks)
+
+
+if __name__ == "__main__":
+    unittest.main(argv=['ignore'], exit=False, verbosity=2)
@@ -0,0 +1,218 @@
+"""
+Knuth's Algorithm X with Dancing Links.
+
+The rows and columns of the exact-cover matrix are circular doubly linked
+lists built from TwoWayNode: previous/next link a row (left/right), and the
+extra up/down links chain a column. Covering a column unlinks it from the
+header and unlinks every row going through it; uncovering relinks them in
+reverse order, in O(1) per node since each removed node still knows its
+neighbours.
+
+The search is iterative (explicit stack of chosen rows) so the depth is not
+bounded by the Python recursion limit, and it picks the column with the least
+candidate rows first.
+"""
+
+__author__ = "Bertrand Blanc (Alan Turing)"
+__all__ = ["DancingNode", "Column", "DancingLinks"]
+
+from node import TwoWayNode
+
+
+class DancingNode(TwoWayNode):
+    """TwoWayNode also linked vertically within its column"""
+    __slots__ = ('up', 'down', 'column')
+
+    def __init__(self, data=None, column=None):
+        TwoWayNode.__init__(self, data)
+        self.previous = self.next = self
+        self.up = self.down = self
+        self.column = column
+
+
+class Column(DancingNode):
+    """Column header counting the rows still linked in the column"""
+    __slots__ = ('size',)
+
+    def __init__(self, data=None):
+        DancingNode.__init__(self, data)
+        self.column = self
+        self.size = 0
+
+
+class DancingLinks():
+    """Exact-cover problem: select rows covering every column exactly once"""
+
+    def __init__(self, columns=None):
+        """
+        :param columns: iterable of hashable column identifiers
+        """
+        self.root = Column('root')
+        self.columns = dict()
+        self.rows = 0
+        self.nodes = 0
+        for data in columns or []:
+            self.add_column(data)
+
+    def add_column(self, data, primary=True):
+        """appends a column to the header
+        :param primary: primary columns shall be covered exactly once,
+        secondary columns at most once (they are not linked to the header)
+        """
+        assert data not in self.columns
+        column = Column(data)
+        if primary:
+            column.previous = self.root.previous
+            column.next = self.root
+            self.root.previous.next = column
+            self.root.previous = column
+        self.columns[data] = column
+        return column
+
+    def add_row(self, data, columns):
+        """appends a row holding data and covering the given column identifiers"""
+        first = None
+        for key in columns:
+            column = self.columns[key]
+            node = DancingNode(data, column)
+
+            node.up = column.up
+            node.down = column
+            column.up.down = node
+            column.up = node
+            column.size += 1
+
+            if first is None:
+                first = node
+            else:
+                node.previous = first.previous
+                node.next = first
+                first.previous.next = node
+                first.previous = node
+        self.rows += 1
+        return first
+
+    @staticmethod
+    def cover(column):
+        """removes the column from the header and every row going through it from the other columns"""
+        column.next.previous = column.previous
+        column.previous.next = column.next
+        row = column.down
+        while row is not column:
+            node = row.next
+            while node is not row:
+                node.down.up = node.up
+                node.up.down = node.down
+                node.column.size -= 1
+                node = node.next
+            row = row.down
+
+    @staticmethod
+    def uncover(column):
+        """exact reverse of cover"""
+        row = column.up
+        while row is not column:
+            node = row.previous
+            while node is not row:
+                node.column.size += 1
+                node.down.up = node
+                node.up.down = node
+                node = node.previous
+            row = row.up
+        column.next.previous = column
+        column.previous.next = column
+
+    def _choose(self):
+        """column with the least rows, None once every column is covered"""
+        root = self.root
+        best = None
+        column = root.next
+        while column is not root:
+            if best is None or column.size < best.size:
+                best = column
+                if best.size <= 1:
+                    break
+            column = column.next
+        return best
+
+    def _select(self, row):
+        """covers the other columns of a chosen row"""
+        node = row.next
+        while node is not row:
+            self.cover(node.column)
+            node = node.next
+
+    def _unselect(self, row):
+        """reverse of _select"""
+        node = row.previous
+        while node is not row:
+            self.uncover(node.column)
+            node = node.previous
+
+    def _restore(self, column, solution):
+        """undoes a partial search so the matrix gets back to its original state"""
+        self.uncover(column)
+        while solution:
+            row = solution.pop()
+            self._unselect(row)
+            self.uncover(row.column)
+
+    def search(self, termination=None):
+        """Generator of the exact covers
+        :param termination: optional Event aborting the search once set
+        :return: yields the list of the data of the selected rows, for each solution
+        """
+        solution = []
+        column = self._choose()
+        if column is None:
+            yield []
+            return
+        self.cover(column)
+        row = column.down
+
+        while True:
+            if termination and termination.is_set():
+                self._restore(column, solution)
+                return
+
+            if row is column:
+                # every row of this column was tried: backtrack
+                self.uncover(column)
+                if not solution:
+                    return
+                row = solution.pop()
+                self._unselect(row)
+                column = row.column
+                row = row.down
+                continue
+
+            self.nodes += 1
+            solution.append(row)
+            self._select(row)
+
+            following = self._choose()
+            if following is None:
+                try:
+                    yield [node.data for node in solution]
+                except GeneratorExit:
+                    # the caller stopped iterating: restore the matrix
+                    self._unselect(solution.pop())
+                    self._restore(column, solution)
+                    raise
+            elif following.size > 0:
+                # descend
+                column = following
+                self.cover(column)
+                row = column.down
+                continue
+
+            # dead end or solution reported: try the next row of the same column
+            solution.pop()
+            self._unselect(row)
+            row = row.down
+
+    def solve(self, termination=None):
+        """first exact cover found, or None"""
+        for solution in self.search(termination):
+            return solution
+        return None
@@ -0,0 +1,72 @@
+from dlx import *
+from node import TwoWayNode
+import unittest
+import itertools
+from threading import Event
+
+
+class TestDancingLinks(unittest.TestCase):
+    def _knuth(self):
+        links = DancingLinks('ABCDEFG')
+        rows = {'r1':'CEF', 'r2':'ADG', 'r3':'BCF', 'r4':'AD', 'r5':'BG', 'r6':'DEG'}
+        for data, columns in rows.items():
+            links.add_row(data, columns)
+        return links
+
+    def test_nodes(self):
+        self.assertTrue(issubclass(DancingNode, TwoWayNode))
+        node = DancingNode('x')
+        self.assertIs(node.next, node)
+        self.assertIs(node.previous, node)
+        self.assertIs(node.up, node)
+        self.assertIs(node.down, node)
+
+    def test_solve(self):
+        links = self._knuth()
+        self.assertEqual(links.rows, 6)
+        self.assertEqual(sorted(links.solve()), ['r1', 'r4', 'r5'])
+        # the matrix is restored once the search stops
+        self.assertEqual([sorted(x) for x in links.search()], [['r1', 'r4', 'r5']])
+        self.assertEqual(links.columns['A'].size, 2)
+
+    def test_cover_uncover(self):
+        links = self._knuth()
+        sizes = {k: c.size for k, c in links.columns.items()}
+        DancingLinks.cover(links.columns['A'])
+        self.assertEqual(links.columns['D'].size, 1)
+        DancingLinks.uncover(links.columns['A'])
+        self.assertEqual({k: c.size for k, c in links.columns.items()}, sizes)
+
+    def test_no_solution(self):
+        links = DancingLinks('AB')
+        links.add_row('r1', 'A')
+        self.assertIsNone(links.solve())
+
+    def test_empty(self):
+        self.assertEqual(DancingLinks().solve(), [])
+
+    def test_matchings(self):
+        # K6 has 15 perfect matchings
+        links = DancingLinks(range(6))
+        for i, j in itertools.combinations(range(6), 2):
+            links.add_row((i, j), (i, j))
+        self.assertEqual(len(list(links.search())), 15)
+
+    def test_secondary(self):
+        links = DancingLinks('AB')
+        links.add_column('S', primary=False)
+        links.add_row('r1', 'AS')
+        links.add_row('r2', 'BS')
+        links.add_row('r3', 'B')
+        self.assertEqual(list(links.search()), [['r1', 'r3']])
+
+    def test_termination(self):
+        links = self._knuth()
+        sig = Event()
+        sig.set()
+        self.assertIsNone(links.solve(sig))
+        self.assertEqual(sorted(links.solve()), ['r1', 'r4', 'r5'])
+
+
+if __name__ == "__main__":
+    unittest.main(argv=['ignore'], exit=False, verbosity=2)
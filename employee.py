@@ -7,7 +7,7 @@ __author__ = "Bertrand Blanc (Alan Turing)"
 __all__ = ['Employee', 'Employees']
 
 from threading import Lock
-from linkedlist import LinkedList
+from linkedlist import IndexedLinkedList
 
 class Employee():
     """Employee record with their badge ID and name"""
@@ -26,7 +26,11 @@ class Employee():
     
         return key
 
-    def __init__(self, name:str=None):
+    def __init__(self, name:str=None, **attributes):
+        """
+        :param name: name of the employee, defaulted from the ID
+        :param attributes: extra attributes like department, manager, timezone...
+        """
         self.id = Employee.primary_key()
         self.name = name
 
@@ -34,16 +38,20 @@ class Employee():
             # The employee gets a name by default
             self.name = 'E' + format(self.id, "03d")
 
+        for attribute, value in attributes.items():
+            setattr(self, attribute, value)
+
     def __str__(self) -> str:
         return str(self.name)
     
 
-class Employees(LinkedList):
+class Employees(IndexedLinkedList):
+    """Roster of the employees, indexed by employee for O(1) membership and removal"""
     def fill(self, *args, **kwargs):
         """Fill up the list of employees to process"""
         number_of_employees = kwargs.get('number',None)
         if number_of_employees is not None:
-            [self.add(Employee()) for _ in range(number_of_employees)]
+            self.extend(Employee() for _ in range(number_of_employees))
 
 
 """
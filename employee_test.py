@@ -11,6 +11,10 @@ class TestEmployee(unittest.TestCase):
         e = Employee()
         self.assertEqual(e.name, str(e))
 
+        e = Employee(department='R&D', manager='foo')
+        self.assertEqual(e.department, 'R&D')
+        self.assertEqual(e.manager, 'foo')
+
         employees = [Employee() for _ in range(100)]
         for idx,e1 in enumerate(employees):
             for e2 in employees[idx+1:]:
@@ -37,6 +41,17 @@ class TestEmployees(unittest.TestCase):
         for idx in range(22):
             self.assertEqual(es[idx].id, idx)
 
+    def test_index(self):
+        es = Employees()
+        es.fill(number=10)
+        employee = es[4]
+        self.assertIn(employee, es)
+        self.assertEqual(es.index(employee), 4)
+        es.remove(employee)
+        self.assertNotIn(employee, es)
+        self.assertEqual(len(es), 9)
+        self.assertNotIn(Employee(), es)
+
 
 if __name__ == "__main__":
     unittest.main(argv=['ignore'], exit=False, verbosity=2)
@@ -0,0 +1,113 @@
+"""
+Pair-exclusion rules: employees who must not be paired up.
+
+The rules are compiled once per list of employees into an ExclusionIndex.
+Coffee consults that index while building its graph, hence the forbidden
+edges never exist and the exploration never visits them.
+
+Rules given by attribute are compiled in O(N) per rule: each employee is
+mapped to its attribute value, and two employees are compared in O(1) by
+their values. Explicit pairs are stored in a set.
+"""
+
+__author__ = "Bertrand Blanc (Alan Turing)"
+__all__ = ["Exclusions", "ExclusionIndex"]
+
+
+def _key(attribute):
+    """turns an attribute name into a function extracting that attribute from an employee"""
+    if callable(attribute):
+        return attribute
+    return lambda employee: getattr(employee, attribute, None)
+
+
+class ExclusionIndex():
+    """Compiled form of the exclusion rules, indexed by the position of the employees"""
+
+    def __init__(self, same, different, pairs):
+        """
+        :param same: list of per-employee keys, employees sharing a key must not meet
+        :param different: list of per-employee keys, employees with different keys must not meet
+        A None key, a missing attribute, never constrains the employee.
+        :param pairs: set of (i, j) positions with i < j which must not meet
+        """
+        self.same = same
+        self.different = different
+        self.pairs = pairs
+
+    def allows(self, i, j):
+        """True if the employees at positions i and j can meet"""
+        if i > j:
+            i, j = j, i
+        if (i, j) in self.pairs:
+            return False
+        for keys in self.same:
+            if keys[i] is not None and keys[i] == keys[j]:
+                return False
+        for keys in self.different:
+            if keys[i] is not None and keys[j] is not None and keys[i] != keys[j]:
+                return False
+        return True
+
+    def __len__(self):
+        """number of rules"""
+        return len(self.same) + len(self.different) + len(self.pairs)
+
+
+class Exclusions():
+    """Collection of rules telling which employees must not be paired up"""
+
+    def __init__(self, *, pairs=None, same=None, different=None):
+        """
+        :param pairs: iterable of (employee1, employee2) who must not meet
+        :param same: attribute names (or functions of an employee): employees sharing that value must not meet
+        :param different: attribute names (or functions of an employee): employees with different values must not meet
+        """
+        self._pairs = list()
+        self._same = list()
+        self._different = list()
+
+        for employee1, employee2 in pairs or []:
+            self.pair(employee1, employee2)
+        for attribute in same or []:
+            self.same(attribute)
+        for attribute in different or []:
+            self.different(attribute)
+
+    def pair(self, employee1, employee2):
+        """employee1 and employee2 must not meet (e.g. they already met last quarter)"""
+        self._pairs.append((employee1, employee2))
+        return self
+
+    def same(self, attribute):
+        """employees sharing the same value for attribute must not meet (e.g. same manager)
+        Employees without that attribute are not constrained."""
+        self._same.append(_key(attribute))
+        return self
+
+    def different(self, attribute):
+        """employees with different values for attribute must not meet (e.g. different time zones)
+        Employees without that attribute are not constrained."""
+        self._different.append(_key(attribute))
+        return self
+
+    def compile(self, employees):
+        """Compiles the rules for an ordered collection of employees
+        :return: ExclusionIndex addressing the employees by position
+        """
+        employees = list(employees)
+        positions = {id(employee): idx for idx, employee in enumerate(employees)}
+
+        pairs = set()
+        for employee1, employee2 in self._pairs:
+            i = positions.get(id(employee1))
+            j = positions.get(id(employee2))
+            if i is None or j is None or i == j:
+                # unknown employees are not part of this roster
+                continue
+            pairs.add((min(i, j), max(i, j)))
+
+        same = [[key(employee) for employee in employees] for key in self._same]
+        different = [[key(employee) for employee in employees] for key in self._different]
+
+        return ExclusionIndex(same, different, pairs)
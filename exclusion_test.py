@@ -0,0 +1,53 @@
+from exclusion import *
+from employee import Employee
+import unittest
+
+
+class TestExclusions(unittest.TestCase):
+    def test_empty(self):
+        es = [Employee() for _ in range(4)]
+        index = Exclusions().compile(es)
+        self.assertEqual(len(index), 0)
+        for i in range(4):
+            for j in range(4):
+                self.assertTrue(index.allows(i, j))
+
+    def test_pairs(self):
+        es = [Employee() for _ in range(4)]
+        index = Exclusions(pairs=[(es[3], es[1])]).compile(es)
+        self.assertFalse(index.allows(1, 3))
+        self.assertFalse(index.allows(3, 1))
+        self.assertTrue(index.allows(0, 1))
+
+        # employees outside of the roster are ignored
+        index = Exclusions().pair(es[0], Employee()).compile(es)
+        self.assertEqual(len(index), 0)
+
+    def test_same(self):
+        es = [Employee(manager=x % 2) for x in range(6)] + [Employee()]
+        index = Exclusions(same=['manager']).compile(es)
+        self.assertFalse(index.allows(0, 2))
+        self.assertFalse(index.allows(1, 5))
+        self.assertTrue(index.allows(0, 1))
+        # no manager, no constraint
+        self.assertTrue(index.allows(0, 6))
+
+    def test_different(self):
+        es = [Employee(timezone='PST' if x < 3 else 'EST') for x in range(6)] + [Employee()]
+        index = Exclusions().different('timezone').compile(es)
+        self.assertTrue(index.allows(0, 2))
+        self.assertTrue(index.allows(3, 5))
+        self.assertFalse(index.allows(2, 3))
+        # no time zone, no constraint
+        self.assertTrue(index.allows(0, 6))
+        self.assertTrue(index.allows(6, 5))
+
+    def test_callable(self):
+        es = [Employee() for _ in range(4)]
+        index = Exclusions(same=[lambda e: e.id % 2]).compile(es)
+        self.assertFalse(index.allows(0, 2))
+        self.assertTrue(index.allows(0, 1))
+
+
+if __name__ == "__main__":
+    unittest.main(argv=['ignore'], exit=False, verbosity=2)
@@ -0,0 +1,204 @@
+"""
+Machine-readable output formats for the weekly pairing.
+
+Each writer streams the schedule to a sink week after week. A single buffer
+is allocated per writer and reused for every week: the week is serialized
+into that buffer, then handed over to the sink in one write.
+
+* text  - the historical human readable output
+* csv   - one row per meeting: week, restart, employee1, employee2
+* jsonl - one JSON document per line, the first one listing the employees
+* bin   - a header followed by packed uint32 employee-index pairs per week
+
+Binary layout (little endian):
+    header: magic b'COFE', version:uint16, reserved:uint16, employees:uint32
+    week:   week:uint32, restart:uint32, pairs:uint32, then pairs*(uint32,uint32)
+"""
+
+__author__ = "Bertrand Blanc (Alan Turing)"
+__all__ = ["FORMATS", "WRITERS", "Writer", "TextWriter", "CsvWriter", "JsonlWriter", "BinWriter", "writer", "read_bin"]
+
+from abc import ABC, abstractmethod
+from array import array
+import csv
+import io
+import json
+import struct
+import sys
+
+MAGIC = b'COFE'
+VERSION = 1
+HEADER = struct.Struct('<4sHHI')
+
+
+class Writer(ABC):
+    """Streams the weekly meetings to a sink"""
+    # the sink is a binary file-like object, a text one otherwise
+    binary = False
+
+    def __init__(self, sink):
+        """
+        :param sink: file-like object, opened in binary mode for binary writers
+        """
+        self.sink = sink
+        self.buffer = io.StringIO()
+
+    def _flush(self):
+        """hands the content of the reusable buffer over to the sink and rewinds it"""
+        self.sink.write(self.buffer.getvalue())
+        self.buffer.seek(0)
+        self.buffer.truncate()
+
+    def header(self, employees):
+        """Writes whatever precedes the first week"""
+        pass
+
+    @abstractmethod
+    def week(self, index, meetings, restart=False):
+        """Writes the meetings of the week number index (1-based)"""
+
+    def footer(self):
+        """Writes whatever follows the last week"""
+        pass
+
+
+class TextWriter(Writer):
+    """Human readable output, identical to the str() representation of the weeks"""
+
+    def header(self, employees):
+        buf = self.buffer
+        buf.write('Employees: [')
+        for idx, employee in enumerate(employees):
+            if idx:
+                buf.write(', ')
+            buf.write(str(employee))
+        buf.write(']\n')
+        self._flush()
+
+    def week(self, index, meetings, restart=False):
+        buf = self.buffer
+        buf.write(f'{"(Repeat)" if restart else ""}week {index}: [')
+        for idx, meeting in enumerate(meetings):
+            if idx:
+                buf.write(', ')
+            buf.write('(')
+            buf.write(str(meeting.employee1.data.name))
+            buf.write(', ')
+            buf.write(str(meeting.employee2.data.name))
+            buf.write(')')
+        buf.write(']\n')
+        self._flush()
+
+    def footer(self):
+        self.sink.write('\n')
+
+
+class CsvWriter(Writer):
+    """One row per meeting"""
+
+    def __init__(self, sink):
+        Writer.__init__(self, sink)
+        self.csv = csv.writer(self.buffer, lineterminator='\n')
+
+    def header(self, employees):
+        self.csv.writerow(('week', 'restart', 'employee1', 'employee2'))
+        self._flush()
+
+    def week(self, index, meetings, restart=False):
+        restart = int(restart)
+        for meeting in meetings:
+            self.csv.writerow((index, restart, meeting.employee1.data.name, meeting.employee2.data.name))
+        self._flush()
+
+
+class JsonlWriter(Writer):
+    """One JSON document per line"""
+
+    def header(self, employees):
+        json.dump({'employees': [str(employee) for employee in employees]}, self.buffer)
+        self.buffer.write('\n')
+        self._flush()
+
+    def week(self, index, meetings, restart=False):
+        json.dump({
+            'week': index,
+            'restart': bool(restart),
+            'meetings': [(str(meeting.employee1.data.name), str(meeting.employee2.data.name)) for meeting in meetings],
+        }, self.buffer)
+        self.buffer.write('\n')
+        self._flush()
+
+
+class BinWriter(Writer):
+    """Packed employee indices, see the module documentation for the layout"""
+    binary = True
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.buffer = array('I')
+        assert self.buffer.itemsize == 4, 'uint32 expected'
+
+    def _flush(self):
+        if sys.byteorder == 'big':
+            self.buffer.byteswap()
+        self.sink.write(self.buffer)
+        del self.buffer[:]
+
+    def header(self, employees):
+        self.sink.write(HEADER.pack(MAGIC, VERSION, 0, len(employees)))
+
+    def week(self, index, meetings, restart=False):
+        buf = self.buffer
+        buf.append(index)
+        buf.append(int(bool(restart)))
+        buf.append(0)
+        ids = getattr(meetings, 'ids', None)
+        if ids is not None:
+            # packed week: no Meeting is materialized
+            buf.extend(ids)
+        else:
+            for meeting in meetings:
+                buf.append(meeting.employee1.id)
+                buf.append(meeting.employee2.id)
+        buf[2] = (len(buf) - 3) // 2
+        self._flush()
+
+
+# format -> class of its writer
+WRITERS = dict(text=TextWriter, csv=CsvWriter, jsonl=JsonlWriter, bin=BinWriter)
+FORMATS = tuple(WRITERS)
+
+
+def writer(fmt, sink=None):
+    """Factory returning the writer of the format fmt streaming to sink
+    :param sink: file-like object, by default an in-memory spool of the type the format needs
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f'unknown format {fmt}, expected one of {FORMATS}')
+    cls = WRITERS[fmt]
+    if sink is None:
+        sink = io.BytesIO() if cls.binary else io.StringIO()
+    return cls(sink)
+
+
+def read_bin(source):
+    """Reads back a binary schedule
+    :param source: binary file-like object
+    :return: (number of employees, list of (week, restart, [(index1, index2), ...]))
+    """
+    magic, version, _, employees = HEADER.unpack(source.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('not a coffee binary schedule')
+
+    weeks = []
+    while True:
+        raw = source.read(12)
+        if not raw:
+            break
+        index, restart, pairs = struct.unpack('<III', raw)
+        data = array('I')
+        data.frombytes(source.read(8 * pairs))
+        if sys.byteorder == 'big':
+            data.byteswap()
+        weeks.append((index, bool(restart), list(zip(data[0::2], data[1::2]))))
+    return employees, weeks
@@ -0,0 +1,76 @@
+from formats import *
+from coffee import Coffee
+from employee import Employees
+import unittest
+import io
+import json
+
+
+class TestFormats(unittest.TestCase):
+    def _run(self, fmt, employees=6):
+        es = Employees()
+        es.fill(number=employees)
+        coffee = Coffee(es)
+
+        weeks = []
+        sink = io.BytesIO() if fmt == 'bin' else io.StringIO()
+        out = writer(fmt, sink)
+        out.header(es)
+        for idx, meetings in enumerate(coffee):
+            weeks.append(meetings)
+            out.week(idx+1, meetings)
+        out.footer()
+        return es, weeks, sink
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            writer('xml', io.StringIO())
+        # the spool follows the format
+        for fmt in FORMATS:
+            self.assertEqual(isinstance(writer(fmt).sink, io.BytesIO), WRITERS[fmt].binary)
+        self.assertTrue(WRITERS['bin'].binary)
+        # a writer shall write the weeks
+        with self.assertRaises(TypeError):
+            Writer(io.StringIO())
+
+    def test_text(self):
+        es, weeks, sink = self._run('text')
+        buf = sink.getvalue().rstrip('\n').split('\n')
+        self.assertEqual(buf[0], f'Employees: {es}')
+        for idx, meetings in enumerate(weeks):
+            self.assertEqual(buf[idx+1], f'week {idx+1}: {meetings}')
+
+    def test_csv(self):
+        es, weeks, sink = self._run('csv')
+        buf = sink.getvalue().rstrip('\n').split('\n')
+        self.assertEqual(buf[0], 'week,restart,employee1,employee2')
+        self.assertEqual(len(buf), 1 + len(weeks) * len(es) // 2)
+        self.assertEqual(buf[1].split(',')[0], '1')
+
+    def test_jsonl(self):
+        es, weeks, sink = self._run('jsonl')
+        buf = sink.getvalue().rstrip('\n').split('\n')
+        self.assertEqual(json.loads(buf[0])['employees'], [str(e) for e in es])
+        for idx, meetings in enumerate(weeks):
+            week = json.loads(buf[idx+1])
+            self.assertEqual(week['week'], idx+1)
+            self.assertFalse(week['restart'])
+            self.assertEqual(len(week['meetings']), len(es)//2)
+
+    def test_bin(self):
+        es, weeks, sink = self._run('bin', employees=8)
+        sink.seek(0)
+        employees, data = read_bin(sink)
+        self.assertEqual(employees, len(es))
+        self.assertEqual(len(data), len(weeks))
+        for (index, restart, pairs), meetings in zip(data, weeks):
+            self.assertFalse(restart)
+            self.assertEqual(pairs, [(m.employee1.id, m.employee2.id) for m in meetings])
+
+    def test_bin_invalid(self):
+        with self.assertRaises(ValueError):
+            read_bin(io.BytesIO(b'\x00' * 12))
+
+
+if __name__ == "__main__":
+    unittest.main(argv=['ignore'], exit=False, verbosity=2)
@@ -3,7 +3,7 @@ Definition of the Vertex and Graph classes with basic graph related operations
 """
 
 __author__ = "Bertrand Blanc (Alan Turing)"
-__all__ = ["Vertex", "Graph"]
+__all__ = ["Vertex", "Graph", "FrozenGraph", "OverlayVertex", "OverlayGraph"]
 
 class Vertex():
     def __init__(self, id, data, neighbors=None):
@@ -74,7 +74,118 @@ class Graph():
             yield self._vertices[k]
   
     def __str__(self):
-        return '[' + ", ".join(map(str,self._vertices.values())) + ']'
+        return '[' + ", ".join(map(str,self.vertices)) + ']'
+
+
+class FrozenGraph():
+    """Immutable graph shared by the planners of a same roster, and by their threads.
+    Like the Graph built by Coffee, a vertex only lists its neighbors of greater IDs.
+    """
+
+    def __init__(self, data, allows=None):
+        """Builds the complete graph once, O(N^2)
+        :param data: sequence of the data of the vertices, the vertex IDs being their positions
+        :param allows: optional function of two IDs telling whether their edge exists
+        """
+        self.data = tuple(data)
+        adjacency = []
+        for idx in range(len(self.data)):
+            adjacency.append(tuple(idx2 for idx2 in range(idx+1, len(self.data)) if allows is None or allows(idx, idx2)))
+        self.adjacency = tuple(adjacency)
+        self.edges = sum(map(len, self.adjacency))
+
+    def __len__(self):
+        return len(self.data)
+
+
+class OverlayVertex(Vertex):
+    """Vertex of an OverlayGraph. Its neighbors are read from the frozen graph,
+    the list being only materialized on first access."""
+
+    def __init__(self, id, data, graph):
+        self.id = id
+        self.data = data
+        self.graph = graph
+        self._neighbors = None
+
+    @property
+    def neighbors(self):
+        if self._neighbors is None:
+            graph = self.graph
+            removed = graph.removed
+            adjacency = graph.base.adjacency[self.id]
+            if removed is None:
+                self._neighbors = [graph[n] for n in adjacency]
+            else:
+                row = self.id * len(graph.base)
+                self._neighbors = [graph[n] for n in adjacency if not removed[(row + n) >> 3] >> ((row + n) & 7) & 1]
+        return self._neighbors
+
+    def __len__(self):
+        return len(self.graph.base.adjacency[self.id]) - self.graph.degrees.get(self.id, 0)
+
+    def add(self, other):
+        raise TypeError('edges can only be removed from an overlay of a frozen graph')
+
+    def remove(self, other):
+        Vertex.remove(self, other)
+        graph = self.graph
+        if graph.removed is None:
+            graph.removed = bytearray((len(graph.base) ** 2 + 7) // 8)
+        key = self.id * len(graph.base) + other.id
+        graph.removed[key >> 3] |= 1 << (key & 7)
+        graph.len_removed += 1
+        graph.degrees[self.id] = graph.degrees.get(self.id, 0) + 1
+
+
+class OverlayGraph(Graph):
+    """Copy-on-write view of a FrozenGraph recording only the edges removed.
+    Creating it is O(1): the vertices are created on first access."""
+
+    def __init__(self, base):
+        """
+        :param base: FrozenGraph, never modified
+        """
+        self.base = base
+        self._vertices = dict()
+        # bitset of the edges removed, bit id1 * N + id2 for id1 < id2: 1 bit per pair instead of
+        # a tuple in a set. Allocated on the first removal, None until then.
+        self.removed = None
+        self.len_removed = 0
+        # ID -> number of its edges removed
+        self.degrees = dict()
+
+    @property
+    def vertices(self):
+        return [self[idx] for idx in range(len(self.base))]
+
+    def __len__(self):
+        return len(self.base)
+
+    def len_edges(self):
+        return self.base.edges - self.len_removed
+
+    def is_removed(self, id1, id2):
+        """True if the edge between these IDs was removed from the overlay"""
+        if self.removed is None:
+            return False
+        key = min(id1, id2) * len(self.base) + max(id1, id2)
+        return bool(self.removed[key >> 3] >> (key & 7) & 1)
+
+    def add(self, vertex):
+        raise TypeError('the vertices of an overlay are the ones of its frozen graph')
+
+    def __getitem__(self, key):
+        vertex = self._vertices.get(key)
+        if vertex is None:
+            if not 0 <= key < len(self.base):
+                raise KeyError(key)
+            vertex = self._vertices[key] = OverlayVertex(key, self.base.data[key], self)
+        return vertex
+
+    def __iter__(self):
+        for idx in range(len(self.base)):
+            yield self[idx]
 
 
 if __name__ == "__main__":
@@ -93,7 +93,67 @@ class TestGraph(unittest.TestCase):
         self.assertEqual(hash(v),v.id)
         with self.assertRaises(KeyError):
             g1[v]
-    
+
+
+class TestOverlayGraph(unittest.TestCase):
+    def test_frozen(self):
+        base = FrozenGraph('abcde')
+        self.assertEqual(len(base),5)
+        self.assertEqual(base.edges,10)
+        self.assertEqual(base.adjacency[0],(1,2,3,4))
+        self.assertEqual(base.adjacency[4],())
+
+        base = FrozenGraph('abcd', lambda i, j: (i, j) != (0, 1))
+        self.assertEqual(base.edges,5)
+        self.assertEqual(base.adjacency[0],(2,3))
+
+    def test_overlay(self):
+        base = FrozenGraph('abcde')
+        g = OverlayGraph(base)
+        # nothing is materialized until read
+        self.assertEqual(len(g._vertices),0)
+        self.assertEqual(len(g),5)
+        self.assertEqual(g.len_edges(),10)
+        self.assertEqual(len(g[0]),4)
+        self.assertEqual(g[0].data,'a')
+        self.assertIsNone(g[0]._neighbors)
+
+        self.assertEqual([v.id for v in g[1].neighbors],[2,3,4])
+        self.assertIs(g[1].neighbors[0],g[2])
+        self.assertEqual([v.id for v in g],[0,1,2,3,4])
+        self.assertEqual(len(g.vertices),5)
+        with self.assertRaises(KeyError):
+            g[5]
+
+    def test_copy_on_write(self):
+        base = FrozenGraph('abcde')
+        g1 = OverlayGraph(base)
+        g2 = OverlayGraph(base)
+
+        g1[0].remove(g1[3])
+        g1[1].remove(g1[2])
+        self.assertEqual(len(g1[0]),3)
+        self.assertNotIn(g1[3],g1[0].neighbors)
+        self.assertEqual(g1.len_edges(),8)
+        self.assertEqual([(i,j) for i in range(5) for j in range(i+1,5) if g1.is_removed(i,j)],[(0,3),(1,2)])
+        self.assertTrue(g1.is_removed(3,0))
+
+        # neighbors read after the removal
+        self.assertEqual([v.id for v in g1[1].neighbors],[3,4])
+
+        # the other overlay and the base are untouched
+        self.assertEqual(len(g2[0]),4)
+        self.assertEqual(g2.len_edges(),10)
+        self.assertFalse(g2.is_removed(0,3))
+        self.assertEqual(base.adjacency[0],(1,2,3,4))
+
+        with self.assertRaises(AssertionError):
+            g1[0].remove(g1[3])
+        with self.assertRaises(TypeError):
+            g1[0].add(g1[3])
+        with self.assertRaises(TypeError):
+            g1.add(Vertex(5,5))
+
 
 if __name__ == "__main__":
     unittest.main(argv=['ignore'], exit=False, verbosity=2)
\ No newline at end of file
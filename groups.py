@@ -0,0 +1,201 @@
+"""
+Rounds of groups of k employees: coffee trios, lunch tables of four...
+
+In a round everyone belongs to exactly one group, and the repeats, two
+employees meeting again, are kept to a minimum.
+
+Exploring the rounds like the pairs would make an exponential search far
+worse. Instead:
+* where a resolvable design exists, the rounds are its parallel classes and
+  nobody meets twice. With N = k^d employees and k prime, the lines of the
+  affine geometry AG(d, k) are such a design: the lines parallel to a
+  direction split the points in groups of k, and two points lie on exactly
+  one line. That is the affine plane for d = 2, Kirkman's schoolgirls
+  arrangement in trios for N = 9, 27, 81...
+* elsewhere, each round is built greedily, every group growing with the
+  employee who met its members the least, then improved by local search
+  swapping employees between groups while it lowers the repeats.
+  O(N^2.k) per round.
+
+When N is not a multiple of k, N//k groups are formed and the remaining
+employees join some of them.
+"""
+
+__author__ = "Bertrand Blanc (Alan Turing)"
+__all__ = ["affine_design", "GroupPlanner"]
+
+import itertools
+import random
+
+
+def _prime(q):
+    return q >= 2 and all(q % d for d in range(2, int(q ** 0.5) + 1))
+
+
+def _dimension(n, k):
+    """d such that n = k^d, None if there is none"""
+    d, power = 0, 1
+    while power < n:
+        power *= k
+        d += 1
+    return d if power == n and d > 0 else None
+
+
+def affine_design(n, k):
+    """Parallel classes of the affine geometry AG(d, k), when n = k^d with k prime
+    :return: list of (k^d - 1)/(k - 1) rounds, each a list of groups (tuples of ids), None if there is no such design
+    """
+    d = _dimension(n, k) if _prime(k) else None
+    if d is None:
+        return None
+
+    points = list(itertools.product(range(k), repeat=d))
+    ids = {point: idx for idx, point in enumerate(points)}
+    rounds = []
+    # one direction per parallel class: its first non zero coordinate is 1
+    for direction in points:
+        nonzero = [c for c in direction if c]
+        if not nonzero or nonzero[0] != 1:
+            continue
+        seen = set()
+        groups = []
+        for point in points:
+            if point in seen:
+                continue
+            line = tuple(ids[tuple((p + t * v) % k for p, v in zip(point, direction))] for t in range(k))
+            seen.update(points[idx] for idx in line)
+            groups.append(tuple(sorted(line)))
+        rounds.append(groups)
+    return rounds
+
+
+class GroupPlanner():
+    """Rounds of groups with as few repeats as possible"""
+
+    # cost of grouping two employees who must not meet
+    FORBIDDEN = 1000
+
+    def __init__(self, employees, size, *, allows=None, seed=0, passes=10):
+        """
+        :param employees: number of employees
+        :param size: size of the groups, at least 2
+        :param allows: optional predicate allows(i, j) of the pairs allowed to meet, see ExclusionIndex
+        :param seed: seed of the tie breaks, for reproducible rounds
+        :param passes: maximum number of passes of the local search per round
+        """
+        if size < 2:
+            raise ValueError(f'the groups shall gather at least 2 employees, not {size}')
+        if employees < size:
+            raise ValueError(f'{employees} employees cannot form a group of {size}')
+        self.employees = employees
+        self.size = size
+        self.allows = allows
+        self.random = random.Random(seed)
+        self.passes = passes
+        # met[i][j]: number of rounds i and j shared a group
+        self.met = [[0] * employees for _ in range(employees)]
+        # cost of grouping i and j: the rounds they already shared, plus the exclusions
+        self.weights = [[0] * employees for _ in range(employees)]
+        if allows:
+            for i, j in itertools.combinations(range(employees), 2):
+                if not allows(i, j):
+                    self.weights[i][j] = self.weights[j][i] = GroupPlanner.FORBIDDEN
+        self.round = 0
+        # the design only holds if nobody is excluded
+        self.design = None if allows else affine_design(employees, size)
+
+    def __len__(self):
+        """rounds needed for everyone to meet everyone: the design, or the lower bound otherwise"""
+        if self.design:
+            return len(self.design)
+        return -(-(self.employees - 1) // (self.size - 1))
+
+    def sizes(self):
+        """sizes of the groups of a round"""
+        groups = max(1, self.employees // self.size)
+        size, extra = divmod(self.employees, groups)
+        return [size + 1] * extra + [size] * (groups - extra)
+
+    def repeats(self):
+        """number of times two employees met again"""
+        return sum(max(0, count - 1) for row in self.met for count in row) // 2
+
+    def _sums(self, group):
+        """cost of adding each employee to a group: the repeats, and the exclusions"""
+        weights = self.weights
+        sums = [0] * self.employees
+        for member in group:
+            row = weights[member]
+            for e in range(self.employees):
+                sums[e] += row[e]
+        return sums
+
+    def _greedy(self):
+        remaining = list(range(self.employees))
+        self.random.shuffle(remaining)
+        groups = []
+        for size in self.sizes():
+            group = [remaining.pop()]
+            sums = list(self.weights[group[0]])
+            while len(group) < size:
+                best = min(range(len(remaining)), key=lambda i: sums[remaining[i]])
+                member = remaining.pop(best)
+                group.append(member)
+                row = self.weights[member]
+                for e in range(self.employees):
+                    sums[e] += row[e]
+            groups.append(group)
+        return groups
+
+    def _improve(self, groups):
+        """swaps employees between groups as long as it lowers the repeats
+        The cost of each employee in each group is kept up to date, hence a swap is assessed in O(1)."""
+        weights = self.weights
+        sums = [self._sums(group) for group in groups]
+        for _ in range(self.passes):
+            improved = False
+            for a, b in itertools.combinations(range(len(groups)), 2):
+                A, B = groups[a], groups[b]
+                sums_a, sums_b = sums[a], sums[b]
+                for i in range(len(A)):
+                    for j in range(len(B)):
+                        x, y = A[i], B[j]
+                        # x leaves A for B, y leaves B for A
+                        delta = sums_a[y] + sums_b[x] - 2 * weights[x][y] - sums_a[x] - sums_b[y]
+                        if delta < 0:
+                            A[i], B[j] = y, x
+                            row_x, row_y = weights[x], weights[y]
+                            for e in range(self.employees):
+                                sums_a[e] += row_y[e] - row_x[e]
+                                sums_b[e] += row_x[e] - row_y[e]
+                            improved = True
+            if not improved:
+                break
+        return groups
+
+    def _record(self, groups):
+        for group in groups:
+            for x, y in itertools.combinations(group, 2):
+                self.met[x][y] += 1
+                self.met[y][x] += 1
+                self.weights[x][y] += 1
+                self.weights[y][x] += 1
+
+    def next(self):
+        """next round
+        :return: list of groups, each a sorted tuple of employee ids
+        """
+        if self.design and self.round < len(self.design):
+            groups = self.design[self.round]
+        else:
+            groups = self._improve(self._greedy())
+        groups = sorted(tuple(sorted(group)) for group in groups)
+        self._record(groups)
+        self.round += 1
+        return groups
+
+    def rounds(self, count=None):
+        """the next rounds
+        :param count: number of rounds, len(self) by default
+        """
+        return [self.next() for _ in range(len(self) if count is None else count)]
@@ -0,0 +1,72 @@
+from groups import *
+import itertools
+import unittest
+
+
+class TestGroups(unittest.TestCase):
+    def _check(self, planner, rounds):
+        for groups in rounds:
+            self.assertEqual(sorted(itertools.chain(*groups)), list(range(planner.employees)))
+            self.assertEqual(sorted(map(len, groups)), sorted(planner.sizes()))
+
+    def test_design(self):
+        for n, k in [(4, 2), (9, 3), (27, 3), (25, 5), (16, 2)]:
+            rounds = affine_design(n, k)
+            self.assertEqual(len(rounds), (n - 1) // (k - 1))
+            met = set()
+            for groups in rounds:
+                self.assertEqual(sorted(itertools.chain(*groups)), list(range(n)))
+                for group in groups:
+                    self.assertEqual(len(group), k)
+                    met.update(itertools.combinations(group, 2))
+            # every pair meets exactly once
+            self.assertEqual(len(met), n * (n - 1) // 2)
+
+        for n, k in [(12, 3), (16, 4), (8, 3), (36, 6)]:
+            self.assertIsNone(affine_design(n, k))
+
+    def test_planner_design(self):
+        planner = GroupPlanner(27, 3)
+        rounds = planner.rounds()
+        self.assertEqual(len(rounds), 13)
+        self._check(planner, rounds)
+        self.assertEqual(planner.repeats(), 0)
+
+        # beyond the design, the rounds go on greedily
+        self._check(planner, planner.rounds(2))
+
+    def test_planner_greedy(self):
+        for n, k in [(12, 3), (16, 4), (10, 3), (7, 2), (5, 4), (40, 5)]:
+            planner = GroupPlanner(n, k)
+            rounds = planner.rounds()
+            self.assertEqual(len(rounds), -(-(n - 1) // (k - 1)))
+            self._check(planner, rounds)
+
+        # the first round of 12 employees in trios cannot repeat anyone, nor the second one
+        planner = GroupPlanner(12, 3)
+        planner.rounds(2)
+        self.assertEqual(planner.repeats(), 0)
+
+    def test_sizes(self):
+        self.assertEqual(GroupPlanner(10, 3).sizes(), [4, 3, 3])
+        self.assertEqual(GroupPlanner(11, 4).sizes(), [6, 5])
+        self.assertEqual(GroupPlanner(3, 3).sizes(), [3])
+        with self.assertRaises(ValueError):
+            GroupPlanner(2, 3)
+        with self.assertRaises(ValueError):
+            GroupPlanner(10, 1)
+
+    def test_exclusions(self):
+        # even and odd employees must not meet
+        planner = GroupPlanner(12, 3, allows=lambda i, j: i % 2 == j % 2)
+        self.assertIsNone(planner.design)
+        for groups in planner.rounds():
+            for group in groups:
+                self.assertEqual(len({member % 2 for member in group}), 1)
+
+    def test_seed(self):
+        self.assertEqual(GroupPlanner(20, 3, seed=4).rounds(), GroupPlanner(20, 3, seed=4).rounds())
+
+
+if __name__ == "__main__":
+    unittest.main(argv=['ignore'], exit=False, verbosity=2)
@@ -0,0 +1,115 @@
+"""
+Meeting history stored in SQLite.
+
+Every week printed is appended to a local database so that questions like
+"when did A last meet B?" or "who has X met since week 40?" are answered by
+an index lookup instead of scanning the logs.
+
+* the database runs in WAL mode: readers are not blocked by the writer
+* a week (or a batch of weeks) is inserted with a single executemany in one transaction
+* a meeting is stored once, as the normalized pair employee1 < employee2
+* the composite indexes (team, employee1, employee2, week), (team, employee1, week)
+  and (team, employee2, week) keep the lookups in O(log n) as the history grows
+
+The employees are identified by their name, the IDs being assigned per process.
+"""
+
+__author__ = "Bertrand Blanc (Alan Turing)"
+__all__ = ["History"]
+
+import sqlite3
+from threading import Lock
+
+
+class History():
+    """Indexed store of the meetings, per team"""
+
+    SCHEMA = (
+        '''CREATE TABLE IF NOT EXISTS meetings (
+               team TEXT NOT NULL,
+               week INTEGER NOT NULL,
+               employee1 TEXT NOT NULL,
+               employee2 TEXT NOT NULL)''',
+        'CREATE INDEX IF NOT EXISTS meetings_pair ON meetings (team, employee1, employee2, week)',
+        'CREATE INDEX IF NOT EXISTS meetings_employee1 ON meetings (team, employee1, week)',
+        'CREATE INDEX IF NOT EXISTS meetings_employee2 ON meetings (team, employee2, week)',
+        'CREATE INDEX IF NOT EXISTS meetings_week ON meetings (team, week)',
+    )
+
+    def __init__(self, path=':memory:'):
+        """
+        :param path: file of the database, in memory by default
+        """
+        self.path = path
+        # the connection is shared by the threads of the planner service, serialized by the mutex
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.mutex = Lock()
+        with self.mutex:
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute('PRAGMA synchronous=NORMAL')
+            with self.connection:
+                for statement in History.SCHEMA:
+                    self.connection.execute(statement)
+
+    def close(self):
+        with self.mutex:
+            self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @staticmethod
+    def _names(meeting):
+        """normalized pair of names from a Meeting or a pair of names"""
+        if hasattr(meeting, 'employee1'):
+            name1, name2 = str(meeting.employee1.data), str(meeting.employee2.data)
+        else:
+            name1, name2 = (str(name) for name in meeting)
+        return (name1, name2) if name1 < name2 else (name2, name1)
+
+    def record(self, week, meetings, *, team=''):
+        """inserts the meetings of a week
+        :param meetings: Week, iterable of Meeting or of pairs of names
+        """
+        self.extend([(week, meetings)], team=team)
+
+    def extend(self, weeks, *, team=''):
+        """inserts several weeks in a single transaction
+        :param weeks: iterable of (week number, meetings)
+        """
+        rows = [(team, week) + self._names(meeting) for week, meetings in weeks for meeting in meetings]
+        with self.mutex:
+            with self.connection:
+                self.connection.executemany('INSERT INTO meetings VALUES (?, ?, ?, ?)', rows)
+
+    def _query(self, sql, parameters):
+        with self.mutex:
+            return self.connection.execute(sql, parameters).fetchall()
+
+    def __len__(self):
+        return self._query('SELECT COUNT(*) FROM meetings', ())[0][0]
+
+    def last_week(self, *, team=''):
+        """last week recorded for the team, 0 if none"""
+        return self._query('SELECT MAX(week) FROM meetings WHERE team = ?', (team,))[0][0] or 0
+
+    def last_met(self, name1, name2, *, team=''):
+        """last week two employees met, None if they never did"""
+        name1, name2 = self._names((name1, name2))
+        return self._query('SELECT MAX(week) FROM meetings WHERE team = ? AND employee1 = ? AND employee2 = ?',
+                           (team, name1, name2))[0][0]
+
+    def partners(self, name, *, since=0, team=''):
+        """(week, partner) of the meetings of an employee from a given week on, in chronological order"""
+        return self._query('''SELECT week, employee2 FROM meetings WHERE team = ? AND employee1 = ? AND week >= ?
+                              UNION ALL
+                              SELECT week, employee1 FROM meetings WHERE team = ? AND employee2 = ? AND week >= ?
+                              ORDER BY week''', (team, name, since, team, name, since))
+
+    def meetings(self, *, since=0, team=''):
+        """(week, employee1, employee2) of the team from a given week on, in chronological order"""
+        return self._query('SELECT week, employee1, employee2 FROM meetings WHERE team = ? AND week >= ? ORDER BY week',
+                           (team, since))
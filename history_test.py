@@ -0,0 +1,97 @@
+from history import *
+from coffee import Coffee
+from employee import Employees
+import unittest
+import os
+import tempfile
+
+
+class TestHistory(unittest.TestCase):
+    def test_record(self):
+        with History() as history:
+            history.record(1, [('B', 'A'), ('C', 'D')])
+            history.record(2, [('A', 'C'), ('B', 'D')])
+            history.record(3, [('A', 'B'), ('C', 'D')], team='red')
+
+            self.assertEqual(len(history), 6)
+            self.assertEqual(history.last_week(), 2)
+            self.assertEqual(history.last_week(team='red'), 3)
+            self.assertEqual(history.last_week(team='blue'), 0)
+
+            # the pairs are normalized
+            self.assertEqual(history.last_met('A', 'B'), 1)
+            self.assertEqual(history.last_met('B', 'A'), 1)
+            self.assertEqual(history.last_met('A', 'D'), None)
+            self.assertEqual(history.last_met('A', 'B', team='red'), 3)
+
+            self.assertEqual(history.partners('A'), [(1, 'B'), (2, 'C')])
+            self.assertEqual(history.partners('A', since=2), [(2, 'C')])
+            self.assertEqual(history.meetings(since=2), [(2, 'A', 'C'), (2, 'B', 'D')])
+
+    def test_week(self):
+        es = Employees()
+        es.fill(number=6)
+        coffee = Coffee(es)
+
+        with History() as history:
+            for week, meetings in enumerate(coffee):
+                history.record(week + 1, meetings)
+            self.assertEqual(len(history), 15)
+            self.assertEqual(history.last_week(), 5)
+            names = [str(e) for e in es]
+            self.assertEqual(len(history.partners(names[0])), 5)
+
+    def test_indexes(self):
+        with History() as history:
+            for query, parameters in [
+                    ('SELECT MAX(week) FROM meetings WHERE team = ? AND employee1 = ? AND employee2 = ?', ('', 'A', 'B')),
+                    ('SELECT week FROM meetings WHERE team = ? AND employee2 = ? AND week >= ?', ('', 'A', 0))]:
+                plan = history.connection.execute('EXPLAIN QUERY PLAN ' + query, parameters).fetchall()
+                self.assertIn('USING COVERING INDEX', ' '.join(row[-1] for row in plan))
+
+    def test_file(self):
+        path = os.path.join(tempfile.mkdtemp(), 'history.db')
+        with History(path) as history:
+            history.record(1, [('A', 'B')])
+            mode = history.connection.execute('PRAGMA journal_mode').fetchone()[0]
+            self.assertEqual(mode, 'wal')
+        with History(path) as history:
+            self.assertEqual(history.last_met('A', 'B'), 1)
+        for suffix in ['', '-wal', '-shm']:
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+class TestRestore(unittest.TestCase):
+    def test_restore(self):
+        es = Employees()
+        es.fill(number=8)
+        coffee = Coffee(es)
+
+        with History() as history:
+            planning = coffee.feed(endless=True, sorting_algo=Coffee.DLX_ROTATION)
+            # a complete cycle, then 3 weeks of the next one
+            weeks = []
+            for week in range(10):
+                meetings, _ = next(planning)
+                history.record(week + 1, meetings)
+                weeks.append(meetings)
+
+            restored = Coffee(es)
+            self.assertEqual(restored.restore(history), 10)
+            self.assertEqual(restored.week, coffee.week)
+            self.assertEqual(restored.planning.len_edges(), 28 - 3*4)
+            self.assertEqual(restored.planning.len_edges(), coffee.planning.len_edges())
+            for v in coffee.planning:
+                self.assertEqual(sorted(n.id for n in v.neighbors), sorted(n.id for n in restored.planning[v.id].neighbors))
+            # the last week each pair met, for the weighted mode
+            last = {restored._pair(id1, id2): week for week, meetings in enumerate(weeks) for id1, id2 in meetings.pairs()}
+            self.assertEqual(list(restored.history), [last.get(pair, -1) for pair in range(28)])
+
+            # the restored planner carries on the cycle
+            cpt = sum(1 for _ in restored)
+            self.assertEqual(cpt, 4)
+
+
+if __name__ == "__main__":
+    unittest.main(argv=['ignore'], exit=False, verbosity=2)
@@ -4,20 +4,40 @@ The LinkedListIterator ala Turing was also implemented to manipulate the list as
 """
 
 __author__ = "Bertrand Blanc (Alan Turing)"
-__all__ = ["LinkedList", "ListIterator"]
+__all__ = ["LinkedList", "IndexedLinkedList", "ListIterator"]
 
 from abstractlist import AbstractList
 from listinterface import ListInterface, ListIteratorInterface
 from node import TwoWayNode
 
 class LinkedList(AbstractList,ListInterface):
+    """Doubly linked list remembering a finger: the last node accessed by position and its index.
+    The positional accesses walk from the closest of the head, the tail or the finger,
+    hence sequential and nearby accesses are amortized O(1).
+    The finger is only trusted while modCount is unchanged since it was set.
+    With recycle, the nodes of a cleared list are kept in a free-list and reused by the next items."""
+
     # Constructor
-    def __init__(self, sourceCollection = None):
+    def __init__(self, sourceCollection = None, *, recycle = False):
         """Sets the initial state of self, which includes the
         contents of sourceCollection, if it's present."""
         self.head = None
         self.tail = None
-        AbstractList.__init__(self,sourceCollection)
+        # (node, index, modCount when set)
+        self.finger = None
+        self.recycle = recycle
+        # free nodes chained by their next link
+        self.free = None
+        AbstractList.__init__(self)
+        if sourceCollection:
+            self.extend(sourceCollection)
+
+    @classmethod
+    def from_iterable(cls, iterable, **kwargs):
+        """Builds a list linking the nodes in a single pass"""
+        ll = cls(**kwargs)
+        ll.extend(iterable)
+        return ll
 
     # Accessor methods
 
@@ -28,71 +48,136 @@ class LinkedList(AbstractList,ListInterface):
             yield probe.data
             probe = probe.next
 
+    def _check(self, i):
+        if not (0 <= i < len(self)):
+            raise IndexError(f'index {i} out of range [0,{len(self)}[')
+
+    def _node(self, i):
+        """Precondition: 0 <= i < len(self)
+        Returns the node at position i, walking from the closest known position."""
+        probe, position = self.head, 0
+        if len(self) - 1 - i < i:
+            probe, position = self.tail, len(self) - 1
+        if self.finger is not None:
+            node, index, modCount = self.finger
+            if modCount == self.modCount and abs(i - index) < abs(i - position):
+                probe, position = node, index
+
+        while position < i:
+            probe = probe.next
+            position += 1
+        while position > i:
+            probe = probe.previous
+            position -= 1
+
+        self.finger = (probe, i, self.modCount)
+        return probe
+
     def __getitem__(self, i):
         """Precondition: 0 <= i < len(self)
         Returns the item at position i.
         Raises: IndexError."""
-        if not (0 <= i < len(self)):
-            raise IndexError(f'index {i} out of range [0,{len(self)}[')
-        
-        probe = self.head
-        counter = 0
-        while counter < i:
-            counter += 1
-            probe = probe.next
-        return probe.data
+        self._check(i)
+        return self._node(i).data
 
     def __setitem__(self, i, item):
         """Precondition: 0 <= i < len(self)
         Replaces the item at position i with item.
         Raises: IndexError."""
-        if not (0 <= i < len(self)):
-            raise IndexError(f'index {i} out of range [0,{len(self)}[')
-        
-        probe = self.head
-        counter = 0
-        while counter < i:
-            counter += 1
-            probe = probe.next
-        probe.data = item
+        self._check(i)
+        self._replace(self._node(i), item)
+
+    # Mutator methods
+
+    def _new(self, item):
+        """node holding item, taken from the free-list if possible"""
+        node = self.free
+        if node is None:
+            return TwoWayNode(item)
+        self.free = node.next
+        node.data = item
+        node.next = None
+        return node
+
+    def extend(self, iterable):
+        """Adds the items to the end of the list, linking the nodes in a single pass"""
+        first = last = None
+        count = 0
+        for item in iterable:
+            node = self._new(item)
+            node.previous = last
+            if last is None:
+                first = node
+            else:
+                last.next = node
+            last = node
+            count += 1
 
+        if first is None:
+            return
+        if self.tail is None:
+            self.head = first
+        else:
+            self.tail.next = first
+            first.previous = self.tail
+        self.tail = last
+        self.size += count
+        self.incModCount()
 
     def clear(self):
+        if self.recycle and self.head is not None:
+            # the data are released, the nodes are kept for the next items
+            probe = self.head
+            while probe:
+                probe.data = None
+                probe.previous = None
+                probe = probe.next
+            self.tail.next = self.free
+            self.free = self.head
         self.head = None
         self.tail = None
         self.size = 0
+        self.finger = None
+        self.incModCount()
+
+    def _link(self, node, successor):
+        """links node before successor, at the end of the list if successor is None"""
+        node.next = successor
+        node.previous = self.tail if successor is None else successor.previous
+        if node.previous is None:
+            self.head = node
+        else:
+            node.previous.next = node
+        if successor is None:
+            self.tail = node
+        else:
+            successor.previous = node
+        self.size += 1
+        self.incModCount()
+
+    def _unlink(self, node):
+        """unlinks node from the list and returns its data"""
+        if node.previous is None:
+            self.head = node.next
+        else:
+            node.previous.next = node.next
+        if node.next is None:
+            self.tail = node.previous
+        else:
+            node.next.previous = node.previous
+        self.size -= 1
+        self.incModCount()
+        return node.data
 
     def insert(self, i, item):
         """Inserts the item at position i."""
         if not (0 <= i <= len(self)):
             raise IndexError(f'index {i} out of range [0,{len(self)}[')
-        
-        if not self.head:
-            self.head = TwoWayNode(item)
-            self.tail = self.head
-            self.size += 1
-            return
-
-        if i == len(self):
-            self.tail.next = TwoWayNode(item,self.tail)
-            self.tail = self.tail.next
-            self.size += 1
-            return
-        
-        if i == 0:
-            self.head = TwoWayNode(item,None,self.head)
-            self.head.next.previous = self.head
-            self.size += 1
-            return
-
-        probe = self.head
-        counter = 0
-        while counter < i-2:
-            counter += 1
-            probe = probe.next
-        probe.next = TwoWayNode(item,probe,probe.next.next)
-        self.size += 1
 
+        node = self._new(item)
+        self._link(node, None if i == len(self) else self._node(i))
+        # the new node is at position i: keep it as the finger for the nearby accesses
+        self.finger = (node, i, self.modCount)
 
     def pop(self, i = None):
         """Precondition: 0 <= i < len(self).
@@ -103,43 +188,138 @@ class LinkedList(AbstractList,ListInterface):
         if i is None:
             if self.isEmpty():
                 raise IndexError(f'the list is empty')
+            i = len(self) - 1
+        self._check(i)
+
+        node = self._node(i)
+        data = self._unlink(node)
+        if node.next is not None:
+            # the successor took position i
+            self.finger = (node.next, i, self.modCount)
+        return data
 
-            if len(self) == 1:
-                data = self.head.data
-                self.clear()
-                return data
-
-            data = self.tail.data
-            self.tail = self.tail.previous
-            self.tail.next = None
-            self.size -= 1
-            return data
-        
-
-        if not (0 <= i < len(self)):
-            raise IndexError(f'index {i} out of range [0,{len(self)}[')
-        
-        if i == 0:
-            data = self.head.data
-            self.head = self.head.next
-            self.size -= 1
-            return data
-
+    def remove(self, item):
+        """Precondition: item is in self.
+        Raises: ValueError if item in not in self.
+        Postcondition: item is removed from self.
+        Unlike AbstractList.remove, the list is only walked once."""
+        node = self._find(item)
+        if node is None:
+            raise ValueError(str(item) + " not in list.")
+        self._unlink(node)
+
+    def _find(self, item):
+        """first node holding item, None if none"""
         probe = self.head
-        counter = 0
-        while counter < i-1:
-            counter += 1
+        while probe:
+            if probe.data == item:
+                return probe
             probe = probe.next
-        data = probe.next.data
-        probe.next = probe.next.next
-        self.size -= 1
-        return data
+        return None
+
+    def _replace(self, node, item):
+        node.data = item
 
 
     def listIterator(self):
         """Returns a list iterator on self."""
         return ListIterator(self)
 
+class IndexedLinkedList(LinkedList):
+    """LinkedList keeping a side index from each item to its nodes.
+    Membership, count, remove(item) and the positioning of a cursor on an item are O(1)
+    for distinct items; the items shall be hashable.
+    The insertion order and the ListIterator semantics are the ones of LinkedList."""
+
+    def __init__(self, sourceCollection = None, **kwargs):
+        # item -> its node, or {node: None} of its nodes if the item is duplicated
+        self.nodes = dict()
+        LinkedList.__init__(self, sourceCollection, **kwargs)
+
+    def _index(self, node):
+        nodes = self.nodes.get(node.data)
+        if nodes is None:
+            self.nodes[node.data] = node
+        elif isinstance(nodes, dict):
+            nodes[node] = None
+        else:
+            self.nodes[node.data] = {nodes: None, node: None}
+
+    def _deindex(self, node):
+        nodes = self.nodes[node.data]
+        if isinstance(nodes, dict):
+            del nodes[node]
+            if len(nodes) == 1:
+                self.nodes[node.data] = next(iter(nodes))
+        else:
+            del self.nodes[node.data]
+
+    def _link(self, node, successor):
+        LinkedList._link(self, node, successor)
+        self._index(node)
+
+    def _unlink(self, node):
+        self._deindex(node)
+        return LinkedList._unlink(self, node)
+
+    def _replace(self, node, item):
+        self._deindex(node)
+        node.data = item
+        self._index(node)
+
+    def extend(self, iterable):
+        tail = self.tail
+        LinkedList.extend(self, iterable)
+        probe = self.head if tail is None else tail.next
+        while probe:
+            self._index(probe)
+            probe = probe.next
+
+    def clear(self):
+        self.nodes.clear()
+        LinkedList.clear(self)
+
+    def _first(self, nodes):
+        """first node of the list among nodes"""
+        probe = self.head
+        while probe not in nodes:
+            probe = probe.next
+        return probe
+
+    def _find(self, item):
+        nodes = self.nodes.get(item)
+        if isinstance(nodes, dict):
+            # duplicates: the first one in the list order
+            return self._first(nodes)
+        return nodes
+
+    def __contains__(self, item):
+        return item in self.nodes
+
+    def count(self, item):
+        """Returns the number of instances of item in self."""
+        nodes = self.nodes.get(item)
+        if nodes is None:
+            return 0
+        return len(nodes) if isinstance(nodes, dict) else 1
+
+    def index(self, item):
+        """Precondition: item is in the list.
+        Returns the position of item.
+        Raises: ValueError if the item is not in the list."""
+        nodes = self.nodes.get(item)
+        if nodes is None:
+            raise ValueError(str(item) + " not in list.")
+        if not isinstance(nodes, dict):
+            nodes = (nodes,)
+        position = 0
+        probe = self.head
+        while probe not in nodes:
+            probe = probe.next
+            position += 1
+        return position
+
+
 class ListIterator(ListIteratorInterface):
     """Interface for all list iterator types."""
 
@@ -203,7 +383,15 @@ class ListIterator(ListIteratorInterface):
         if not self.cursor:
             raise AttributeError('cursor not initialized')
         
-        self.cursor.data = item
+        self.ll._replace(self.cursor, item)
+
+    def seek(self, item):
+        """Moves the cursor to the first occurrence of item, O(1) on an IndexedLinkedList.
+        Raises: ValueError if the item is not in the backing store."""
+        node = self.ll._find(item)
+        if node is None:
+            raise ValueError(str(item) + " not in list.")
+        self.cursor = node
     
     def insert(self, item):         
         """Preconditions:
@@ -213,20 +401,11 @@ class ListIterator(ListIteratorInterface):
         Raises: AttributeError if illegal mutation of backing store."""
 
         if not self.cursor:
-            if self.ll.isEmpty():
-                self.ll.insert(0,item)
-            else:
-                self.ll.append(item)
+            self.ll.append(item)
             return
-        
-        if self.cursor is self.ll.head:
-            self.ll.insert(0,item)
-            self.first()
-            return
-        
-        node = TwoWayNode(item, self.cursor.previous, self.cursor)
-        self.cursor.previous.next = node
-        self.cursor.previous = node
+
+        node = self.ll._new(item)
+        self.ll._link(node, self.cursor)
         self.cursor = node
 
     
@@ -239,23 +418,11 @@ class ListIterator(ListIteratorInterface):
         
         if not self.cursor:
             raise AttributeError('undefined cursor')
-        
-        if self.cursor is self.ll.head:
-            self.ll.pop(0)
-            self.first()
-            return
-
-        if self.cursor.next is None:
-            previous = self.cursor.previous
-            previous.next = None
-            self.cursor = previous
-            self.ll.size -= 1
-            return
 
-        previous = self.cursor.previous
-        previous.next = self.cursor.next
-        self.cursor = previous.next
-        self.ll.size -= 1
+        # the cursor moves to the next item, or to the previous one at the end of the list
+        node = self.cursor
+        self.ll._unlink(node)
+        self.cursor = node.next if node.next is not None else node.previous
 
 
     def __str__(self):
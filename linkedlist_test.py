@@ -0,0 +1,273 @@
+from linkedlist import *
+import unittest
+import random
+
+
+class TestLinkedList(unittest.TestCase):
+    def _check(self, ll, expected):
+        """the links are consistent in both directions"""
+        self.assertEqual(list(ll), expected)
+        self.assertEqual(len(ll), len(expected))
+        backward = []
+        probe = ll.tail
+        while probe:
+            backward.append(probe.data)
+            probe = probe.previous
+        self.assertEqual(backward, expected[::-1])
+
+    def test_creation(self):
+        ll = LinkedList(range(5))
+        self._check(ll, [0, 1, 2, 3, 4])
+        self._check(LinkedList(), [])
+
+    def test_slots(self):
+        ll = LinkedList(range(3))
+        self.assertFalse(hasattr(ll.head, '__dict__'))
+        with self.assertRaises(AttributeError):
+            ll.head.foo = 0
+
+    def test_extend(self):
+        ll = LinkedList.from_iterable(range(3))
+        self.assertEqual(ll.getModCount(), 1)
+        ll.extend([])
+        ll.extend(x for x in 'ab')
+        self._check(ll, [0, 1, 2, 'a', 'b'])
+        self.assertEqual(ll[3], 'a')
+
+        ll = LinkedList()
+        ll.extend(range(2))
+        self._check(ll, [0, 1])
+
+    def test_recycle(self):
+        ll = LinkedList(range(4), recycle=True)
+        nodes = set()
+        probe = ll.head
+        while probe:
+            nodes.add(id(probe))
+            probe = probe.next
+
+        ll.clear()
+        self._check(ll, [])
+        ll.extend('abc')
+        ll.insert(1, 'd')
+        self._check(ll, ['a', 'd', 'b', 'c'])
+        probe = ll.head
+        while probe:
+            self.assertIn(id(probe), nodes)
+            probe = probe.next
+        self.assertIsNone(ll.free)
+
+        # without recycle, nothing is kept
+        ll = LinkedList(range(4))
+        ll.clear()
+        self.assertIsNone(ll.free)
+
+    def test_getitem(self):
+        ll = LinkedList(range(100))
+        for i in range(100):
+            self.assertEqual(ll[i], i)
+        for i in range(99, -1, -1):
+            self.assertEqual(ll[i], i)
+        with self.assertRaises(IndexError):
+            ll[100]
+        with self.assertRaises(IndexError):
+            ll[-1]
+
+        ll[50] = 'x'
+        self.assertEqual(ll[50], 'x')
+
+    def test_finger(self):
+        ll = LinkedList(range(100))
+        ll[40]
+        node, index, _ = ll.finger
+        self.assertEqual((node.data, index), (40, 40))
+        # nearby access walks from the finger
+        ll[42]
+        self.assertEqual(ll.finger[1], 42)
+
+        # a mutation invalidates the finger unless it is repositioned
+        modCount = ll.getModCount()
+        ll.append(100)
+        self.assertGreater(ll.getModCount(), modCount)
+        self.assertEqual(ll.finger[1], 100)
+        it = ll.listIterator()
+        it.first()
+        it.remove()
+        self.assertNotEqual(ll.finger[2], ll.getModCount())
+        self.assertEqual(ll[42], 43)
+
+    def test_insert(self):
+        ll = LinkedList(range(5))
+        ll.insert(0, 'a')
+        ll.insert(3, 'b')
+        ll.insert(len(ll), 'c')
+        self._check(ll, ['a', 0, 1, 'b', 2, 3, 4, 'c'])
+        with self.assertRaises(IndexError):
+            ll.insert(10, 'd')
+
+    def test_pop(self):
+        ll = LinkedList(range(6))
+        self.assertEqual(ll.pop(), 5)
+        self.assertEqual(ll.pop(0), 0)
+        self.assertEqual(ll.pop(2), 3)
+        self._check(ll, [1, 2, 4])
+        self.assertEqual(ll.pop(1), 2)
+        self.assertEqual(ll.pop(1), 4)
+        self.assertEqual(ll.pop(), 1)
+        self._check(ll, [])
+        with self.assertRaises(IndexError):
+            ll.pop()
+
+    def test_remove(self):
+        ll = LinkedList('abcab')
+        ll.remove('b')
+        self._check(ll, ['a', 'c', 'a', 'b'])
+        with self.assertRaises(ValueError):
+            ll.remove('z')
+
+    def test_random(self):
+        random.seed(5)
+        ll = LinkedList()
+        expected = []
+        for _ in range(2000):
+            operation = random.randrange(5)
+            if operation == 0 or not expected:
+                i = random.randint(0, len(expected))
+                ll.insert(i, _)
+                expected.insert(i, _)
+            elif operation == 1:
+                i = random.randrange(len(expected))
+                self.assertEqual(ll.pop(i), expected.pop(i))
+            elif operation == 2:
+                i = random.randrange(len(expected))
+                self.assertEqual(ll[i], expected[i])
+            elif operation == 3:
+                i = random.randrange(len(expected))
+                ll[i] = expected[i] = -_
+            else:
+                item = random.choice(expected)
+                ll.remove(item)
+                expected.remove(item)
+        self._check(ll, expected)
+
+
+class TestIndexedLinkedList(unittest.TestCase):
+    def _check(self, ll, expected):
+        TestLinkedList._check(self, ll, expected)
+        for item in set(expected):
+            self.assertIn(item, ll)
+            self.assertEqual(ll.count(item), expected.count(item))
+            self.assertEqual(ll.index(item), expected.index(item))
+        self.assertEqual(set(ll.nodes), set(expected))
+
+    def test_index(self):
+        ll = IndexedLinkedList('abcab')
+        self.assertTrue(issubclass(IndexedLinkedList, LinkedList))
+        self._check(ll, list('abcab'))
+        self.assertNotIn('z', ll)
+        self.assertEqual(ll.count('z'), 0)
+        with self.assertRaises(ValueError):
+            ll.index('z')
+
+        ll.remove('a')
+        self._check(ll, list('bcab'))
+        ll[0] = 'c'
+        self._check(ll, list('ccab'))
+        ll.insert(0, 'b')
+        ll.pop(3)
+        self._check(ll, list('bccb'))
+        ll.clear()
+        self._check(ll, [])
+
+    def test_random(self):
+        random.seed(7)
+        ll = IndexedLinkedList(recycle=True)
+        expected = []
+        for _ in range(2000):
+            operation = random.randrange(6)
+            item = random.randrange(50)
+            if operation == 0 or not expected:
+                i = random.randint(0, len(expected))
+                ll.insert(i, item)
+                expected.insert(i, item)
+            elif operation == 1:
+                i = random.randrange(len(expected))
+                self.assertEqual(ll.pop(i), expected.pop(i))
+            elif operation == 2:
+                i = random.randrange(len(expected))
+                ll[i] = expected[i] = item
+            elif operation == 3:
+                item = random.choice(expected)
+                ll.remove(item)
+                expected.remove(item)
+            elif operation == 4:
+                ll.extend([item, item])
+                expected.extend([item, item])
+            elif random.randrange(20) == 0:
+                ll.clear()
+                expected.clear()
+        self._check(ll, expected)
+
+    def test_iterator(self):
+        ll = IndexedLinkedList('abcd')
+        it = ll.listIterator()
+        it.seek('c')
+        self.assertEqual(it.next(), 'c')
+        it.replace('e')
+        self._check(ll, list('abce'))
+        it.remove()
+        self._check(ll, list('abc'))
+        it.insert('f')
+        self._check(ll, list('abfc'))
+        with self.assertRaises(ValueError):
+            it.seek('z')
+
+
+class TestListIterator(unittest.TestCase):
+    def test_browse(self):
+        ll = LinkedList(range(3))
+        it = ll.listIterator()
+        it.first()
+        self.assertEqual(it.next(), 0)
+        self.assertEqual(it.next(), 1)
+        self.assertFalse(it.hasNext())
+        it.last()
+        self.assertEqual(it.previous(), 2)
+
+    def test_seek(self):
+        ll = LinkedList('abcb')
+        it = ll.listIterator()
+        it.seek('b')
+        self.assertIs(it.cursor, ll.head.next)
+        with self.assertRaises(ValueError):
+            it.seek('z')
+
+    def test_mutators(self):
+        ll = LinkedList(range(4))
+        it = ll.listIterator()
+        it.insert('end')
+        self.assertEqual(list(ll), [0, 1, 2, 3, 'end'])
+
+        it.first()
+        it.insert('a')
+        self.assertIs(ll.head, it.cursor)
+        it.next()
+        it.next()
+        it.insert('b')
+        self.assertEqual(list(ll), ['a', 0, 'b', 1, 2, 3, 'end'])
+
+        it.remove()
+        self.assertEqual(it.cursor.data, 1)
+        it.last()
+        it.remove()
+        self.assertEqual(it.cursor.data, 3)
+        self.assertIs(ll.tail, it.cursor)
+        it.first()
+        it.remove()
+        self.assertEqual(list(ll), [0, 1, 2, 3])
+        self.assertIsNone(ll.head.previous)
+        self.assertEqual(ll[3], 3)
+
+
+if __name__ == "__main__":
+    unittest.main(argv=['ignore'], exit=False, verbosity=2)
@@ -15,31 +15,64 @@ N//2 pairs. A timer sets to 1 second gives a chance for a startegy to complete
 before sending a kill signal. According to the mass of data to process, the 
 --timeout option allows to increase the throttle. It is still possible tho
 that none of these strategies provide a N-1 saturated set.
-
-Threads were used to implement this try-an-fail strategy, leading to heavily
-instrument the code to be sensitive to the killing signal. Using processes 
-instead would have avoided such instrumentation by sending a SIGTERM signal.
-I chose the threading approach.
+With --portfolio, the strategies are instead ordered and timed from the
+record of the past races for the same number of employees.
+With --workers and --listen, the race is distributed over worker processes of
+this host or of others started with --worker, see distributed.py.
+With --checkpoint, a search aborted by --timeout is saved, and the next run
+resumes it: a long search is spread over several short runs.
+With --group-size, employees meet in groups instead of pairs, see groups.py.
+--profile and --memprofile report where the time and the memory go, see
+profiling.py.
+With --trace, the timeline of the run (setup, strategies, weeks, searches)
+is written in the Chrome trace-event format, see tracing.py.
+
+The strategies are tried in turn in the main thread: a single watchdog thread
+sets the cancellation token of the running strategy once its time lapses, and
+the search, instrumented to poll it, gives up. Using processes instead would
+have avoided such instrumentation by sending a SIGTERM signal.
 """
 
 
 __author__ = "Bertrand Blanc (Alan Turing)"
 
-from coffee import Meeting,Coffee
+from coffee import Meeting,Week,Coffee
 from employee import Employee,Employees
 import argparse
 import sys
 
 from decorator_timer import Timer
-from threading import Thread,Event
+from formats import FORMATS, WRITERS, writer
+from service import Planner, serve
+from history import History
+from portfolio import Portfolio
+from scheduler import interleave
+from distributed import AUTHKEY, Coordinator, Unit, shared_key, spawn, work
+from watchdog import watchdog
+from tracing import tracer
+from profiling import MemoryProfiler, print_stats
+import cProfile
+import io
+import json
+import os
 import time
 
 class Termination(Exception):
     pass
 
 class Main():
+    # strategies raced by default, in this order: the sorting strategies first,
+    # then the whole-rotation exact cover which completes the sizes they cannot
+    STRATEGIES = (0, 1, 2, 3, 4, Coffee.DLX_ROTATION)
+    # strategies time-sliced in a single thread with --cooperative
+    SLICED = (0, 1, 2, 3, 4)
+    # subtrees of the first week explored by each strategy with --workers
+    SUBTREES = 4
+
     def __init__(self, *args, **kargs):
         self.parser = None
+        # MemoryProfiler of --memprofile
+        self.memory = None
         if len(*args) == 0:
             args=[['-h']]
 
@@ -56,11 +89,25 @@ class Main():
         )
 
         self.parser.add_argument('--author', help="author", action='store_true')
-        self.parser.add_argument('--sorting', help="sorting mechanism to use. Different sorting strategies", nargs='?', type=int, default=-1, choices=[0,1,2,3,4])
+        self.parser.add_argument('--sorting', help="sorting mechanism to use. Different sorting strategies. 5: weighted matching favoring the pairs who met the least recently. 6: exact cover (Dancing Links) week by week. 7: exact cover of the whole rotation. 8: search of the whole rotation, backtracking across weeks", nargs='?', type=int, default=-1, choices=[0,1,2,3,4,5,6,7,8])
         self.parser.add_argument('--timer', help="enables the timer to monitor the elapsed time", action='store_true')
         self.parser.add_argument('--timeout', help="aborts the execution after N seconds. Dafault to 1s. May help giving more time to complete", action='store', type=int, metavar='N', default=1)
         self.parser.add_argument('--employees', '-e', help="number of employees", action='store', type=int, metavar='<integer>')
         self.parser.add_argument('--weeks', '-w', help="generate the pairing for this number of weeks", action='store', type=int, metavar='<integer>')
+        self.parser.add_argument('--group-size', '-g', help="meetings of this number of employees instead of pairs. Resolvable designs where they exist, greedy rounds with local search otherwise. Text output only", action='store', type=int, metavar='<integer>', default=2)
+        self.parser.add_argument('--propagate', help="forward checking in the search of the sorting strategies: dead ends are cut at their root", action='store_true')
+        self.parser.add_argument('--cooperative', help="interleaves the sorting strategies in a single thread instead of racing them in threads, within the total time of the race", action='store_true')
+        self.parser.add_argument('--format', help="output format. Default to text", action='store', default='text', choices=FORMATS)
+        self.parser.add_argument('--history', help="appends the weeks output to this SQLite meeting history", action='store', metavar='<path>')
+        self.parser.add_argument('--portfolio', help="JSON record of the past races: the strategies are ordered and timed by their expected time to solve this number of employees. Default to $COFFEE_PORTFOLIO", action='store', metavar='<path>', default=os.environ.get('COFFEE_PORTFOLIO'))
+        self.parser.add_argument('--trace', help="writes the timeline of the run to this Chrome trace-event JSON file, viewable in Perfetto", action='store', metavar='<path>')
+        self.parser.add_argument('--profile', help="runs under cProfile and prints the functions sorted by cumulative time on the standard error. The statistics are also saved to <path> if given, for pstats", nargs='?', const=True, metavar='<path>')
+        self.parser.add_argument('--memprofile', help="traces the allocations: peak memory and top allocation sites per phase (employees, graph, reset, weeks, output) on the standard error", action='store_true')
+        self.parser.add_argument('--checkpoint', help="with --sorting 0 to 4, an aborted search is saved to this file and the next run resumes from it. The iterative search is used, as with --propagate", action='store', metavar='<path>')
+        self.parser.add_argument('--workers', help="races the strategies over the subtrees of the first week in this number of local worker processes", action='store', type=int, metavar='<integer>')
+        self.parser.add_argument('--listen', help="address the coordinator of the workers listens on, for the workers of other hosts. Default to an ephemeral port of localhost. The protocol is pickle-based: requires the secret $COFFEE_AUTHKEY shared with the workers", action='store', metavar='<[host:]port>')
+        self.parser.add_argument('--worker', help="runs a worker pulling work units from the coordinator at this address until it stops. The protocol is pickle-based: requires the secret $COFFEE_AUTHKEY shared with the coordinator", action='store', metavar='<host:port>')
+        self.parser.add_argument('--serve', help="runs the planner service keeping the teams warm, on a port of localhost or on a Unix socket", action='store', metavar='<port|path>')
 
     def _dispatch(self):
         """Find out what part of code to trigger based on the CLI arguments"""
@@ -68,17 +115,62 @@ class Main():
             self._author()
             self._terminate()
 
+        if self.args.serve:
+            self._serve()
+            self._terminate()
+
+        if (self.args.worker or self.args.listen) and not shared_key():
+            # the messages are pickled: nobody without the secret shall connect
+            print(f'--worker and --listen need the secret ${AUTHKEY} shared by the coordinator and the workers')
+            self._terminate(-1)
+
+        if self.args.worker:
+            host, _, port = self.args.worker.rpartition(':')
+            work((host or '127.0.0.1', int(port)), authkey=shared_key())
+            self._terminate()
+
         if self.args.employees:
             # semantical properties and assumptions on employees
             if self.args.employees <= 0:
                 print(f'the number of employees shall be positive')
                 self._terminate(-1)
 
-            if self.args.employees % 2:
+            if self.args.group_size < 2 or self.args.group_size > self.args.employees:
+                print(f'the groups shall gather from 2 to {self.args.employees} employees')
+                self._terminate(-1)
+
+            if self.args.group_size != 2 and self.args.format != 'text':
+                print(f'the groups are only output as text')
+                self._terminate(-1)
+
+            if self.args.checkpoint and (self.args.sorting not in range(5) or self.args.weeks):
+                print(f'--checkpoint needs one of the sorting strategies 0 to 4 and no --weeks')
+                self._terminate(-1)
+
+            if self.args.employees % 2 and self.args.group_size == 2:
                 print(f'the number of employees shall be an even number')
                 self._terminate(-1)
 
-            self._run()
+            if self.args.trace:
+                tracer.enable()
+            profile = cProfile.Profile() if self.args.profile else None
+            self.memory = MemoryProfiler() if self.args.memprofile else None
+            try:
+                with tracer.span('run', cat='main'):
+                    if self.memory:
+                        self.memory.start()
+                    if profile:
+                        profile.enable()
+                    self._run()
+            finally:
+                if profile:
+                    profile.disable()
+                    print_stats(profile, sys.stderr, path=self.args.profile if isinstance(self.args.profile, str) else None)
+                if self.memory:
+                    self.memory.report(sys.stderr)
+                    self.memory.stop()
+                if self.args.trace:
+                    tracer.save(self.args.trace)
             self._terminate()
 
         self._terminate(-1)
@@ -87,38 +179,47 @@ class Main():
     def _author(self):
         print('Bertrand Blanc (Alan Turing)')
 
-    def _run(self):
-        def _timeout(n, signal, inc=0.01):
-            """timeout function triggering a signal once the time lapses
-            The timer can be interrupted if the signal has been raised by
-            another thread.
-            """
-            cpt = 0
-            while not signal.is_set() and cpt < n:
-                time.sleep(inc)
-                cpt += inc
-            signal.set()
+    def _serve(self):
+        """Runs the planner service until interrupted"""
+        address = int(self.args.serve) if self.args.serve.isdigit() else self.args.serve
+        server = serve(Planner(), address, verbose=self.args.timer)
+        print(f'planner service listening on {self.args.serve}', file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
 
+    def _run(self):
         # timeout setting for the following decorator allowing to display
         # the elapsed time and/or to abort a too long execution
         timeout = self.args.timeout if self.args.sorting >= 0 else None
 
-        @Timer(self.args.timer, timeout=timeout)
-        def _execute(self, employees:Employees, *, sorting_algo=None, signal=None, data:dict={}) -> None:
+        @Timer(self.args.timer, timeout=timeout, token='signal')
+        def _execute(self, employees:Employees, *, sorting_algo=None, signal=None, data:dict={}, base=None) -> None:
             """This is the core algorith to exercise the different sorting mechanism to find
             the N-1 N//2 pairs of unique employees
             :employees: list of employees
             :sorting algo: allows to select the algorith to run. None to select the one by default.
-            :signal: signal to communicate the termonation of the process/thread
-            :data: threads don't return data, hence the data are passed by reference
+            :signal: cancellation token set by the watchdog once the time lapses, see watchdog.Token
+            :data: the data are passed by reference, hence kept when the run is aborted
+            :base: graph of the employees built once and shared by the strategies, see Coffee.base_graph
             data['finished'] = True - the algo terminated. False - the algo was interrupted.
-            data['data'] = str of N-1 saturated pairs of employees upon successful completion.
+            data['data'] = spool holding the N-1 saturated pairs of employees in the requested --format.
             """
 
             assert self.args.employees % 2 == 0, "BUG, the number of employees shall be even"
 
+            # the weeks are streamed to a spool which is only released once the run is known to be complete:
+            # an aborted or timed out run shall not print partial data
+            out = writer(self.args.format)
+            spool = out.sink
             data['finished'] = False
-            data['data'] = f'Employees: {employees}\n'
+            data['data'] = spool
+            data['weeks'] = []
+
+            out.header(employees)
 
             if self.args.weeks:
                 # I implemented an option to produce the saturated lists of pairs for a random number of weeks
@@ -127,66 +228,243 @@ class Main():
 
                 # note the usage of a more comprehensive iterator to add extra settings required for this multi-threaded approach
                 # the basic __iter__ iterator cannot be used directly, hence implementing an iterator via __next__
-                planning = Coffee(employees).feed(endless=True, asynchronous_signal=signal, sorting_algo=sorting_algo)
+                coffee = Coffee(employees, base=base)
+                self._checkpoint('reset')
+                planning = coffee.feed(endless=True, asynchronous_signal=signal, sorting_algo=sorting_algo, propagate=self.args.propagate)
                 for i in range(self.args.weeks):
                     meetings, new_set = next(planning)
-                    data['data'] += f'{"(Repeat)" if new_set else ""}week {i+1}: {meetings}\n'
+                    out.week(i+1, meetings, new_set)
+                    data['weeks'].append((i+1, meetings))
+                    self._checkpoint('week')
+                complete = True
             else:
                 # If this option is not set, the sequence of N-1 is generated
                 # Basic iterator is used __iter__
-                planning = Coffee(employees).feed(asynchronous_signal=signal, sorting_algo=sorting_algo)
-                for i, meetings in enumerate(planning):
-                    data['data'] += f'week {i+1}: {meetings}\n'
-
-
-            if signal and not signal.is_set():
+                coffee = Coffee(employees, base=base)
+                self._checkpoint('reset')
+                # with --checkpoint, the weeks of a previous run are replayed, the iterative search resumes its frontier
+                replayed = self._resume(coffee)
+                for i, meetings in enumerate(replayed):
+                    out.week(i+1, meetings)
+                    data['weeks'].append((i+1, meetings))
+                propagate = self.args.propagate or bool(self.args.checkpoint)
+                planning = coffee.feed(asynchronous_signal=signal, sorting_algo=sorting_algo, propagate=propagate)
+                weeks = len(replayed)
+                for i, meetings in enumerate(planning, start=weeks):
+                    out.week(i+1, meetings)
+                    data['weeks'].append((i+1, meetings))
+                    self._checkpoint('week')
+                    weeks += 1
+                # the solvers proving that no further week exists stop early
+                complete = weeks == len(employees) - 1
+                if self.args.checkpoint:
+                    self._suspend(coffee, signal is not None and signal.is_set())
+
+            out.footer()
+            self._checkpoint('output')
+            data['stats'] = coffee.stats
+
+            if signal and not signal.is_set() and complete:
                 # the algorithm successfully terminated without being aborted
                 data['finished'] = True
 
-            if signal is None:
-                # if no signal was set, this means no multi-threaded approach was used
-                # hence relying on basic arguments and a specific sorting algorithm.
-                print(data['data'])
-        
 
         # The declaration of the employees
-        employees = Employees()
-        employees.fill(number=self.args.employees)
+        with tracer.span('setup', cat='main', employees=self.args.employees):
+            employees = Employees()
+            employees.fill(number=self.args.employees)
+            self._checkpoint('employees')
+            # the complete graph is built once, each strategy only records the pairs it schedules
+            base = Coffee.base_graph(employees)
+            self._checkpoint('graph')
+
+        if self.args.group_size != 2:
+            self._groups(employees)
+            return
 
         if self.args.sorting >= 0:
-            # a specific sorting algorithm is selected (no multi-threading)
-            _execute(self, employees, sorting_algo=self.args.sorting)
+            # a specific sorting algorithm is selected, the Timer raises a TimeoutError once aborted
+            data = dict()
+            _execute(self, employees, sorting_algo=self.args.sorting, data=data, base=base)
+            self._output(data['data'], data['stats'])
+            self._record(data['weeks'])
+            return
+
+        if self.args.cooperative:
+            self._cooperative(employees, base)
+            return
+
+        if self.args.workers or self.args.listen:
+            self._distributed(employees, base)
             return
         
-        # No specific sorting algorithm is selected, hence the multi-threaded approach
-        # to find a working strategy, if any
+        # No specific sorting algorithm is selected, hence the strategies are tried in turn
+        # to find a working one, if any
         timeout = self.args.timeout
-        threads  = []
-        timers   = []
-        results  = []
-        signal   = Event() # even to carry the abortion signal between threads
 
-        for idx in range(5):
-            # the results from the algo are passed by reference
-            results.append(dict())
-            # the thread running a specific algo
-            threads.append(Thread(target=_execute, args=(self,employees), kwargs={'sorting_algo':idx, 'signal':signal, 'data':results[idx]}))
-            # the timeout thread raising the abortion signal according to the timeout value (default 1 second, can be increased with --timeout option)
-            timers.append(Thread(target=_timeout, args=(timeout, signal)))
+        # with a portfolio, the strategies are ordered and given a budget from the past runs for this size
+        portfolio = Portfolio(self.args.portfolio) if self.args.portfolio else None
+        if portfolio:
+            schedule = portfolio.schedule(Main.STRATEGIES, len(employees), timeout)
+        else:
+            schedule = [(algo, timeout) for algo in Main.STRATEGIES]
 
-        for thread,timer,result in zip(threads,timers,results):
+        for algo, budget in schedule:
             # iterating for each sorting strategy until one successfully completes
-            signal.clear()
-            thread.start()
-            timer.start()
-            
-            timer.join()
-            thread.join()
-
-            if result.get('finished',False):
-                print(result['data'])
+            # the results from the algo are passed by reference
+            result = dict()
+            # the watchdog sets the token once the budget lapses (default 1 second, can be increased with --timeout option),
+            # the strategy polls it and gives up: no timer thread is started per strategy
+            token = watchdog.watch(budget, name=f'sorting strategy {algo}')
+            start = time.perf_counter()
+            try:
+                with tracer.span('strategy', cat='main', algo=algo, budget=budget):
+                    _execute(self, employees, sorting_algo=algo, signal=token, data=result, base=base)
+            finally:
+                token.finish()
+            elapsed = time.perf_counter() - start
+
+            finished = result.get('finished',False)
+            if portfolio:
+                portfolio.record(algo, len(employees), finished, elapsed)
+
+            if finished:
+                self._output(result['data'], result['stats'])
+                self._record(result['weeks'])
                 break
 
+        if portfolio:
+            portfolio.save()
+
+    def _cooperative(self, employees, base):
+        """The sorting strategies are time-sliced in this thread until one of them
+        schedules the whole cycle, see scheduler.interleave"""
+        planners = {algo: Coffee(employees, base=base) for algo in Main.SLICED}
+        self._checkpoint('reset')
+        tasks = {algo: coffee.cycle(sorting_algo=algo, propagate=self.args.propagate) for algo, coffee in planners.items()}
+        algo, cycle = interleave(tasks, timeout=self.args.timeout * len(tasks))
+        self._checkpoint('weeks')
+        if cycle is None or len(cycle) != len(employees) - 1:
+            return
+        self._cycle(employees, cycle, planners[algo].stats)
+
+    def _distributed(self, employees, base):
+        """The strategies explore the subtrees of the first week in worker processes,
+        local ones and the ones connecting to --listen, until one of them schedules the whole
+        cycle, see distributed.Coordinator"""
+        units = Unit.plan(Main.STRATEGIES, Main.SUBTREES, self.args.timeout)
+        address = ('127.0.0.1', 0)
+        if self.args.listen:
+            host, _, port = self.args.listen.rpartition(':')
+            address = (host or '127.0.0.1', int(port))
+
+        # a random key unless the workers of other hosts connect
+        authkey = shared_key() if self.args.listen else None
+        with Coordinator(len(employees), units, address=address, authkey=authkey, propagate=self.args.propagate) as coordinator:
+            if self.args.listen:
+                print(f'coordinator listening on {coordinator.address[0]}:{coordinator.address[1]}', file=sys.stderr)
+            workers = spawn(coordinator.address, self.args.workers or 0, authkey=coordinator.authkey)
+            result = coordinator.run(timeout=self.args.timeout * len(units))
+        for worker in workers:
+            worker.join()
+        self._checkpoint('weeks')
+        if result is None:
+            return
+
+        coffee = Coffee(employees, base=base)
+        unit, pairs = result
+        if self.args.timer:
+            print(f'{unit}, {coordinator.stats}', file=sys.stderr)
+        self._cycle(employees, [Week(coffee.planning, week) for week in pairs])
+
+    def _cycle(self, employees, cycle, stats=None):
+        """Outputs a whole cycle of weeks, repeated up to --weeks"""
+        out = writer(self.args.format)
+        spool = out.sink
+        out.header(employees)
+        weeks = []
+        for i in range(self.args.weeks or len(cycle)):
+            # the same cycle is repeated for the extra weeks
+            out.week(i+1, cycle[i % len(cycle)], i > 0 and i % len(cycle) == 0)
+            weeks.append((i+1, cycle[i % len(cycle)]))
+        out.footer()
+        self._checkpoint('output')
+
+        self._output(spool, stats)
+        self._record(weeks)
+
+    def _groups(self, employees):
+        """Rounds of groups of --group-size employees, see Coffee.groups"""
+        rounds = Coffee(employees).groups(self.args.group_size, rounds=self.args.weeks)
+        self._checkpoint('weeks')
+
+        spool = io.StringIO()
+        spool.write('Employees: [' + ', '.join(map(str, employees)) + ']\n')
+        for i, groups in enumerate(rounds):
+            spool.write(f'week {i+1}: [' + ', '.join(map(str, groups)) + ']\n')
+        spool.write('\n')
+        self._checkpoint('output')
+        self._output(spool)
+
+    def _output(self, spool, stats=None):
+        """Releases the spooled output of a completed run to the standard output
+        The counters of the search are reported on the standard error along with the timer."""
+        tracer.instant('output', cat='main')
+        if self.args.timer and stats:
+            print(', '.join(f'{key}: {value}' for key, value in stats.items()), file=sys.stderr)
+            if stats.get('memo_lookups'):
+                print(f'transposition table hit rate: {stats["memo_hits"] / stats["memo_lookups"]:.1%}', file=sys.stderr)
+        if self.args.timer:
+            # work signalled by the watchdog which still did not give up
+            for token in watchdog.orphans():
+                print(f'orphan: {token} still running after its deadline', file=sys.stderr)
+        if WRITERS[self.args.format].binary:
+            sys.stdout.flush()
+            sys.stdout.buffer.write(spool.getvalue())
+            sys.stdout.buffer.flush()
+        else:
+            sys.stdout.write(spool.getvalue())
+
+
+    def _checkpoint(self, phase):
+        """End of a phase of the run for --memprofile"""
+        if self.memory:
+            self.memory.checkpoint(phase)
+
+    def _resume(self, coffee):
+        """Replays the --checkpoint of a previous run, if any
+        :return: list of the weeks replayed"""
+        if not self.args.checkpoint or not os.path.exists(self.args.checkpoint):
+            return []
+        try:
+            with open(self.args.checkpoint, 'r', encoding='utf-8') as fd:
+                weeks = coffee.resume(json.load(fd))
+        except (OSError, ValueError, KeyError) as e:
+            print(f'ignoring the checkpoint {self.args.checkpoint}: {e}', file=sys.stderr)
+            coffee.reset()
+            return []
+        print(f'resuming from {self.args.checkpoint} after {len(weeks)} weeks', file=sys.stderr)
+        return weeks
+
+    def _suspend(self, coffee, aborted):
+        """Saves the state of an aborted search to --checkpoint, a search over has no use of it"""
+        if not aborted:
+            if os.path.exists(self.args.checkpoint):
+                os.remove(self.args.checkpoint)
+            return
+        temporary = self.args.checkpoint + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as fd:
+            json.dump(coffee.checkpoint(), fd, separators=(',', ':'))
+        os.replace(temporary, self.args.checkpoint)
+        print(f'search checkpointed to {self.args.checkpoint} after {len(coffee.committed)} weeks', file=sys.stderr)
+
+    def _record(self, weeks):
+        """Appends the weeks output to the --history database, after the last week recorded"""
+        if not self.args.history:
+            return
+        with History(self.args.history) as history:
+            offset = history.last_week()
+            history.extend((offset + week, meetings) for week, meetings in weeks)
 
     def _terminate(self, exit_=0):
         termination = Termination()
@@ -0,0 +1,99 @@
+from matching import *
+import unittest
+import random
+
+
+def brute_force(n, edges, maxcardinality=False):
+    """best (cardinality, weight) over all the matchings, or best weight"""
+    best = (0, 0)
+
+    def explore(k, used, cardinality, weight):
+        nonlocal best
+        if k == len(edges):
+            key = (cardinality, weight) if maxcardinality else (0, weight)
+            best = max(best, key)
+            return
+        explore(k + 1, used, cardinality, weight)
+        i, j, wt = edges[k]
+        if not used & ((1 << i) | (1 << j)):
+            explore(k + 1, used | (1 << i) | (1 << j), cardinality + 1, weight + wt)
+
+    explore(0, 0, 0, 0)
+    return best
+
+
+class TestMaxWeightMatching(unittest.TestCase):
+    def _check(self, edges, mate):
+        """mate is a matching of the graph, and returns its (cardinality, weight)"""
+        weights = {}
+        for i, j, wt in edges:
+            weights[(i, j)] = weights[(j, i)] = wt
+        cardinality, weight = 0, 0
+        for v, m in enumerate(mate):
+            if m == -1:
+                continue
+            self.assertEqual(mate[m], v)
+            self.assertIn((v, m), weights)
+            if v < m:
+                cardinality += 1
+                weight += weights[(v, m)]
+        return cardinality, weight
+
+    def test_empty(self):
+        self.assertEqual(max_weight_matching([]), [])
+
+    def test_single_edge(self):
+        self.assertEqual(max_weight_matching([(0, 1, 1)]), [1, 0])
+        # matching a zero weight edge or not weighs the same, unless the cardinality matters
+        self.assertEqual(self._check([(0, 1, 0)], max_weight_matching([(0, 1, 0)]))[1], 0)
+        self.assertEqual(max_weight_matching([(0, 1, 0)], maxcardinality=True), [1, 0])
+
+    def test_path(self):
+        edges = [(0, 1, 10), (1, 2, 11)]
+        self.assertEqual(max_weight_matching(edges), [-1, 2, 1])
+        edges = [(0, 1, 5), (1, 2, 11), (2, 3, 5)]
+        self.assertEqual(max_weight_matching(edges), [-1, 2, 1, -1])
+        self.assertEqual(max_weight_matching(edges, maxcardinality=True), [1, 0, 3, 2])
+
+    def test_blossom(self):
+        # the triangle 0-1-2 is shrunk into a blossom, then expanded by the augmentation through 3
+        edges = [(0, 1, 8), (0, 2, 9), (1, 2, 10), (2, 3, 7)]
+        self.assertEqual(max_weight_matching(edges), [1, 0, 3, 2])
+        # nested blossoms: two triangles sharing the augmenting paths
+        edges = [(0, 1, 9), (0, 2, 9), (1, 2, 10), (1, 3, 8), (2, 4, 8), (3, 4, 10), (4, 5, 6)]
+        self.assertEqual(self._check(edges, max_weight_matching(edges))[1], brute_force(6, edges)[1])
+        # odd cycle of length 5 with pendant vertices
+        edges = [(0, 1, 5), (1, 2, 5), (2, 3, 5), (3, 4, 5), (4, 0, 5), (0, 5, 3), (2, 6, 3), (3, 7, 3)]
+        self.assertEqual(self._check(edges, max_weight_matching(edges))[1], brute_force(8, edges)[1])
+
+    def test_random(self):
+        rng = random.Random(29)
+        for trial in range(400):
+            n = rng.randint(2, 8)
+            p = rng.random()
+            edges = []
+            for i in range(n):
+                for j in range(i + 1, n):
+                    if rng.random() < p:
+                        match trial % 3:
+                            case 0:
+                                wt = rng.randint(0, 10)
+                            case 1:
+                                wt = rng.choice([0, 0.5, 1.25, 2.75, 3.5])
+                            case _:
+                                wt = rng.randint(1, 3)
+                        edges.append((i, j, wt))
+            if not edges:
+                continue
+            for maxcardinality in [False, True]:
+                with self.subTest(trial=trial, maxcardinality=maxcardinality):
+                    mate = max_weight_matching(edges, maxcardinality=maxcardinality)
+                    cardinality, weight = self._check(edges, mate)
+                    best = brute_force(n, edges, maxcardinality)
+                    if maxcardinality:
+                        self.assertEqual(cardinality, best[0])
+                    self.assertAlmostEqual(weight, best[1])
+
+
+if __name__ == "__main__":
+    unittest.main(argv=['ignore'], exit=False, verbosity=2)
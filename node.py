@@ -3,10 +3,13 @@ File: node.py
 
 Node classes for one-way linked structures and two-way
 linked structures.
+The nodes are slotted: no per-node __dict__, since the nodes
+make most of the memory and of the build time of a list.
 """
 
 
 class Node(object):
+    __slots__ = ('data', 'next')
 
     def __init__(self, data, next = None):
         """Instantiates a Node with default next of None"""
@@ -14,16 +17,8 @@ class Node(object):
         self.next = next
 
 class TwoWayNode(Node):
+    __slots__ = ('previous',)
 
     def __init__(self, data, previous = None, next = None):
         Node.__init__(self, data, next)
         self.previous = previous
-
-# Just an empty link
-node1 = None
-
-# A node containing data and an empty link
-node2 = Node("A", None)
-
-# A node containing data and a link to node2
-node3 = Node("B", node2)
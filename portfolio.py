@@ -0,0 +1,99 @@
+"""
+Self-tuning ordering of the strategies raced by main.py.
+
+The success of a sorting strategy depends strongly on the number of employees:
+the record keeps, per (strategy, bucket of N), the number of runs, of
+successes, and the solve times of the successes. It is persisted as JSON
+and updated after every race.
+
+Each strategy gets an expected time-to-solution:
+    mean solve time + (1 - p) / p * timeout
+with p the probability of success, estimated with Laplace's rule
+(successes + 1) / (runs + 2). A strategy never seen gets p = 1/2 and a
+solve time of half the timeout. The strategies are raced by increasing
+expected time-to-solution, the known-good ones with a budget of twice
+their slowest success, never more than the timeout.
+"""
+
+__author__ = "Bertrand Blanc (Alan Turing)"
+__all__ = ["Portfolio"]
+
+import json
+import os
+
+
+class Portfolio():
+    """Persistent record of the strategies' successes and solve times per size of roster"""
+
+    # exact sizes up to that number of employees, powers of 2 above
+    EXACT = 64
+    # slack on the slowest success, and minimal budget in seconds
+    MARGIN = 2
+    FLOOR = 0.1
+
+    def __init__(self, path=None):
+        """
+        :param path: JSON file of the record, loaded if it exists. None keeps the record in memory.
+        """
+        self.path = path
+        self.records = dict()
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as fd:
+                    self.records = json.load(fd).get('records', dict())
+            except (OSError, ValueError):
+                # a corrupted record is relearnt from scratch
+                self.records = dict()
+
+    @staticmethod
+    def bucket(employees):
+        """bucket of a number of employees"""
+        if employees <= Portfolio.EXACT:
+            return employees
+        return 1 << (employees - 1).bit_length()
+
+    def _record(self, strategy, employees):
+        return self.records.get(f'{strategy}/{Portfolio.bucket(employees)}')
+
+    def record(self, strategy, employees, success, elapsed):
+        """learns from a strategy run
+        :param elapsed: seconds spent by the strategy
+        """
+        key = f'{strategy}/{Portfolio.bucket(employees)}'
+        record = self.records.setdefault(key, dict(runs=0, successes=0, time=0.0, slowest=0.0))
+        record['runs'] += 1
+        if success:
+            record['successes'] += 1
+            record['time'] += elapsed
+            record['slowest'] = max(record['slowest'], elapsed)
+
+    def expected(self, strategy, employees, timeout):
+        """expected time-to-solution of a strategy, in seconds"""
+        # a strategy never seen gets the prior of Laplace's rule: p = 1/2, half the timeout to solve
+        record = self._record(strategy, employees) or dict(runs=0, successes=0, time=0.0)
+        probability = (record['successes'] + 1) / (record['runs'] + 2)
+        mean = record['time'] / record['successes'] if record['successes'] else timeout / 2
+        return mean + (1 - probability) / probability * timeout
+
+    def budget(self, strategy, employees, timeout):
+        """time granted to a strategy: a margin over its slowest success, the timeout if it never succeeded"""
+        record = self._record(strategy, employees)
+        if record is None or not record['successes']:
+            return timeout
+        return min(timeout, max(Portfolio.FLOOR, Portfolio.MARGIN * record['slowest']))
+
+    def schedule(self, strategies, employees, timeout):
+        """orders the strategies by expected time-to-solution, the given order breaking the ties
+        :return: list of (strategy, budget in seconds)
+        """
+        ranked = sorted(enumerate(strategies), key=lambda x: (self.expected(x[1], employees, timeout), x[0]))
+        return [(strategy, self.budget(strategy, employees, timeout)) for _, strategy in ranked]
+
+    def save(self):
+        """writes the record atomically"""
+        if not self.path:
+            return
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as fd:
+            json.dump(dict(version=1, records=self.records), fd, indent=1, sort_keys=True)
+        os.replace(temporary, self.path)
@@ -0,0 +1,66 @@
+from portfolio import *
+import unittest
+import os
+import tempfile
+
+
+class TestPortfolio(unittest.TestCase):
+    def test_bucket(self):
+        self.assertEqual(Portfolio.bucket(10), 10)
+        self.assertEqual(Portfolio.bucket(64), 64)
+        self.assertEqual(Portfolio.bucket(66), 128)
+        self.assertEqual(Portfolio.bucket(128), 128)
+
+    def test_default(self):
+        # nothing learnt yet: the given order and the full timeout
+        portfolio = Portfolio()
+        self.assertEqual(portfolio.schedule((0, 1, 2), 10, 1), [(0, 1), (1, 1), (2, 1)])
+
+    def test_schedule(self):
+        portfolio = Portfolio()
+        for _ in range(5):
+            portfolio.record(0, 10, False, 1.0)
+            portfolio.record(2, 10, True, 0.02)
+        portfolio.record(1, 10, True, 0.3)
+
+        schedule = portfolio.schedule((0, 1, 2), 10, 1)
+        self.assertEqual([strategy for strategy, _ in schedule], [2, 1, 0])
+        self.assertEqual(dict(schedule), {2: Portfolio.FLOOR, 1: 0.6, 0: 1})
+
+        # the other sizes are not affected
+        self.assertEqual(portfolio.schedule((0, 1, 2), 12, 1), [(0, 1), (1, 1), (2, 1)])
+
+        # a success in 0.6 x timeout ranks ahead of a strategy never tried
+        portfolio = Portfolio()
+        portfolio.record(1, 10, True, 0.6)
+        self.assertEqual([strategy for strategy, _ in portfolio.schedule((0, 1), 10, 1)], [1, 0])
+
+    def test_expected(self):
+        portfolio = Portfolio()
+        # never seen: p = 1/2, 1 + 1 * 2
+        self.assertEqual(portfolio.expected(0, 10, 2), 3)
+        portfolio.record(0, 10, True, 0.5)
+        # p = 2/3: 0.5 + 0.5 * 2
+        self.assertAlmostEqual(portfolio.expected(0, 10, 2), 1.5)
+        portfolio.record(0, 10, False, 2)
+        # p = 1/2: 0.5 + 1 * 2
+        self.assertAlmostEqual(portfolio.expected(0, 10, 2), 2.5)
+
+    def test_save(self):
+        path = os.path.join(tempfile.mkdtemp(), 'portfolio.json')
+        portfolio = Portfolio(path)
+        portfolio.record(3, 20, True, 0.25)
+        portfolio.save()
+
+        portfolio = Portfolio(path)
+        self.assertEqual(portfolio.records['3/20'], dict(runs=1, successes=1, time=0.25, slowest=0.25))
+        os.remove(path)
+
+        with open(path, 'w') as fd:
+            fd.write('{corrupted')
+        self.assertEqual(Portfolio(path).records, dict())
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    unittest.main(argv=['ignore'], exit=False, verbosity=2)
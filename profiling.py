@@ -0,0 +1,95 @@
+"""
+CPU and memory profiling of a run of main.py.
+
+* --profile runs the pipeline under cProfile, the statistics are printed
+  sorted by cumulative time and can be saved for pstats or snakeviz
+* --memprofile traces the allocations with tracemalloc. The run calls
+  checkpoint() at the end of each phase (filling the employees, reset of the
+  graph, each week, output): the peak and current memory are measured per
+  phase, and the allocation sites of a phase are the growth between its
+  first checkpoint and the previous one. Snapshots are expensive, hence only
+  the first occurrence of a repeated phase (e.g. the weeks) is snapshotted,
+  the peaks covering all of them.
+"""
+
+__author__ = "Bertrand Blanc (Alan Turing)"
+__all__ = ["MemoryProfiler", "print_stats"]
+
+import pstats
+import tracemalloc
+
+
+def print_stats(profile, stream, *, sort='cumulative', limit=25, path=None):
+    """prints the top functions of a cProfile.Profile
+    :param path: optional file where the raw statistics are dumped, for pstats
+    """
+    stats = pstats.Stats(profile, stream=stream)
+    if path:
+        stats.dump_stats(path)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+
+
+class MemoryProfiler():
+    """Peak memory and allocation sites per phase of the run"""
+
+    # the bookkeeping of the profiler is not reported
+    FILTERS = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+
+    def __init__(self, *, top=10, frames=1):
+        """
+        :param top: number of allocation sites reported per phase
+        :param frames: depth of the tracebacks recorded by tracemalloc
+        """
+        self.top = top
+        self.frames = frames
+        # phase -> dict(count, current, peak, sites), in the order of the first checkpoint
+        self.phases = dict()
+        self.snapshot = None
+        self.started = False
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(MemoryProfiler.FILTERS)
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self.started = True
+        tracemalloc.reset_peak()
+        self.snapshot = self._snapshot()
+
+    def stop(self):
+        if self.started:
+            tracemalloc.stop()
+            self.started = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def checkpoint(self, phase):
+        """end of a phase: records its memory, the peak is reset for the next one"""
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+        record = self.phases.get(phase)
+        if record is None:
+            snapshot = self._snapshot()
+            growth = snapshot.compare_to(self.snapshot, 'lineno')
+            sites = [(str(stat.traceback), stat.size_diff, stat.count_diff) for stat in growth[:self.top]]
+            self.snapshot = snapshot
+            record = self.phases[phase] = dict(count=0, current=0, peak=0, sites=sites)
+
+        record['count'] += 1
+        record['current'] = current
+        record['peak'] = max(record['peak'], peak)
+
+    def report(self, stream):
+        """prints the memory per phase and its top allocation sites"""
+        for phase, record in self.phases.items():
+            print(f"{phase}: {record['count']} checkpoint(s), current {record['current'] / 1024:.1f} KiB, "
+                  f"peak {record['peak'] / 1024:.1f} KiB", file=stream)
+            for site, size, count in record['sites']:
+                print(f'    {site}: {size / 1024:+.1f} KiB in {count:+d} blocks', file=stream)
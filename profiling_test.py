@@ -0,0 +1,47 @@
+from profiling import *
+import cProfile
+import unittest
+import io
+import os
+
+
+class TestProfiling(unittest.TestCase):
+    def test_memory(self):
+        with MemoryProfiler(top=3) as memory:
+            small = [0] * 10
+            memory.checkpoint('small')
+            large = [bytes(1000) for _ in range(1000)]
+            memory.checkpoint('large')
+            for _ in range(3):
+                memory.checkpoint('repeated')
+
+        self.assertEqual(list(memory.phases), ['small', 'large', 'repeated'])
+        self.assertEqual(memory.phases['repeated']['count'], 3)
+        self.assertGreater(memory.phases['large']['peak'], 1000 * 1000)
+        self.assertLessEqual(len(memory.phases['large']['sites']), 3)
+        site, size, count = memory.phases['large']['sites'][0]
+        self.assertIn('profiling_test.py', site)
+        self.assertGreater(size, 1000 * 1000)
+        self.assertFalse(memory.started)
+
+        stream = io.StringIO()
+        memory.report(stream)
+        self.assertTrue(stream.getvalue().startswith('small: 1 checkpoint(s)'))
+        del small, large
+
+    def test_stats(self):
+        FILE = 'profile.prof'
+        profile = cProfile.Profile()
+        profile.enable()
+        sorted(range(1000), key=lambda x: -x)
+        profile.disable()
+
+        stream = io.StringIO()
+        print_stats(profile, stream, limit=5, path=FILE)
+        self.assertIn('cumulative', stream.getvalue())
+        self.assertTrue(os.path.exists(FILE))
+        os.remove(FILE)
+
+
+if __name__ == "__main__":
+    unittest.main(argv=['ignore'], exit=False, verbosity=2)
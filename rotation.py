@@ -0,0 +1,148 @@
+"""
+Whole-rotation solver: the weeks are searched as one problem.
+
+Coffee._Week commits each week greedily, and a dead end at week k+1 stops the
+iteration for good. Here every week is a level of a depth-first search: the
+perfect matchings of the remaining graph are enumerated one after the other
+(search.WeekSearch), and when week k+1 has no matching left, week k moves on
+to its next matching, and so on up to the first week.
+
+The remaining graph is identified by the bitmask of its remaining edges.
+Once every matching of a graph was tried, that graph is proven unsolvable and
+remembered in a transposition table.
+
+The search ends with one of three outcomes:
+* COMPLETE   - every week was found
+* INFEASIBLE - the whole search space was exhausted: no rotation exists
+* BUDGET     - the node budget ran out or the search was aborted
+"""
+
+__author__ = "Bertrand Blanc (Alan Turing)"
+__all__ = ["Rotation", "RotationSolver"]
+
+from search import WeekSearch, TranspositionTable
+
+
+class Rotation():
+    """Outcome of the rotation solver"""
+    COMPLETE = 'complete'
+    INFEASIBLE = 'infeasible'
+    BUDGET = 'budget'
+
+    def __init__(self, status, weeks, nodes):
+        """
+        :param status: COMPLETE, INFEASIBLE or BUDGET
+        :param weeks: list of the weeks, each a list of (id1, id2) pairs. Empty unless COMPLETE.
+        :param nodes: number of tentative pairs explored
+        """
+        self.status = status
+        self.weeks = weeks
+        self.nodes = nodes
+
+    def __bool__(self):
+        return self.status == Rotation.COMPLETE
+
+    def __len__(self):
+        return len(self.weeks)
+
+    def __str__(self):
+        return f'{self.status}: {len(self.weeks)} weeks, {self.nodes} nodes'
+
+
+class RotationSolver():
+    """Depth-first search over the weeks, backtracking across weeks"""
+
+    def __init__(self, partners, weeks=None, *, propagate=True, budget=None, memo=1 << 16):
+        """
+        :param partners: vertex ID -> iterable of the IDs it can still meet (both directions)
+        :param weeks: number of weeks to find, default to as many as the least connected employee allows
+        :param propagate: forward checking inside each week
+        :param budget: maximum number of tentative pairs, None for no limit
+        :param memo: capacity of the transposition tables, 0 disables them
+        """
+        self.partners = {v: set(p) for v, p in partners.items()}
+        self.weeks = min((len(p) for p in self.partners.values()), default=0) if weeks is None else weeks
+        self.propagate = propagate
+        self.budget = budget
+        self.memo = TranspositionTable(memo)
+        self.week_memo = memo
+
+        # every remaining edge is a bit of the key identifying the remaining graph
+        self.edges = dict()
+        for v, p in self.partners.items():
+            for n in p:
+                key = (min(v, n), max(v, n))
+                if key not in self.edges:
+                    self.edges[key] = 1 << len(self.edges)
+
+    def _week(self):
+        """generator of the matchings of the remaining graph, least connected employees first"""
+        order = sorted(self.partners, key=lambda v: (len(self.partners[v]), v))
+        partners = {v: sorted(p, reverse=True) for v, p in self.partners.items()}
+        return WeekSearch(order, partners, propagate=self.propagate, memo=self.week_memo)
+
+    def _apply(self, matching, remove):
+        """removes (or restores) the edges of a matching from the remaining graph"""
+        for v, n in matching:
+            if remove:
+                self.partners[v].discard(n)
+                self.partners[n].discard(v)
+            else:
+                self.partners[v].add(n)
+                self.partners[n].add(v)
+
+    def solve(self, termination=None):
+        """Searches the whole rotation. The solver is meant to be used once.
+        :param termination: optional Event aborting the search once set
+        :return: Rotation
+        """
+        if self.weeks == 0:
+            return Rotation(Rotation.COMPLETE, [], 0)
+
+        nodes = 0
+        remaining = sum(self.edges.values())
+        searches = [self._week()]
+        generators = [searches[0].solutions(termination)]
+        chosen = []
+        keys = [remaining]
+
+        def explored():
+            return nodes + sum(search.stats['nodes'] for search in searches)
+
+        while generators:
+            if termination and termination.is_set():
+                return Rotation(Rotation.BUDGET, [], explored())
+            if self.budget is not None and explored() > self.budget:
+                return Rotation(Rotation.BUDGET, [], explored())
+
+            matching = next(generators[-1], None)
+            if matching is None:
+                if termination and termination.is_set():
+                    continue
+                # every matching of this week was tried: this remaining graph is unsolvable
+                nodes += searches.pop().stats['nodes']
+                generators.pop()
+                self.memo.add(keys.pop())
+                if chosen:
+                    self._apply(chosen.pop(), remove=False)
+                continue
+
+            key = keys[-1]
+            for v, n in matching:
+                key &= ~self.edges[(min(v, n), max(v, n))]
+
+            if len(chosen) + 1 == self.weeks:
+                return Rotation(Rotation.COMPLETE, chosen + [matching], explored())
+
+            if key in self.memo:
+                # already proven unsolvable after other weeks leading to the same remaining graph
+                continue
+
+            # commit this week and descend to the next one
+            chosen.append(matching)
+            self._apply(matching, remove=True)
+            keys.append(key)
+            searches.append(self._week())
+            generators.append(searches[-1].solutions(termination))
+
+        return Rotation(Rotation.INFEASIBLE, [], nodes)
@@ -0,0 +1,92 @@
+from rotation import *
+import unittest
+from threading import Event
+
+
+def complete(n):
+    return {v: [p for p in range(n) if p != v] for v in range(n)}
+
+
+class TestRotationSolver(unittest.TestCase):
+    def _check(self, n, partners, weeks):
+        met = set()
+        for week in weeks:
+            self.assertEqual(sorted(v for pair in week for v in pair), list(range(n)))
+            for v, p in week:
+                self.assertIn(p, partners[v])
+                met.add(frozenset((v, p)))
+        # no pair meets twice
+        self.assertEqual(len(met), len(weeks) * n // 2)
+
+    def test_complete(self):
+        for n in [2, 4, 6, 8, 12, 16]:
+            rotation = RotationSolver(complete(n)).solve()
+            self.assertTrue(rotation)
+            self.assertEqual(rotation.status, Rotation.COMPLETE)
+            self.assertEqual(len(rotation), n-1)
+            self._check(n, complete(n), rotation.weeks)
+
+    def test_empty(self):
+        rotation = RotationSolver(dict()).solve()
+        self.assertTrue(rotation)
+        self.assertEqual(len(rotation), 0)
+
+    def test_infeasible(self):
+        # the Petersen graph is 3-regular but has no 3 disjoint perfect matchings
+        outer = [(i, (i+1) % 5) for i in range(5)]
+        inner = [(5+i, 5+(i+2) % 5) for i in range(5)]
+        spokes = [(i, 5+i) for i in range(5)]
+        partners = {v: [] for v in range(10)}
+        for v, p in outer + inner + spokes:
+            partners[v].append(p)
+            partners[p].append(v)
+
+        rotation = RotationSolver(partners).solve()
+        self.assertFalse(rotation)
+        self.assertEqual(rotation.status, Rotation.INFEASIBLE)
+        self.assertEqual(len(rotation), 0)
+        self.assertGreater(rotation.nodes, 0)
+
+        # a single week is possible, not two: the other edges form two 5-cycles
+        self.assertEqual(RotationSolver(partners, 2).solve().status, Rotation.INFEASIBLE)
+        rotation = RotationSolver(partners, 1).solve()
+        self.assertTrue(rotation)
+        self._check(10, partners, rotation.weeks)
+
+    def test_backtrack(self):
+        # the first matching of the first week, (2, 4) (3, 5) (0, 1), leaves no third week:
+        # the solver shall come back to the first week
+        edges = [(0, 1), (0, 2), (0, 3), (0, 4), (0, 5), (1, 2), (1, 3), (1, 4), (1, 5), (2, 4), (3, 4), (3, 5)]
+        partners = {v: [] for v in range(6)}
+        for v, p in edges:
+            partners[v].append(p)
+            partners[p].append(v)
+
+        rotation = RotationSolver(partners).solve()
+        self.assertTrue(rotation)
+        self.assertEqual(len(rotation), 3)
+        self._check(6, partners, rotation.weeks)
+        self.assertNotIn((0, 1), [tuple(sorted(pair)) for pair in rotation.weeks[0]])
+
+    def test_memo(self):
+        plain = RotationSolver(complete(10), memo=0).solve()
+        memo = RotationSolver(complete(10)).solve()
+        self.assertTrue(plain)
+        self.assertTrue(memo)
+        self.assertLessEqual(memo.nodes, plain.nodes)
+
+    def test_budget(self):
+        rotation = RotationSolver(complete(16), budget=10).solve()
+        self.assertFalse(rotation)
+        self.assertEqual(rotation.status, Rotation.BUDGET)
+        self.assertEqual(len(rotation), 0)
+
+    def test_termination(self):
+        sig = Event()
+        sig.set()
+        rotation = RotationSolver(complete(8)).solve(sig)
+        self.assertEqual(rotation.status, Rotation.BUDGET)
+
+
+if __name__ == "__main__":
+    unittest.main(argv=['ignore'], exit=False, verbosity=2)
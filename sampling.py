@@ -0,0 +1,158 @@
+"""
+Greedy matchings of a week over batches of random orders, first stage of the
+random strategy (sorting_algo 4).
+
+A single shuffled order, explored by the search, spends most of its time in
+the interpreter backtracking out of a bad order. Instead, thousands of random
+orders are tried greedily: the next unpaired employee of the order meets its
+first available partner, highest ID first, and the order fails as soon as an
+employee has none left. The greedy matching of an order is the first branch
+the search explores from it, hence an order succeeding greedily needs no
+search at all.
+
+With numpy, the greedy matchings of the whole batch run in lockstep over the
+adjacency matrix: at step t every order pairs its t-th employee at once, the
+orders which failed are dropped from the batch. O(B.N^2) operations, in N
+vectorized steps. The batch is run in chunks of growing size, so that an
+easy week does not pay for thousands of orders.
+
+numpy is optional: without it the orders are tried one after the other in
+pure Python, on bitmasks, until one succeeds.
+"""
+
+__author__ = "Bertrand Blanc (Alan Turing)"
+__all__ = ["GreedySampler", "greedy"]
+
+import random
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def greedy(order, masks):
+    """greedy matching of an order
+    :param masks: vertex ID -> bitmask of its candidate partners
+    :return: list of (id, partner) pairs in the order, None if an employee is left without partner
+    """
+    available = 0
+    for v in order:
+        available |= 1 << v
+    pairs = []
+    for v in order:
+        if not available & (1 << v):
+            continue
+        candidates = masks[v] & available
+        if not candidates:
+            return None
+        partner = candidates.bit_length() - 1
+        available &= ~((1 << v) | (1 << partner))
+        pairs.append((v, partner))
+    return pairs
+
+
+class GreedySampler():
+    """Finds a random order whose greedy matching pairs everybody up"""
+
+    # size of the first chunk of the vectorized batches, doubled after each chunk
+    CHUNK = 64
+
+    def __init__(self, partners, *, vectorized=None):
+        """
+        :param partners: vertex ID -> candidate partner IDs, in both directions
+        :param vectorized: runs the batches with numpy, by default if numpy is installed
+        """
+        self.vertices = sorted(partners)
+        self.partners = partners
+        self.masks = dict()
+        for v, candidates in partners.items():
+            mask = 0
+            for p in candidates:
+                mask |= 1 << p
+            self.masks[v] = mask
+        self.vectorized = numpy is not None if vectorized is None else vectorized
+        if self.vectorized and numpy is None:
+            raise ImportError('the vectorized sampling requires numpy')
+        # orders: random orders evaluated, hits: orders pairing everybody up
+        self.stats = dict(orders=0, hits=0)
+
+    def run(self, batch, termination=None):
+        """Tries a batch of random orders, drawn from the random module
+        :param batch: number of random orders
+        :param termination: optional Event aborting the sampling once set
+        :return: (order, pairs) of an order pairing everybody up, None if the batch has none
+        """
+        if not self.vertices or len(self.vertices) % 2:
+            return None
+        found = self._vectorized(batch, termination) if self.vectorized else self._sequential(batch, termination)
+        if found is not None:
+            self.stats['hits'] += 1
+        return found
+
+    def _sequential(self, batch, termination):
+        order = list(self.vertices)
+        for _ in range(batch):
+            if termination and termination.is_set():
+                return None
+            random.shuffle(order)
+            self.stats['orders'] += 1
+            pairs = greedy(order, self.masks)
+            if pairs is not None:
+                return list(order), pairs
+        return None
+
+    def _vectorized(self, batch, termination):
+        vertices = numpy.array(self.vertices)
+        n = len(vertices)
+        # the vertices are renumbered 0..n-1 in increasing ID, which keeps the preference for the highest ID
+        index = {v: i for i, v in enumerate(self.vertices)}
+        adjacency = numpy.zeros((n, n), dtype=bool)
+        for v, candidates in self.partners.items():
+            for p in candidates:
+                adjacency[index[v], index[p]] = True
+
+        # the generator is seeded from the random module: random.seed still replays the runs
+        generator = numpy.random.default_rng(random.getrandbits(64))
+        chunk = GreedySampler.CHUNK
+        while batch > 0:
+            size = min(chunk, batch)
+            orders = generator.permuted(numpy.tile(numpy.arange(n), (size, 1)), axis=1)
+            found = self._chunk(vertices, adjacency, orders, termination)
+            if found is not None or (termination and termination.is_set()):
+                return found
+            batch -= size
+            chunk *= 2
+        return None
+
+    def _chunk(self, vertices, adjacency, orders, termination):
+        """greedy matchings of the orders in lockstep
+        :param orders: array of random permutations of 0..n-1, one per row"""
+        n = len(vertices)
+        self.stats['orders'] += len(orders)
+        free = numpy.ones(orders.shape, dtype=bool)
+        mates = numpy.full(orders.shape, -1)
+
+        for t in range(n):
+            if termination and termination.is_set():
+                return None
+            rows = numpy.arange(len(orders))
+            v = orders[:, t]
+            active = free[rows, v]
+            candidates = adjacency[v] & free
+            # highest ID first: the last candidate of each row
+            partner = n - 1 - numpy.argmax(candidates[:, ::-1], axis=1)
+            alive = ~active | candidates.any(axis=1)
+            paired = rows[active & alive]
+            free[paired, v[paired]] = False
+            free[paired, partner[paired]] = False
+            mates[paired, v[paired]] = partner[paired]
+            if not alive.all():
+                # the orders leaving an employee without partner are dropped
+                orders, free, mates = orders[alive], free[alive], mates[alive]
+                if not len(orders):
+                    return None
+
+        order, mate = orders[0], mates[0]
+        pairs = [(int(vertices[i]), int(vertices[mate[i]])) for i in order if mate[i] >= 0]
+        return [int(vertices[i]) for i in order], pairs
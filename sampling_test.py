@@ -0,0 +1,88 @@
+from sampling import *
+from search import WeekSearch
+import sampling
+import unittest
+import random
+from threading import Event
+
+
+def complete(n):
+    return {v: [p for p in range(n-1, -1, -1) if p != v] for v in range(n)}
+
+
+def ladder(n):
+    # the rungs (2i, 2i+1) and the rails: few orders are greedy perfect matchings
+    partners = {v: set() for v in range(n)}
+    for v in range(0, n, 2):
+        partners[v].add(v + 1)
+        partners[v + 1].add(v)
+        if v + 2 < n:
+            for a, b in [(v, v + 2), (v + 1, v + 3)]:
+                partners[a].add(b)
+                partners[b].add(a)
+    return {v: sorted(p, reverse=True) for v, p in partners.items()}
+
+
+class TestGreedy(unittest.TestCase):
+    def test_greedy(self):
+        masks = {v: sum(1 << p for p in partners) for v, partners in complete(4).items()}
+        self.assertEqual(greedy([0, 1, 2, 3], masks), [(0, 3), (1, 2)])
+        # E0 and E1 can only meet E2
+        masks = {0: 0b100, 1: 0b100, 2: 0b1011, 3: 0b100}
+        self.assertIsNone(greedy([0, 1, 2, 3], masks))
+
+
+class TestGreedySampler(unittest.TestCase):
+    def _samplers(self, partners):
+        yield GreedySampler(partners, vectorized=False)
+        if sampling.numpy is not None:
+            yield GreedySampler(partners, vectorized=True)
+
+    def test_first_branch(self):
+        # the greedy matching of the order is the first one the search finds from it
+        partners = ladder(20)
+        for sampler in self._samplers(partners):
+            random.seed(1)
+            order, pairs = sampler.run(4096)
+            self.assertEqual(sorted(v for pair in pairs for v in pair), list(range(20)))
+            for v, p in pairs:
+                self.assertIn(p, partners[v])
+            self.assertEqual(pairs, WeekSearch(order, partners, propagate=False).run())
+            self.assertEqual(sampler.stats['hits'], 1)
+            self.assertGreater(sampler.stats['orders'], 0)
+
+    def test_no_solution(self):
+        partners = {0: [2], 1: [2], 2: [3, 1, 0], 3: [2]}
+        for sampler in self._samplers(partners):
+            self.assertIsNone(sampler.run(100))
+            self.assertEqual(sampler.stats, dict(orders=100, hits=0))
+        self.assertIsNone(GreedySampler(complete(5)).run(10))
+
+    def test_termination(self):
+        sig = Event()
+        sig.set()
+        for sampler in self._samplers(complete(8)):
+            self.assertIsNone(sampler.run(10, sig))
+
+    @unittest.skipUnless(sampling.numpy, 'numpy is not installed')
+    def test_vectorized(self):
+        # the batches run in chunks, the first chunk finds a week of the complete graph
+        sampler = GreedySampler(complete(30), vectorized=True)
+        random.seed(2)
+        order, pairs = sampler.run(10000)
+        self.assertEqual(sampler.stats['orders'], GreedySampler.CHUNK)
+        self.assertEqual(sorted(order), list(range(30)))
+        self.assertEqual(pairs, greedy(order, sampler.masks))
+
+    def test_numpy_missing(self):
+        numpy, sampling.numpy = sampling.numpy, None
+        try:
+            self.assertFalse(GreedySampler(complete(4)).vectorized)
+            with self.assertRaises(ImportError):
+                GreedySampler(complete(4), vectorized=True)
+        finally:
+            sampling.numpy = numpy
+
+
+if __name__ == "__main__":
+    unittest.main(argv=['ignore'], exit=False, verbosity=2)
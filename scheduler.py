@@ -0,0 +1,49 @@
+"""
+Cooperative time slicing of several searches in a single thread.
+
+A task is a generator yielding None every K expanded nodes to hand the
+control back, and returning its result once done (None for a failure), like
+Coffee.cycle. The scheduler resumes the tasks round-robin, a task of weight w
+getting w slices per round, and stops as soon as one of them succeeds or the
+deadline passes. There is no thread to start or to abort: the tasks left
+behind are simply closed.
+"""
+
+__author__ = "Bertrand Blanc (Alan Turing)"
+__all__ = ["interleave"]
+
+from tracing import tracer
+import time
+
+
+def interleave(tasks, *, timeout=None, weights=None):
+    """Runs the tasks time-sliced until the first success
+    :param tasks: dict name -> generator
+    :param timeout: seconds before giving up, None for no limit
+    :param weights: optional dict name -> number of slices per round, 1 by default
+    :return: (name, result) of the first task returning a result other than None,
+    (None, None) if they all failed or the time ran out
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    running = dict(tasks)
+    weights = weights or dict()
+
+    try:
+        while running:
+            for name in list(running):
+                task = running[name]
+                with tracer.span('slice', cat='scheduler', task=name):
+                    for _ in range(max(1, weights.get(name, 1))):
+                        try:
+                            next(task)
+                        except StopIteration as stop:
+                            del running[name]
+                            if stop.value is not None:
+                                return name, stop.value
+                            break
+                if deadline is not None and time.monotonic() >= deadline:
+                    return None, None
+        return None, None
+    finally:
+        for task in running.values():
+            task.close()
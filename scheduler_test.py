@@ -0,0 +1,48 @@
+from scheduler import *
+import unittest
+
+
+def task(log, name, slices, result):
+    """task pausing `slices` times before returning result"""
+    try:
+        for _ in range(slices):
+            log.append(name)
+            yield None
+        return result
+    finally:
+        log.append(name + ' closed')
+
+
+def endless():
+    while True:
+        yield None
+
+
+class TestInterleave(unittest.TestCase):
+    def test_round_robin(self):
+        log = []
+        tasks = dict(a=task(log, 'a', 3, None), b=task(log, 'b', 2, 'done'), c=task(log, 'c', 5, 'late'))
+        self.assertEqual(interleave(tasks), ('b', 'done'))
+        self.assertEqual(log[:6], ['a', 'b', 'c', 'a', 'b', 'c'])
+        # the tasks left behind are closed
+        self.assertIn('c closed', log)
+        self.assertIn('a closed', log)
+
+    def test_weights(self):
+        log = []
+        tasks = dict(a=task(log, 'a', 4, 'a'), b=task(log, 'b', 4, 'b'))
+        self.assertEqual(interleave(tasks, weights=dict(b=4)), ('b', 'b'))
+        self.assertEqual(log[:5], ['a', 'b', 'b', 'b', 'b'])
+
+    def test_failure(self):
+        log = []
+        tasks = dict(a=task(log, 'a', 1, None), b=task(log, 'b', 2, None))
+        self.assertEqual(interleave(tasks), (None, None))
+        self.assertEqual(interleave(dict()), (None, None))
+
+    def test_timeout(self):
+        self.assertEqual(interleave(dict(a=endless(), b=endless()), timeout=0.05), (None, None))
+
+
+if __name__ == "__main__":
+    unittest.main(argv=['ignore'], exit=False, verbosity=2)
@@ -0,0 +1,286 @@
+"""
+Iterative depth-first search of the N//2 pairs of a week, with forward checking.
+
+The employees still to pair up are kept in a bitmask (bit i for the vertex i),
+as well as the candidate partners of each employee. The explicit stack
+replaces the recursion of Coffee.browse: each frame remembers the employee
+being paired and the index of the next partner to try.
+
+After every tentative pair, the propagation looks at every unpaired employee:
+* no available partner left: the branch is a dead end, cut at its root
+* exactly one available partner left: that pair is forced immediately
+Both cases are counted in the statistics.
+
+The same set of unpaired employees is reached again and again through
+different pair orders. Once every partner of the employee picked up for a
+given set was tried without success, that set is proven unsolvable and
+remembered in a bounded transposition table, evicting the least recently used
+entries. The bitmask itself is the key: no collision is possible.
+
+Optionally, the symmetries of the remaining graph are broken. Among the
+employees still unpaired, two twins, sharing the same candidates besides
+each other, are interchangeable: swapping them maps what is left of the
+graph onto itself. Pairing an employee with one or the other leads to
+equivalent subtrees, hence a partner whose twin was already tried for that
+employee is skipped, and counted as symmetric. As the pairs are made, more
+and more employees become twins: the orbits are tracked on the unpaired
+employees, not on the whole graph.
+"""
+
+__author__ = "Bertrand Blanc (Alan Turing)"
+__all__ = ["WeekSearch", "TranspositionTable"]
+
+from collections import OrderedDict
+
+
+class TranspositionTable():
+    """Bounded LRU set of the availability bitmasks proven unsolvable"""
+
+    def __init__(self, capacity=1 << 16):
+        """
+        :param capacity: maximum number of states remembered, 0 disables the table
+        """
+        self.capacity = capacity
+        self.states = OrderedDict()
+        self.hits = 0
+        self.lookups = 0
+
+    def __len__(self):
+        return len(self.states)
+
+    def __contains__(self, available):
+        """True if the state is known to be unsolvable, counted in the hit rate"""
+        if not self.capacity:
+            return False
+        self.lookups += 1
+        if available in self.states:
+            self.states.move_to_end(available)
+            self.hits += 1
+            return True
+        return False
+
+    def add(self, available):
+        """remembers an unsolvable state, evicting the least recently used one if needed"""
+        if not self.capacity:
+            return
+        self.states[available] = None
+        self.states.move_to_end(available)
+        if len(self.states) > self.capacity:
+            self.states.popitem(last=False)
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+class WeekSearch():
+    """Finds a perfect matching of the remaining graph following an exploring order"""
+
+    def __init__(self, order, partners, *, propagate=True, memo=1 << 16, symmetry=False):
+        """
+        :param order: vertex IDs in the order the employees are picked up
+        :param partners: vertex ID -> candidate partner IDs, in the order they are tried
+        :param propagate: enables the forward checking
+        :param memo: capacity of the transposition table of failed states, 0 disables it
+        :param symmetry: tries a single twin of each class per employee. The search is still
+        complete, but solutions only yields one matching per class of equivalent matchings.
+        """
+        self.order = list(order)
+        self.partners = partners
+        self.propagate = propagate
+        self.memo = TranspositionTable(memo)
+        self.masks = dict()
+        for v in self.order:
+            mask = 0
+            for p in partners.get(v, ()):
+                mask |= 1 << p
+            self.masks[v] = mask
+        self.symmetry = symmetry
+
+        # nodes: tentative pairs, pruned: dead ends detected by the propagation,
+        # forced: pairs imposed by the propagation, symmetric: partners skipped as the twin of a partner tried
+        self.stats = dict(nodes=0, pruned=0, forced=0, symmetric=0)
+        # frontier of the last aborted search, see solutions
+        self.frontier = None
+
+    @property
+    def statistics(self):
+        """counters of the search, including the transposition table"""
+        return dict(self.stats, memo_hits=self.memo.hits, memo_lookups=self.memo.lookups)
+
+    def _propagate(self, available, pairs):
+        """forward checking on the unpaired employees
+        :return: the updated bitmask of available employees, or None for a dead end
+        Forced pairs are appended to pairs."""
+        masks = self.masks
+        changed = True
+        while changed:
+            changed = False
+            remaining = available
+            while remaining:
+                low = remaining & -remaining
+                remaining ^= low
+                if not available & low:
+                    # paired by a forced pair during this pass
+                    continue
+                v = low.bit_length() - 1
+                candidates = masks[v] & available
+                if candidates == 0:
+                    self.stats['pruned'] += 1
+                    return None
+                if candidates & (candidates - 1) == 0:
+                    # a single partner left: pair them now
+                    available &= ~(low | candidates)
+                    remaining &= ~candidates
+                    pairs.append((v, candidates.bit_length() - 1))
+                    self.stats['forced'] += 1
+                    changed = True
+        return available
+
+    def run(self, termination=None, *, resume=None):
+        """Explores until a perfect matching is found
+        :param termination: optional Event aborting the search once set
+        :param resume: frontier of an aborted search to resume from, see solutions
+        :return: list of (id1, id2) pairs, or None if none exists or the search was aborted
+        """
+        return next(self.solutions(termination, resume=resume), None)
+
+    def _suspend(self, stack, pairs, available, position, descend, found):
+        """compact frontier of the search: the availability bitmask of a frame is the one of
+        the employees not paired by the pairs made before it, hence it is not stored.
+        The positions point into the exploring order, which is stored as well."""
+        self.frontier = dict(
+            order=list(self.order),
+            stack=[[employee, index, position_, depth, before, None if tried is None else [format(key, 'x') for key in tried]]
+                   for employee, index, position_, _, depth, before, tried in stack],
+            pairs=[v for pair in pairs for v in pair],
+            available=format(available, 'x'),
+            position=position,
+            descend=descend,
+            found=found,
+        )
+
+    def _resume(self, frontier):
+        if frontier['order'] != self.order:
+            raise ValueError('the frontier was suspended with another exploring order')
+        everybody = 0
+        for v in self.order:
+            everybody |= 1 << v
+        flat = frontier['pairs']
+        pairs = list(zip(flat[0::2], flat[1::2]))
+        stack = []
+        for employee, index, position, depth, before, tried in frontier['stack']:
+            available = everybody
+            for v, n in pairs[:depth]:
+                available &= ~((1 << v) | (1 << n))
+            tried = None if tried is None else {int(key, 16) for key in tried}
+            stack.append([employee, index, position, available, depth, before, tried])
+        return stack, pairs, int(frontier['available'], 16), frontier['position'], frontier['descend'], frontier['found']
+
+    def solutions(self, termination=None, *, every=None, resume=None):
+        """Generator of the perfect matchings, in the exploring order
+        :param termination: optional Event aborting the search once set. The frontier of the
+        aborted search is then kept in self.frontier.
+        :param every: also yields None every `every` tentative pairs, handing the control back
+        to a cooperative scheduler
+        :param resume: self.frontier of an aborted search of the same order and partners:
+        the exploration goes on where it stopped. ValueError if the order differs.
+        :return: yields a list of (id1, id2) pairs for each perfect matching
+        """
+        order = self.order
+        partners = self.partners
+        masks = self.masks
+        symmetry = self.symmetry
+        self.frontier = None
+
+        if resume is not None:
+            stack, pairs, available, position, descend, found = self._resume(resume)
+        else:
+            if not order:
+                yield []
+                return
+            available = 0
+            for v in order:
+                available |= 1 << v
+
+            pairs = []
+            if self.propagate:
+                available = self._propagate(available, pairs)
+                if available is None:
+                    return
+            if available == 0:
+                yield pairs
+                return
+
+            # frame: [employee, next partner index, position in order, available bitmask, len(pairs) before,
+            #         number of solutions found when the frame was pushed,
+            #         neighborhoods of the partners tried if the symmetries are broken]
+            stack = []
+            position = 0
+            descend = True
+            found = 0
+
+        while True:
+            if termination and termination.is_set():
+                self._suspend(stack, pairs, available, position, descend, found)
+                return
+
+            if descend:
+                descend = False
+                if available == 0:
+                    # everybody is paired up
+                    found += 1
+                    yield list(pairs)
+                    # resume with the next partner of the deepest employee
+                else:
+                    # pick up the next unpaired employee in the exploring order
+                    while not available & (1 << order[position]):
+                        position += 1
+                    stack.append([order[position], 0, position, available, len(pairs), found, set() if symmetry else None])
+
+            frame = stack[-1]
+            employee, index, position, available, depth, before, tried = frame
+            candidates = partners.get(employee, ())
+
+            while index < len(candidates) and not available & (1 << candidates[index]):
+                index += 1
+
+            if index == len(candidates):
+                if found == before:
+                    # no partner left for this employee: this set of unpaired employees is unsolvable
+                    self.memo.add(available)
+                stack.pop()
+                if not stack:
+                    return
+                continue
+
+            partner = candidates[index]
+            frame[1] = index + 1
+            if symmetry:
+                # neighborhood of the partner among the employees left to pair: the same closed
+                # neighborhood for adjacent twins, the same open one (complemented) for the others
+                neighborhood = masks[partner] & available & ~(1 << employee)
+                closed, opened = neighborhood | (1 << partner), ~neighborhood
+                if closed in tried or opened in tried:
+                    # a twin of this partner was tried already
+                    self.stats['symmetric'] += 1
+                    continue
+                tried.add(closed)
+                tried.add(opened)
+            self.stats['nodes'] += 1
+            if every and self.stats['nodes'] % every == 0:
+                yield None
+
+            del pairs[depth:]
+            pairs.append((employee, partner))
+            following = available & ~((1 << employee) | (1 << partner))
+            if self.propagate:
+                following = self._propagate(following, pairs)
+                if following is None:
+                    # dead end cut at its root, try the next partner
+                    continue
+            if following in self.memo:
+                # already proven unsolvable through another order of pairs
+                continue
+            available = following
+            descend = True
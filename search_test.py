@@ -0,0 +1,181 @@
+from search import *
+import unittest
+import json
+from threading import Event
+
+
+def complete(n):
+    return {v: [p for p in range(n-1, -1, -1) if p != v] for v in range(n)}
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def test_lru(self):
+        memo = TranspositionTable(2)
+        memo.add(0b11)
+        memo.add(0b101)
+        self.assertTrue(0b11 in memo)
+        memo.add(0b110)
+        # 0b101 was the least recently used
+        self.assertFalse(0b101 in memo)
+        self.assertTrue(0b11 in memo)
+        self.assertEqual(len(memo), 2)
+        self.assertEqual(memo.lookups, 3)
+        self.assertEqual(memo.hits, 2)
+        self.assertAlmostEqual(memo.hit_rate, 2/3)
+
+    def test_disabled(self):
+        memo = TranspositionTable(0)
+        memo.add(1)
+        self.assertFalse(1 in memo)
+        self.assertEqual(len(memo), 0)
+        self.assertEqual(memo.hit_rate, 0.0)
+
+
+class TestWeekSearch(unittest.TestCase):
+    def _check(self, n, partners, pairs):
+        self.assertEqual(sorted(v for pair in pairs for v in pair), list(range(n)))
+        for v, p in pairs:
+            self.assertIn(p, partners[v])
+
+    def test_empty(self):
+        self.assertEqual(WeekSearch([], {}).run(), [])
+
+    def test_complete(self):
+        for n in [2, 4, 10, 30]:
+            partners = complete(n)
+            for propagate in [False, True]:
+                search = WeekSearch(range(n), partners, propagate=propagate)
+                self._check(n, partners, search.run())
+
+    def test_forced(self):
+        # path 0-1-2-3: 0 and 3 have a single partner
+        partners = {0: [1], 1: [2, 0], 2: [3, 1], 3: [2]}
+        search = WeekSearch(range(4), partners)
+        self.assertEqual(sorted(tuple(sorted(pair)) for pair in search.run()), [(0, 1), (2, 3)])
+        self.assertEqual(search.stats['forced'], 2)
+        self.assertEqual(search.stats['nodes'], 0)
+
+    def test_pruned(self):
+        # star: 0 is the only partner of 1, 2 and 3
+        partners = {0: [3, 2, 1], 1: [0], 2: [0], 3: [0]}
+        for propagate in [False, True]:
+            search = WeekSearch(range(4), partners, propagate=propagate)
+            self.assertIsNone(search.run())
+        self.assertGreater(search.stats['pruned'], 0)
+
+    def test_fewer_nodes(self):
+        # two triangles linked by one edge: 2-3 is the only way out
+        edges = [(0, 1), (0, 2), (1, 2), (2, 3), (3, 4), (3, 5), (4, 5), (0, 4)]
+        partners = {v: [] for v in range(6)}
+        for a, b in edges:
+            partners[a].append(b)
+            partners[b].append(a)
+        searches = [WeekSearch(range(6), partners, propagate=p) for p in [False, True]]
+        for search in searches:
+            self._check(6, partners, search.run())
+        self.assertLessEqual(searches[1].stats['nodes'], searches[0].stats['nodes'])
+
+    def test_memo(self):
+        # 0 can only meet 1, while the others try 1 first:
+        # the same failed sets are reached through different orders (2-1 3-9 and 2-9 3-1)
+        n = 10
+        partners = complete(n)
+        partners[0] = [1]
+        for v in range(2, n):
+            partners[v].remove(0)
+            partners[v].remove(1)
+            partners[v].insert(0, 1)
+        order = list(range(2, n)) + [0, 1]
+
+        plain = WeekSearch(order, partners, propagate=False, memo=0)
+        memo = WeekSearch(order, partners, propagate=False)
+        self._check(n, partners, plain.run())
+        self._check(n, partners, memo.run())
+        self.assertGreater(memo.memo.hits, 0)
+        self.assertLess(memo.stats['nodes'], plain.stats['nodes'])
+        self.assertEqual(memo.statistics['memo_hits'], memo.memo.hits)
+
+    def test_termination(self):
+        sig = Event()
+        sig.set()
+        self.assertIsNone(WeekSearch(range(4), complete(4)).run(sig))
+
+    def test_pauses(self):
+        plain = WeekSearch(range(12), complete(12), propagate=False)
+        sliced = WeekSearch(range(12), complete(12), propagate=False)
+        steps = list(sliced.solutions(every=2))
+        pauses = steps.count(None)
+        solutions = [pairs for pairs in steps if pairs is not None]
+        # same matchings, a pause every 2 tentative pairs
+        self.assertEqual(solutions, list(plain.solutions()))
+        self.assertEqual(pauses, sliced.stats['nodes'] // 2)
+
+    def test_solutions(self):
+        # K6 has 5*3*1 perfect matchings, each enumerated once
+        for propagate in [False, True]:
+            search = WeekSearch(range(6), complete(6), propagate=propagate)
+            solutions = [frozenset(frozenset(pair) for pair in pairs) for pairs in search.solutions()]
+            self.assertEqual(len(solutions), 15)
+            self.assertEqual(len(set(solutions)), 15)
+            for pairs in solutions:
+                self._check(6, complete(6), [tuple(pair) for pair in pairs])
+
+    def test_symmetry(self):
+        # all the partners of the first employee of K8 are twins: a single one is tried
+        for propagate in [False, True]:
+            plain = WeekSearch(range(8), complete(8), propagate=propagate)
+            search = WeekSearch(range(8), complete(8), propagate=propagate, symmetry=True)
+            self.assertEqual(search.run(), plain.run())
+            # one matching per class of equivalent matchings
+            search = WeekSearch(range(8), complete(8), propagate=propagate, symmetry=True)
+            self.assertEqual(len(list(search.solutions())), 1)
+            self.assertGreater(search.stats['symmetric'], 0)
+
+        # E0 and E1 can only meet E2: once E2 failed with E1, E0 is not tried
+        partners = {0: [2], 1: [2], 2: [1, 0], 3: [5, 4], 4: [3], 5: [3]}
+        search = WeekSearch([2, 0, 1, 3, 4, 5], partners, propagate=False, symmetry=True)
+        self.assertIsNone(search.run())
+        self.assertGreater(search.stats['symmetric'], 0)
+
+    def test_resume(self):
+        # the matchings are enumerated in many short runs resuming one another
+        for propagate in [False, True]:
+            expected = list(WeekSearch(range(8), complete(8), propagate=propagate).solutions())
+            solutions = []
+            frontier = None
+            runs = 0
+            while True:
+                sig = Event()
+                search = WeekSearch(range(8), complete(8), propagate=propagate)
+                for pairs in search.solutions(sig, every=5, resume=frontier):
+                    if pairs is None:
+                        sig.set()
+                    else:
+                        solutions.append(pairs)
+                runs += 1
+                if search.frontier is None:
+                    break
+                frontier = json.loads(json.dumps(search.frontier))
+            self.assertGreater(runs, 10)
+            self.assertEqual(solutions, expected)
+
+        # the twins tried survive the suspension
+        sig = Event()
+        search = WeekSearch(range(10), complete(10), propagate=False, symmetry=True)
+        for pairs in search.solutions(sig, every=1):
+            sig.set()
+        resumed = WeekSearch(range(10), complete(10), propagate=False, symmetry=True)
+        self.assertEqual(resumed.run(resume=json.loads(json.dumps(search.frontier))), WeekSearch(range(10), complete(10)).run())
+        self.assertEqual(search.stats['nodes'] + resumed.stats['nodes'], 5)
+
+        # the positions of the frontier point into the order it was suspended with
+        with self.assertRaises(ValueError):
+            WeekSearch(reversed(range(10)), complete(10)).run(resume=search.frontier)
+
+        search = WeekSearch(range(8), complete(8))
+        search.run()
+        self.assertIsNone(search.frontier)
+
+
+if __name__ == "__main__":
+    unittest.main(argv=['ignore'], exit=False, verbosity=2)
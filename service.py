@@ -0,0 +1,288 @@
+"""
+Long-running planner service keeping the Coffee planners of many teams warm.
+
+A cold `python main.py` parses the CLI, builds the Employees LinkedList and
+the full graph of Coffee.reset for every request. Here the planners stay
+resident in memory and "next week for team X" only costs the scheduling of
+one week, or even a lookup in the plan solved ahead of time by the
+whole-rotation strategies.
+
+Each team's graph is guarded by a reader/writer lock: the status requests
+read it concurrently while the scheduling of the next week, which removes
+edges from the graph, holds it exclusively.
+
+The service speaks HTTP/JSON, on localhost or on a Unix socket:
+* GET    /teams              - names of the teams
+* PUT    /teams/<name>       - creates a team, body {"employees": 10 or ["Ada", ...], "sorting": 7}
+* GET    /teams/<name>       - status of a team
+* POST   /teams/<name>/next  - schedules the next week of a team
+* DELETE /teams/<name>       - forgets a team
+"""
+
+__author__ = "Bertrand Blanc (Alan Turing)"
+__all__ = ["ReadWriteLock", "Team", "Planner", "PlannerHandler", "serve"]
+
+from coffee import Coffee
+from employee import Employee, Employees
+from threading import Condition
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import socketserver
+import json
+import os
+import stat
+
+
+class ReadWriteLock():
+    """Many concurrent readers or a single writer.
+    A waiting writer blocks the new readers so that it is not starved."""
+
+    def __init__(self):
+        self._condition = Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting = 0
+
+    def acquire_read(self):
+        with self._condition:
+            while self._writer or self._waiting:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._condition:
+            self._readers -= 1
+            if self._readers == 0:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        with self._condition:
+            self._waiting += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._condition:
+            self._writer = False
+            self._condition.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield self
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield self
+        finally:
+            self.release_write()
+
+
+class Team():
+    """Planner of a team, kept warm between the requests"""
+
+    def __init__(self, name, employees, *, sorting_algo=Coffee.DLX_ROTATION, propagate=False):
+        """
+        :param employees: collection of employees, an even number of them
+        :param sorting_algo: strategy scheduling the weeks, default to the whole-rotation exact cover
+        """
+        self.name = name
+        self.employees = employees
+        self.sorting_algo = sorting_algo
+        self.coffee = Coffee(employees)
+        self.planning = self.coffee.feed(endless=True, sorting_algo=sorting_algo, propagate=propagate)
+        self.lock = ReadWriteLock()
+        self.weeks = 0
+        self.cycles = 1
+
+    def next_week(self):
+        """schedules the next week, a new cycle starts once everybody met"""
+        with self.lock.write():
+            meetings, restart = next(self.planning)
+            self.weeks += 1
+            if restart:
+                self.cycles += 1
+            return dict(team=self.name, week=self.weeks, restart=restart,
+                        meetings=[[str(m.employee1.data), str(m.employee2.data)] for m in meetings])
+
+    def status(self):
+        with self.lock.read():
+            return dict(team=self.name, employees=len(self.employees), sorting=self.sorting_algo,
+                        week=self.weeks, cycle=self.cycles, remaining=self.coffee.planning.len_edges())
+
+
+class Planner():
+    """Registry of the teams"""
+
+    def __init__(self):
+        self.teams = dict()
+        self.lock = ReadWriteLock()
+
+    def create(self, name, employees, *, sorting_algo=Coffee.DLX_ROTATION, propagate=False):
+        """Creates (or replaces) a team
+        :param employees: number of employees, or their names
+        :raise ValueError: odd or empty team, unknown sorting strategy
+        """
+        roster = Employees()
+        if isinstance(employees, int):
+            roster.fill(number=employees)
+        else:
+            for employee in employees:
+                roster.add(Employee(str(employee)))
+
+        if len(roster) == 0 or len(roster) % 2:
+            raise ValueError('the number of employees shall be a positive even number')
+        if sorting_algo not in range(Coffee.BACKTRACK + 1):
+            raise ValueError(f'unknown sorting strategy {sorting_algo}')
+
+        # the graph is built before taking the lock, the registry is only blocked for the insertion
+        team = Team(name, roster, sorting_algo=sorting_algo, propagate=propagate)
+        with self.lock.write():
+            self.teams[name] = team
+        return team
+
+    def remove(self, name):
+        with self.lock.write():
+            del self.teams[name]
+
+    def __getitem__(self, name):
+        """:raise KeyError: unknown team"""
+        with self.lock.read():
+            return self.teams[name]
+
+    def __len__(self):
+        return len(self.teams)
+
+    def names(self):
+        with self.lock.read():
+            return sorted(self.teams)
+
+
+class PlannerHandler(BaseHTTPRequestHandler):
+    """HTTP/JSON front-end of the Planner attached to the server"""
+
+    def _reply(self, code, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self):
+        """splits the path into (team name, action), name is None for /teams"""
+        parts = [part for part in self.path.split('?')[0].split('/') if part]
+        if not parts or parts[0] != 'teams' or len(parts) > 3:
+            return False, None, None
+        name = parts[1] if len(parts) > 1 else None
+        action = parts[2] if len(parts) > 2 else None
+        return True, name, action
+
+    def _team(self, name):
+        """team of the planner, None once the unknown team is replied"""
+        try:
+            return self.server.planner[name]
+        except KeyError:
+            self._reply(404, dict(error=f'unknown team {name}'))
+            return None
+
+    def _handle(self, method):
+        planner = self.server.planner
+        found, name, action = self._route()
+        try:
+            if not found:
+                self._reply(404, dict(error=f'unknown path {self.path}'))
+            elif name is None and method == 'GET':
+                self._reply(200, dict(teams=planner.names()))
+            elif name is not None and action is None and method == 'GET':
+                team = self._team(name)
+                if team is not None:
+                    self._reply(200, team.status())
+            elif name is not None and action == 'next' and method == 'POST':
+                team = self._team(name)
+                if team is not None:
+                    self._reply(200, team.next_week())
+            elif name is not None and action is None and method == 'PUT':
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                if not isinstance(request, dict):
+                    self._reply(400, dict(error='the body shall be a JSON object'))
+                    return
+                team = planner.create(name, request.get('employees', 0),
+                                      sorting_algo=request.get('sorting', Coffee.DLX_ROTATION),
+                                      propagate=request.get('propagate', False))
+                self._reply(201, team.status())
+            elif name is not None and action is None and method == 'DELETE':
+                try:
+                    planner.remove(name)
+                except KeyError:
+                    self._reply(404, dict(error=f'unknown team {name}'))
+                else:
+                    self._reply(200, dict(team=name))
+            else:
+                self._reply(405, dict(error=f'{method} not allowed on {self.path}'))
+        except (ValueError, TypeError) as e:
+            self._reply(400, dict(error=str(e)))
+        except Exception as e:
+            # a failure of the planner shall not leave the client without a response
+            self._reply(500, dict(error=f'{type(e).__name__}: {e}'))
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+    def address_string(self):
+        # the client address of a Unix socket is empty
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        # attributes expected by BaseHTTPRequestHandler
+        self.server_name = 'localhost'
+        self.server_port = 0
+
+
+def serve(planner, address, *, verbose=False):
+    """Creates the server of a planner, the caller runs serve_forever() and shutdown()
+    :param address: port number on localhost, (host, port), or the path of a Unix socket
+    :raise FileExistsError: the path exists and is not a socket
+    :return: the server, its planner attribute being the planner
+    """
+    if isinstance(address, int):
+        address = ('127.0.0.1', address)
+
+    if isinstance(address, str):
+        if os.path.exists(address):
+            # the socket left over by a previous run is replaced, nothing else
+            if not stat.S_ISSOCK(os.stat(address).st_mode):
+                raise FileExistsError(f'{address} exists and is not a Unix socket')
+            os.remove(address)
+        server = _UnixHTTPServer(address, PlannerHandler)
+    else:
+        server = ThreadingHTTPServer(address, PlannerHandler)
+    server.planner = planner
+    server.verbose = verbose
+    return server
@@ -0,0 +1,193 @@
+from service import *
+from coffee import Coffee
+import unittest
+import http.client
+import socket
+import json
+import os
+import tempfile
+from threading import Thread
+import time
+
+
+class TestReadWriteLock(unittest.TestCase):
+    def test_readers(self):
+        lock = ReadWriteLock()
+        with lock.read():
+            # a second reader does not block
+            with lock.read():
+                pass
+
+    def test_writer(self):
+        lock = ReadWriteLock()
+        events = []
+
+        def write():
+            with lock.write():
+                events.append('write')
+
+        with lock.read():
+            writer = Thread(target=write)
+            writer.start()
+            time.sleep(0.05)
+            # the writer waits for the reader
+            self.assertEqual(events, [])
+            events.append('read')
+        writer.join()
+        self.assertEqual(events, ['read', 'write'])
+
+
+class TestPlanner(unittest.TestCase):
+    def test_team(self):
+        planner = Planner()
+        planner.create('blue', 6)
+        self.assertEqual(planner.names(), ['blue'])
+
+        met = set()
+        for week in range(1, 6):
+            result = planner['blue'].next_week()
+            self.assertEqual(result['week'], week)
+            self.assertFalse(result['restart'])
+            self.assertEqual(len(result['meetings']), 3)
+            met |= {frozenset(pair) for pair in result['meetings']}
+        self.assertEqual(len(met), 15)
+        self.assertEqual(planner['blue'].status()['remaining'], 0)
+
+        # everybody met: a new cycle starts
+        result = planner['blue'].next_week()
+        self.assertTrue(result['restart'])
+        self.assertEqual(planner['blue'].status()['cycle'], 2)
+
+    def test_names(self):
+        planner = Planner()
+        team = planner.create('red', ['Ada', 'Alan', 'Grace', 'Edsger'], sorting_algo=Coffee.WEIGHTED)
+        meetings = team.next_week()['meetings']
+        self.assertEqual(sorted(name for pair in meetings for name in pair), ['Ada', 'Alan', 'Edsger', 'Grace'])
+
+    def test_invalid(self):
+        planner = Planner()
+        with self.assertRaises(ValueError):
+            planner.create('odd', 5)
+        with self.assertRaises(ValueError):
+            planner.create('empty', 0)
+        with self.assertRaises(ValueError):
+            planner.create('sorting', 4, sorting_algo=42)
+        with self.assertRaises(KeyError):
+            planner['unknown']
+        self.assertEqual(len(planner), 0)
+
+
+class TestService(unittest.TestCase):
+    def setUp(self):
+        self.server = serve(Planner(), ('127.0.0.1', 0))
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def _request(self, method, path, body=None):
+        connection = http.client.HTTPConnection(*self.server.server_address)
+        connection.request(method, path, body=json.dumps(body) if body is not None else None)
+        response = connection.getresponse()
+        payload = json.loads(response.read())
+        connection.close()
+        return response.status, payload
+
+    def test_http(self):
+        status, payload = self._request('PUT', '/teams/blue', dict(employees=10))
+        self.assertEqual(status, 201)
+        self.assertEqual(payload['remaining'], 45)
+
+        status, payload = self._request('GET', '/teams')
+        self.assertEqual(payload['teams'], ['blue'])
+
+        for week in range(1, 10):
+            status, payload = self._request('POST', '/teams/blue/next')
+            self.assertEqual(status, 200)
+            self.assertEqual(payload['week'], week)
+            self.assertEqual(len(payload['meetings']), 5)
+
+        status, payload = self._request('GET', '/teams/blue')
+        self.assertEqual(payload['remaining'], 0)
+
+        status, payload = self._request('DELETE', '/teams/blue')
+        self.assertEqual(status, 200)
+        status, payload = self._request('GET', '/teams/blue')
+        self.assertEqual(status, 404)
+
+    def test_errors(self):
+        self.assertEqual(self._request('GET', '/unknown')[0], 404)
+        self.assertEqual(self._request('POST', '/teams/unknown/next')[0], 404)
+        self.assertEqual(self._request('PUT', '/teams/odd', dict(employees=3))[0], 400)
+        self.assertEqual(self._request('GET', '/teams/odd/next')[0], 405)
+        self.assertEqual(self._request('DELETE', '/teams/unknown')[0], 404)
+        # the body shall be a JSON object
+        status, payload = self._request('PUT', '/teams/list', [1, 2])
+        self.assertEqual(status, 400)
+        self.assertNotIn('list', self.server.planner.names())
+
+    def test_internal_error(self):
+        team = self.server.planner.create('blue', 4)
+
+        def fail():
+            raise KeyError('bug')
+        team.next_week = fail
+        # a failure of the team is not mistaken for an unknown team, and the client gets a response
+        status, payload = self._request('POST', '/teams/blue/next')
+        self.assertEqual(status, 500)
+        self.assertIn('KeyError', payload['error'])
+        self.assertEqual(self._request('GET', '/teams/blue')[0], 200)
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Unix sockets not supported')
+class TestUnixService(unittest.TestCase):
+    def test_unix(self):
+        path = os.path.join(tempfile.mkdtemp(), 'coffee.sock')
+        server = serve(Planner(), path)
+        thread = Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        try:
+            server.planner.create('blue', 4)
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client.connect(path)
+            client.sendall(b'POST /teams/blue/next HTTP/1.0\r\nContent-Length: 0\r\n\r\n')
+            response = b''
+            while chunk := client.recv(4096):
+                response += chunk
+            client.close()
+
+            head, body = response.split(b'\r\n\r\n', 1)
+            self.assertIn(b'200', head.split(b'\r\n')[0])
+            self.assertEqual(len(json.loads(body)['meetings']), 2)
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+            os.remove(path)
+
+    def test_existing_file(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'data.db')
+        with open(path, 'w') as fd:
+            fd.write('precious')
+        with self.assertRaises(FileExistsError):
+            serve(Planner(), path)
+        with open(path) as fd:
+            self.assertEqual(fd.read(), 'precious')
+        os.remove(path)
+
+        # the socket of a previous run is replaced
+        path = os.path.join(directory, 'coffee.sock')
+        serve(Planner(), path).server_close()
+        server = serve(Planner(), path)
+        server.server_close()
+        os.remove(path)
+        os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    unittest.main(argv=['ignore'], exit=False, verbosity=2)
@@ -0,0 +1,135 @@
+"""
+Random access to the weeks of a rotation.
+
+Iterating Coffee up to week k to learn who employee E meets that week is
+O(k.N) work, search included. A timetable answers the question directly:
+* partner(employee, week) in O(1)
+* week(k), the N//2 pairs of a week, in O(N)
+without materializing any other week.
+
+* CircleTimetable - the circle method (round-robin tournament), computed
+  arithmetically: employee N-1 sits at the center, the others on a circle of
+  N-1 seats. In week r the center meets r, and any other i meets
+  (2r - i) mod (N-1).
+* PackedTimetable - any solved rotation, packed as a table of uint32:
+  entry w*N + e is the partner of employee e in week w+1. It is built from the
+  weeks found by Coffee or loaded from a --format bin output.
+
+Employees are their index in the roster (Employee.id), the weeks are numbered
+from 1. A rotation has N-1 weeks and repeats itself beyond.
+"""
+
+__author__ = "Bertrand Blanc (Alan Turing)"
+__all__ = ["Timetable", "CircleTimetable", "PackedTimetable"]
+
+from abc import ABC, abstractmethod
+from array import array
+from formats import read_bin
+
+
+class Timetable(ABC):
+    """Rotation of N employees over N-1 weeks"""
+
+    def __init__(self, employees):
+        """
+        :param employees: number of employees, even
+        """
+        if employees <= 0 or employees % 2:
+            raise ValueError(f'the number of employees shall be a positive even number, not {employees}')
+        self.employees = employees
+
+    def __len__(self):
+        """number of weeks of the rotation"""
+        return self.employees - 1
+
+    def _round(self, week):
+        """0-based week of the rotation"""
+        if week < 1:
+            raise IndexError(f'week {week} out of range, the weeks start at 1')
+        return (week - 1) % len(self)
+
+    def _check(self, employee):
+        if not (0 <= employee < self.employees):
+            raise IndexError(f'employee {employee} out of range [0,{self.employees}[')
+
+    @abstractmethod
+    def partner(self, employee, week):
+        """employee met by an employee during a week"""
+
+    def week(self, week):
+        """the (id1, id2) pairs of a week, id1 < id2"""
+        pairs = []
+        for employee in range(self.employees):
+            partner = self.partner(employee, week)
+            if employee < partner:
+                pairs.append((employee, partner))
+        return pairs
+
+    def __iter__(self):
+        """the weeks of a rotation"""
+        for week in range(1, len(self) + 1):
+            yield self.week(week)
+
+
+class CircleTimetable(Timetable):
+    """Circle method, nothing is stored"""
+
+    def partner(self, employee, week):
+        self._check(employee)
+        r = self._round(week)
+        center = self.employees - 1
+        if employee == center:
+            return r
+        if employee == r:
+            return center
+        return (2 * r - employee) % center
+
+
+class PackedTimetable(Timetable):
+    """Solved rotation packed in a table of N-1 x N partners"""
+
+    def __init__(self, employees, weeks):
+        """
+        :param weeks: the N-1 weeks, each an iterable of (id1, id2) pairs or a coffee.Week
+        """
+        Timetable.__init__(self, employees)
+        self.table = array('I', bytes(4 * len(self) * employees))
+        rounds = 0
+        for r, pairs in enumerate(weeks):
+            if r >= len(self):
+                raise ValueError(f'more than {len(self)} weeks for {employees} employees')
+            pairs = pairs.pairs() if hasattr(pairs, 'pairs') else pairs
+            row = r * employees
+            # bitmask of the employees already paired this week
+            seen = 0
+            for id1, id2 in pairs:
+                self._check(id1)
+                self._check(id2)
+                for employee in (id1, id2):
+                    if seen & (1 << employee):
+                        raise ValueError(f'employee {employee} paired twice in week {r+1}')
+                    seen |= 1 << employee
+                self.table[row + id1] = id2
+                self.table[row + id2] = id1
+            if seen.bit_count() != employees:
+                raise ValueError(f'week {r+1} pairs {seen.bit_count()} employees out of {employees}')
+            rounds += 1
+        if rounds != len(self):
+            raise ValueError(f'{rounds} weeks for a rotation of {len(self)}')
+
+    @staticmethod
+    def from_bin(source):
+        """Loads the first rotation of a binary schedule, see formats.BinWriter
+        :param source: binary file-like object
+        """
+        employees, weeks = read_bin(source)
+        return PackedTimetable(employees, [pairs for _, _, pairs in weeks[:employees - 1]])
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as fd:
+            return PackedTimetable.from_bin(fd)
+
+    def partner(self, employee, week):
+        self._check(employee)
+        return self.table[self._round(week) * self.employees + employee]
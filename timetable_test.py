@@ -0,0 +1,98 @@
+from timetable import *
+from coffee import Coffee
+from employee import Employees
+from formats import writer
+import itertools
+import unittest
+import io
+
+
+class TestTimetable(unittest.TestCase):
+    def _check(self, timetable):
+        """every pair meets exactly once in the rotation, everyone once a week"""
+        n = timetable.employees
+        met = set()
+        for week in range(1, n):
+            pairs = timetable.week(week)
+            self.assertEqual(sorted(itertools.chain(*pairs)), list(range(n)))
+            for id1, id2 in pairs:
+                self.assertLess(id1, id2)
+                self.assertEqual(timetable.partner(id1, week), id2)
+                self.assertEqual(timetable.partner(id2, week), id1)
+                met.add((id1, id2))
+        self.assertEqual(len(met), n * (n - 1) // 2)
+        self.assertEqual(list(timetable), [timetable.week(week) for week in range(1, n)])
+
+    def test_circle(self):
+        for n in [2, 4, 10, 38, 100]:
+            self._check(CircleTimetable(n))
+
+        timetable = CircleTimetable(10)
+        # the rotation repeats itself
+        self.assertEqual(timetable.week(10), timetable.week(1))
+        self.assertEqual(timetable.partner(3, 9 * 1000 + 4), timetable.partner(3, 4))
+
+    def test_invalid(self):
+        # a timetable shall tell the partners
+        with self.assertRaises(TypeError):
+            Timetable(4)
+        for n in [0, 3, -2]:
+            with self.assertRaises(ValueError):
+                CircleTimetable(n)
+        timetable = CircleTimetable(10)
+        with self.assertRaises(IndexError):
+            timetable.partner(10, 1)
+        with self.assertRaises(IndexError):
+            timetable.partner(0, 0)
+
+    def test_packed(self):
+        circle = CircleTimetable(12)
+        packed = PackedTimetable(12, circle)
+        self._check(packed)
+        self.assertEqual(list(packed), list(circle))
+        self.assertEqual(len(packed.table), 11 * 12)
+
+        with self.assertRaises(ValueError):
+            PackedTimetable(12, list(circle)[:-1])
+        with self.assertRaises(ValueError):
+            PackedTimetable(12, list(circle) + [circle.week(1)])
+        with self.assertRaises(ValueError):
+            PackedTimetable(12, [pairs[1:] for pairs in circle])
+        # an employee paired twice in a week
+        weeks = [[(0, 1), (2, 3)], [(0, 2), (1, 3)], [(0, 3), (1, 2)]]
+        for week in [[(0, 1), (0, 1)], [(0, 1), (1, 2)], [(0, 0), (2, 3)]]:
+            with self.assertRaises(ValueError):
+                PackedTimetable(4, [week] + weeks[1:])
+        self.assertEqual(PackedTimetable(4, weeks).partner(2, 1), 3)
+
+    def test_coffee(self):
+        employees = Employees()
+        employees.fill(number=16)
+        coffee = Coffee(employees)
+        weeks = list(coffee.feed(sorting_algo=Coffee.DLX_ROTATION))
+        timetable = PackedTimetable(len(employees), weeks)
+        self._check(timetable)
+        for k, week in enumerate(weeks):
+            for id1, id2 in week.pairs():
+                self.assertEqual(timetable.partner(id1, k + 1), id2)
+
+    def test_bin(self):
+        employees = Employees()
+        employees.fill(number=10)
+        weeks = list(Coffee(employees).feed(sorting_algo=Coffee.DLX_ROTATION))
+
+        sink = io.BytesIO()
+        out = writer('bin', sink)
+        out.header(employees)
+        for i in range(12):
+            out.week(i + 1, weeks[i % len(weeks)], i == len(weeks))
+        out.footer()
+
+        sink.seek(0)
+        timetable = PackedTimetable.from_bin(sink)
+        self._check(timetable)
+        self.assertEqual(timetable.week(2), sorted(tuple(sorted(pair)) for pair in weeks[1].pairs()))
+
+
+if __name__ == "__main__":
+    unittest.main(argv=['ignore'], exit=False, verbosity=2)
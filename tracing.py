@@ -0,0 +1,139 @@
+"""
+Timeline of the solver activity in the Chrome trace-event format.
+
+The events are buffered in memory as tuples and only converted to JSON when
+saved, hence recording a span costs two clock readings and an append. Each
+thread gets its own track, named after the thread. The file opens in
+Perfetto (ui.perfetto.dev) or chrome://tracing.
+
+The process-wide tracer is disabled by default: a span is then a shared
+no-op context manager.
+
+    from tracing import tracer
+    tracer.enable()
+    with tracer.span('week', cat='coffee', week=3):
+        ...
+    tracer.save('trace.json')
+"""
+
+__author__ = "Bertrand Blanc (Alan Turing)"
+__all__ = ["Tracer", "tracer"]
+
+import json
+import os
+import threading
+import time
+
+
+class _Span():
+    """Complete event ('X') recorded when the context exits"""
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'start')
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.tracer._emit('X', self.name, self.cat, self.start, end - self.start, self.args)
+        return False
+
+
+class _NoSpan():
+    """Span of a disabled tracer"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Tracer():
+    """Buffered recorder of trace events, one track per thread"""
+
+    def __init__(self):
+        self.enabled = False
+        # (phase, name, category, start ns, duration ns, thread id, args)
+        self.events = []
+        # thread id -> name of the thread, for the track names
+        self.threads = dict()
+        self.origin = time.perf_counter_ns()
+
+    def enable(self):
+        """starts recording, from an empty buffer"""
+        self.clear()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        self.events = []
+        self.threads = dict()
+        self.origin = time.perf_counter_ns()
+
+    def __len__(self):
+        return len(self.events)
+
+    def _emit(self, phase, name, cat, start, duration, args):
+        tid = threading.get_ident()
+        if tid not in self.threads:
+            self.threads[tid] = threading.current_thread().name
+        # list.append is atomic: the threads share the buffer without a lock
+        self.events.append((phase, name, cat, start, duration, tid, args))
+
+    def span(self, name, *, cat='', **args):
+        """context manager timing a section of code
+        :param args: values shown with the event
+        """
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name, cat, args)
+
+    def instant(self, name, *, cat='', **args):
+        """event without duration, e.g. a timeout"""
+        if self.enabled:
+            self._emit('i', name, cat, time.perf_counter_ns(), 0, args)
+
+    def counter(self, name, **values):
+        """values plotted as a counter track, e.g. the nodes explored by the search"""
+        if self.enabled:
+            self._emit('C', name, '', time.perf_counter_ns(), 0, values)
+
+    def trace(self):
+        """the events as a Chrome trace-event document"""
+        pid = os.getpid()
+        events = [dict(ph='M', name='thread_name', pid=pid, tid=tid, args=dict(name=name))
+                  for tid, name in self.threads.items()]
+        for phase, name, cat, start, duration, tid, args in self.events:
+            event = dict(ph=phase, name=name, pid=pid, tid=tid, ts=(start - self.origin) / 1000)
+            if cat:
+                event['cat'] = cat
+            if phase == 'X':
+                event['dur'] = duration / 1000
+            elif phase == 'i':
+                event['s'] = 't'
+            if args:
+                event['args'] = args
+            events.append(event)
+        return dict(traceEvents=events, displayTimeUnit='ms')
+
+    def save(self, path):
+        """writes the trace to a JSON file"""
+        with open(path, 'w', encoding='utf-8') as fd:
+            json.dump(self.trace(), fd, default=str)
+
+
+# the process-wide tracer
+tracer = Tracer()
@@ -0,0 +1,92 @@
+from tracing import *
+from coffee import Coffee
+from employee import Employees
+import threading
+import unittest
+import json
+import os
+
+
+class TestTracer(unittest.TestCase):
+    def test_disabled(self):
+        tracer = Tracer()
+        with tracer.span('nothing', cat='test', value=1):
+            pass
+        tracer.instant('nothing')
+        tracer.counter('nothing', value=1)
+        self.assertEqual(len(tracer), 0)
+        self.assertIs(tracer.span('a'), tracer.span('b'))
+
+    def test_span(self):
+        tracer = Tracer()
+        tracer.enable()
+        with tracer.span('outer', cat='test', value=1):
+            with tracer.span('inner'):
+                pass
+            tracer.instant('mark')
+        tracer.counter('nodes', nodes=10)
+
+        events = [event for event in tracer.trace()['traceEvents'] if event['ph'] != 'M']
+        self.assertEqual([event['name'] for event in events], ['inner', 'mark', 'outer', 'nodes'])
+        inner, mark, outer, nodes = events
+        self.assertEqual(outer['ph'], 'X')
+        self.assertEqual(outer['cat'], 'test')
+        self.assertEqual(outer['args'], dict(value=1))
+        self.assertLessEqual(outer['ts'], inner['ts'])
+        self.assertGreaterEqual(outer['ts'] + outer['dur'], inner['ts'] + inner['dur'])
+        self.assertEqual(mark['ph'], 'i')
+        self.assertEqual(nodes['args'], dict(nodes=10))
+
+        tracer.enable()
+        self.assertEqual(len(tracer), 0)
+
+    def test_threads(self):
+        tracer = Tracer()
+        tracer.enable()
+
+        # the threads are alive together, hence their identifiers are distinct
+        barrier = threading.Barrier(3)
+
+        def work():
+            with tracer.span('work'):
+                barrier.wait()
+
+        threads = [threading.Thread(target=work, name=f'worker {i}') for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        events = tracer.trace()['traceEvents']
+        tracks = {event['tid']: event['args']['name'] for event in events if event['ph'] == 'M'}
+        self.assertEqual(sorted(tracks.values()), ['worker 0', 'worker 1', 'worker 2'])
+        self.assertEqual({event['tid'] for event in events if event['ph'] == 'X'}, set(tracks))
+
+    def test_save(self):
+        FILE = 'trace.json'
+        tracer = Tracer()
+        tracer.enable()
+        with tracer.span('save', employee=Employees()):
+            pass
+        tracer.save(FILE)
+        with open(FILE, 'r', encoding='utf-8') as fd:
+            trace = json.load(fd)
+        os.remove(FILE)
+        self.assertEqual(len(trace['traceEvents']), 2)
+
+    def test_coffee(self):
+        employees = Employees()
+        employees.fill(number=10)
+        tracer.enable()
+        try:
+            weeks = list(Coffee(employees).feed(sorting_algo=1, propagate=True))
+        finally:
+            tracer.disable()
+        names = [event[1] for event in tracer.events]
+        self.assertEqual(names.count('week'), len(weeks) + 1)
+        self.assertEqual(names.count('schedule'), len(weeks) + 1)
+        self.assertIn('search', names)
+
+
+if __name__ == "__main__":
+    unittest.main(argv=['ignore'], exit=False, verbosity=2)
@@ -0,0 +1,140 @@
+"""
+Process-wide watchdog signalling the deadlines of the timed work.
+
+Instead of a timer thread per timed call, a single daemon thread keeps a
+heap of the deadlines and sleeps on a Condition until the earliest one, or
+until an earlier deadline is registered. At a deadline, the Token of the
+work is set: the work is expected to poll it (it has the is_set() of an
+Event, hence it can be passed wherever a termination signal is expected)
+and to give up.
+
+Work which was signalled but did not report itself finished yet is an
+orphan: still running, using the CPU, for nothing. orphans() reports them.
+"""
+
+__author__ = "Bertrand Blanc (Alan Turing)"
+__all__ = ["Token", "Watchdog", "watchdog"]
+
+from threading import Condition, Event, Thread
+import heapq
+import itertools
+import os
+import time
+
+
+class Token():
+    """Cancellation token of a piece of work with a deadline"""
+
+    def __init__(self, deadline, name=None):
+        """
+        :param deadline: time.monotonic() at which the watchdog sets the token
+        :param name: description of the work, for the reports
+        """
+        self.deadline = deadline
+        self.name = name
+        self.event = Event()
+        # set by the watchdog, rather than cancelled by the owner
+        self.expired = False
+        self.done = False
+
+    def is_set(self):
+        return self.event.is_set()
+
+    def set(self):
+        """cancels the work before its deadline"""
+        self.event.set()
+
+    cancel = set
+
+    def wait(self, timeout=None):
+        return self.event.wait(timeout)
+
+    def finish(self):
+        """the work is over: the token is not watched anymore"""
+        self.done = True
+
+    def remaining(self):
+        """seconds left before the deadline"""
+        return max(0.0, self.deadline - time.monotonic())
+
+    def __str__(self):
+        return str(self.name)
+
+
+class Watchdog():
+    """Single thread setting the tokens at their deadlines"""
+
+    def __init__(self):
+        self._condition = Condition()
+        self._heap = []
+        # tie breaker of the deadlines, tokens are not comparable
+        self._sequence = itertools.count()
+        self._thread = None
+        self._expired = []
+        self.wakeups = 0
+
+    def _forked(self):
+        """a forked process inherits the watchdog, not its thread: it starts afresh"""
+        self._condition = Condition()
+        self._heap = []
+        self._thread = None
+        self._expired = []
+
+    def watch(self, seconds, *, name=None):
+        """Registers a deadline
+        :param seconds: delay before the token is set
+        :return: Token to poll, and to finish() once the work is over
+        """
+        token = Token(time.monotonic() + seconds, name)
+        with self._condition:
+            heapq.heappush(self._heap, (token.deadline, next(self._sequence), token))
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name='watchdog', daemon=True)
+                self._thread.start()
+            elif self._heap[0][2] is token:
+                # the thread sleeps until a later deadline
+                self._condition.notify()
+        return token
+
+    def _run(self):
+        with self._condition:
+            while True:
+                if not self._heap:
+                    self._condition.wait()
+                    self.wakeups += 1
+                    continue
+
+                deadline, _, token = self._heap[0]
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    self.wakeups += 1
+                    continue
+
+                heapq.heappop(self._heap)
+                if token.done or token.is_set():
+                    continue
+                token.expired = True
+                token.set()
+                self._expired.append(token)
+
+    def __len__(self):
+        """number of deadlines still watched"""
+        with self._condition:
+            return sum(1 for _, _, token in self._heap if not token.done)
+
+    @property
+    def threads(self):
+        """number of threads used by the watchdog"""
+        return 0 if self._thread is None else 1
+
+    def orphans(self):
+        """tokens signalled at their deadline whose work is still running"""
+        with self._condition:
+            self._expired = [token for token in self._expired if not token.done]
+            return list(self._expired)
+
+
+# the process-wide watchdog
+watchdog = Watchdog()
+os.register_at_fork(after_in_child=watchdog._forked)
@@ -0,0 +1,96 @@
+from watchdog import *
+from decorator_timer import Timer
+import multiprocessing
+import threading
+import unittest
+import time
+import os
+
+
+class TestWatchdog(unittest.TestCase):
+    def test_deadline(self):
+        watchdog = Watchdog()
+        late = watchdog.watch(0.2, name='late')
+        early = watchdog.watch(0.05, name='early')
+        self.assertEqual(len(watchdog), 2)
+        self.assertTrue(early.wait(1))
+        # the earlier deadline registered last woke the thread up
+        self.assertFalse(late.is_set())
+        self.assertTrue(early.expired)
+        self.assertTrue(late.wait(1))
+        self.assertEqual(watchdog.threads, 1)
+        self.assertEqual(str(late), 'late')
+
+    def test_finish(self):
+        watchdog = Watchdog()
+        token = watchdog.watch(0.05)
+        token.finish()
+        self.assertEqual(len(watchdog), 0)
+        time.sleep(0.1)
+        self.assertFalse(token.is_set())
+        self.assertFalse(token.expired)
+        self.assertEqual(watchdog.orphans(), [])
+
+    def test_cancel(self):
+        watchdog = Watchdog()
+        token = watchdog.watch(10)
+        token.cancel()
+        self.assertTrue(token.is_set())
+        self.assertFalse(token.expired)
+        self.assertGreater(token.remaining(), 0)
+
+    def test_orphans(self):
+        watchdog = Watchdog()
+        token = watchdog.watch(0.01, name='stubborn')
+        token.wait(1)
+        self.assertEqual(watchdog.orphans(), [token])
+        token.finish()
+        self.assertEqual(watchdog.orphans(), [])
+
+    def test_single_thread(self):
+        watchdog = Watchdog()
+        threads = threading.active_count()
+        tokens = [watchdog.watch(0.01 * (i % 5)) for i in range(100)]
+        self.assertLessEqual(threading.active_count(), threads + 1)
+        for token in tokens:
+            self.assertTrue(token.wait(1))
+
+    def test_fork(self):
+        # the watchdog thread of the parent does not survive the fork
+        watchdog.watch(0.01).wait(1)
+        child = multiprocessing.get_context('fork').Process(target=_expire)
+        child.start()
+        child.join(5)
+        self.assertEqual(child.exitcode, 0)
+
+
+def _expire():
+    os._exit(0 if watchdog.watch(0.01).wait(2) else 1)
+
+
+class TestTimer(unittest.TestCase):
+    def test_timeout(self):
+        @Timer(False, timeout=0.05, token='signal')
+        def poll(signal=None):
+            while not signal.is_set():
+                time.sleep(0.005)
+
+        threads = threading.active_count()
+        with self.assertRaises(TimeoutError):
+            poll()
+        self.assertLessEqual(threading.active_count(), threads + 1)
+
+    def test_result(self):
+        @Timer(False, timeout=1, token='signal')
+        def work(signal=None):
+            return signal.is_set()
+
+        self.assertFalse(work())
+        # a token given by the caller is kept
+        token = Token(0)
+        token.set()
+        self.assertTrue(work(signal=token))
+
+
+if __name__ == "__main__":
+    unittest.main(argv=['ignore'], exit=False, verbosity=2)